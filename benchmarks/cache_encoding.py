@@ -0,0 +1,62 @@
+"""
+Compares size and decode time of cached translations in the pydantic JSON format and the compact binary format.
+
+Translations are emulated with pieces of UDHR texts of different length (English source, Russian and German targets).
+Usage (from the repository root):
+    PYTHONPATH=src python benchmarks/cache_encoding.py [iterations]
+"""
+import sys
+import time
+
+import nltk
+from nltk.corpus import udhr
+
+from language_bot.translators import get_translation_id
+from language_bot.translators.cache_codec import encode_translation, decode_translation
+from language_bot.translators.translation_service_interface import TranslationResult
+
+TEXT_LENGTHS = (10, 50, 200, 1000, 4000)
+TARGETS = {"ru": "Russian-UTF8", "de": "German_Deutsch-Latin1"}
+
+
+def measure(decode, serialized: bytes, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        decode(serialized)
+    return (time.perf_counter() - started) / iterations
+
+
+def main(iterations: int):
+    nltk.download("udhr", quiet=True)
+    source = udhr.raw("English-Latin1")
+    print(f"{'target':>6} {'length':>6} {'json':>8} {'binary':>8} {'saved':>6} "
+          f"{'json decode':>12} {'binary decode':>14}")
+    for target_language, fileid in TARGETS.items():
+        target = udhr.raw(fileid)
+        for length in TEXT_LENGTHS:
+            source_text = source[:length]
+            translation = TranslationResult(
+                source_text=source_text,
+                source_language="en",
+                target_text=target[:length],
+                target_language=target_language,
+                translation_id=get_translation_id(source_text, "en", target_language),
+            )
+            json_serialized = translation.model_dump_json().encode("utf-8")
+            binary_serialized = encode_translation(translation)
+            assert decode_translation(translation.translation_id, binary_serialized) == translation
+            assert decode_translation(translation.translation_id, json_serialized) == translation
+
+            json_time = measure(TranslationResult.model_validate_json, json_serialized, iterations)
+            binary_time = measure(
+                lambda serialized: decode_translation(translation.translation_id, serialized),
+                binary_serialized,
+                iterations,
+            )
+            print(f"{target_language:>6} {length:>6} {len(json_serialized):>8} {len(binary_serialized):>8} "
+                  f"{100 * (1 - len(binary_serialized) / len(json_serialized)):>5.1f}% "
+                  f"{1e6 * json_time:>9.2f} us {1e6 * binary_time:>11.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
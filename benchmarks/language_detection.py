@@ -0,0 +1,89 @@
+"""
+Compares local n-gram language detection with LibreTranslate /detect.
+
+Profiles are trained on the first part of each UDHR text, sentences from the rest are used as samples.
+Usage (from the repository root, LibreTranslate should be running):
+    PYTHONPATH=src python benchmarks/language_detection.py config.json [samples_per_language]
+"""
+import asyncio
+import re
+import statistics
+import sys
+import time
+
+import nltk
+from nltk.corpus import udhr
+
+from language_bot.common.config import init_config
+from language_bot.translators.libretranslate import Libretranslate
+from language_bot.translators.language_detector import NgramLanguageDetector, find_udhr_fileids
+
+TRAIN_FRACTION = 0.7
+SENTENCE_RE = re.compile(r"[^.!?;\n]{20,200}[.!?;\n]")
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def report(name, latencies, answered, correct, total):
+    print(f"{name}: answered {answered}/{total} ({100 * answered / total:.1f}%), "
+          f"accuracy of answered {100 * correct / max(answered, 1):.1f}%, "
+          f"latency mean {1000 * statistics.mean(latencies):.3f} ms, "
+          f"p50 {1000 * percentile(latencies, 0.5):.3f} ms, p95 {1000 * percentile(latencies, 0.95):.3f} ms")
+
+
+async def main(config_filename: str, samples_per_language: int):
+    config = init_config(config_filename)
+    translator_config = config.TRANSLATION_SERVICES[0]
+    translator = Libretranslate(
+        url=translator_config.url,
+        timeout=translator_config.timeout,
+        max_connections=translator_config.max_connections,
+        max_keepalive_connections=translator_config.max_keepalive_connections,
+    )
+    languages = sorted({source_language for source_language, _ in await translator.load_supported_pairs()})
+
+    nltk.download("udhr", quiet=True)
+    train_texts = {}
+    samples = []
+    for language, fileid in find_udhr_fileids(languages, udhr.fileids()).items():
+        try:
+            text = udhr.raw(fileid)
+        except (UnicodeDecodeError, LookupError) as _:
+            continue
+        split = int(len(text) * TRAIN_FRACTION)
+        train_texts[language] = text[:split]
+        sentences = [sentence.strip() for sentence in SENTENCE_RE.findall(text[split:])]
+        samples.extend((language, sentence) for sentence in sentences[:samples_per_language])
+
+    detector = NgramLanguageDetector.train(train_texts)
+    print(f"{len(train_texts)} languages, {len(samples)} samples")
+
+    latencies, answered, correct = [], 0, 0
+    for language, sentence in samples:
+        started = time.perf_counter()
+        detected = detector.detect(sentence)
+        latencies.append(time.perf_counter() - started)
+        if detected is not None:
+            answered += 1
+            correct += detected.root[0].language == language
+    report("local", latencies, answered, correct, len(samples))
+
+    latencies, answered, correct = [], 0, 0
+    for language, sentence in samples:
+        started = time.perf_counter()
+        detected = await translator.detect_language(sentence)
+        latencies.append(time.perf_counter() - started)
+        answered += 1
+        correct += max(detected.root, key=lambda item: item.confidence).language == language
+    report("remote", latencies, answered, correct, len(samples))
+
+    await translator.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 20))
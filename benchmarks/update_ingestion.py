@@ -0,0 +1,171 @@
+"""
+Compares update ingestion throughput of long polling with the webhook server.
+
+A fake Telegram Bot API runs locally and the application is pointed to it with base_url. For polling it answers
+getUpdates with up to 100 updates at a time, for the webhook it pushes every update in its own request over
+WEBHOOK_CONNECTIONS keep-alive connections, as Telegram does. Every request takes the simulated network latency.
+The handler only counts updates, so the numbers show ingestion rather than processing.
+Usage (from the repository root):
+    PYTHONPATH=src python benchmarks/update_ingestion.py [updates]
+"""
+import asyncio
+import collections
+import itertools
+import json
+import sys
+import time
+import urllib.parse
+
+from telegram import Update
+from telegram.ext import ApplicationBuilder, TypeHandler
+
+from language_bot.common.webhook_server import WebhookServer, read_request, write_response
+
+TOKEN = "123456:bench"
+BOT_API_PORT = 18081
+WEBHOOK_PORT = 18443
+WEBHOOK_PATH = "/telegram"
+WEBHOOK_SECRET_TOKEN = "bench"
+WEBHOOK_CONNECTIONS = 40
+GET_UPDATES_LIMIT = 100
+USERS = 1000
+LATENCIES = (0.0, 0.02, 0.1)
+
+
+def make_update(update_id: int):
+    user = {"id": update_id % USERS + 1, "is_bot": False, "first_name": "user"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": user["id"], "type": "private"},
+            "from": user,
+            "text": "Hallo Welt",
+        },
+    }
+
+
+class FakeBotApi:
+    def __init__(self, updates: int, latency: float):
+        self.pending = collections.deque(make_update(update_id) for update_id in range(1, updates + 1))
+        self.latency = latency
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while (request := await read_request(reader, 1 << 20)) is not None:
+                _, target, _, body = request
+                if body.startswith(b"{"):
+                    params = json.loads(body)
+                else:
+                    params = {name: values[0] for name, values in urllib.parse.parse_qs(body.decode()).items()}
+                result = await self.call(target.rsplit("/", 1)[-1], params)
+                await asyncio.sleep(self.latency)
+                write_response(writer, 200, json.dumps({"ok": True, "result": result}).encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def call(self, method: str, params):
+        match method:
+            case "getMe":
+                return {"id": 1, "is_bot": True, "first_name": "bench", "username": "bench_bot"}
+            case "getUpdates":
+                # Updates before the offset are confirmed by the bot
+                offset = int(params.get("offset", 0))
+                while self.pending and self.pending[0]["update_id"] < offset:
+                    self.pending.popleft()
+                if not self.pending:
+                    await asyncio.sleep(0.1)
+                return list(itertools.islice(self.pending, GET_UPDATES_LIMIT))
+            case _:
+                return True
+
+
+async def push_updates(updates: int, latency: float):
+    queue = collections.deque(make_update(update_id) for update_id in range(1, updates + 1))
+
+    async def connection():
+        reader, writer = await asyncio.open_connection("127.0.0.1", WEBHOOK_PORT)
+        while queue:
+            body = json.dumps(queue.popleft()).encode()
+            await asyncio.sleep(latency)
+            writer.write(
+                f"POST {WEBHOOK_PATH} HTTP/1.1\r\n"
+                f"Host: 127.0.0.1\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"X-Telegram-Bot-Api-Secret-Token: {WEBHOOK_SECRET_TOKEN}\r\n"
+                "\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            if b" 200 " not in status_line:
+                raise RuntimeError(f"Webhook rejected update: {status_line}")
+        writer.close()
+
+    await asyncio.gather(*[connection() for _ in range(WEBHOOK_CONNECTIONS)])
+
+
+async def measure(mode: str, updates: int, latency: float) -> float:
+    bot_api = FakeBotApi(updates if mode == "polling" else 0, latency)
+    bot_api_server = await asyncio.start_server(bot_api.serve, "127.0.0.1", BOT_API_PORT)
+    processed = 0
+    done = asyncio.Event()
+
+    async def count_update(_update: Update, _context):
+        nonlocal processed
+        processed += 1
+        if processed == updates:
+            done.set()
+
+    builder = (ApplicationBuilder()
+               .token(TOKEN)
+               .base_url(f"http://127.0.0.1:{BOT_API_PORT}/bot")
+               .concurrent_updates(True))
+    if mode == "webhook":
+        builder = builder.updater(None)
+    application = builder.build()
+    application.add_handler(TypeHandler(Update, count_update))
+    webhook_server = WebhookServer(application, "127.0.0.1", WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET_TOKEN)
+
+    await application.initialize()
+    await application.start()
+    started = time.perf_counter()
+    if mode == "polling":
+        await application.updater.start_polling(poll_interval=0, timeout=1)
+    else:
+        await webhook_server.start()
+        await push_updates(updates, latency)
+    await done.wait()
+    elapsed = time.perf_counter() - started
+
+    if mode == "polling":
+        await application.updater.stop()
+    else:
+        await webhook_server.stop()
+    await application.stop()
+    await application.shutdown()
+    bot_api_server.close()
+    await bot_api_server.wait_closed()
+    return updates / elapsed
+
+
+async def main(updates: int):
+    print(f"{'latency, ms':>12} {'polling, updates/s':>19} {'webhook, updates/s':>19}")
+    for latency in LATENCIES:
+        polling = await measure("polling", updates, latency)
+        webhook = await measure("webhook", updates, latency)
+        print(f"{1000 * latency:>12.0f} {polling:>19.0f} {webhook:>19.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,135 @@
+"""
+Compares OFFSET pagination over the global (learning_score, last_check) index with keyset pagination over
+the per-user (user_id, language, learning_score, last_check, word) index.
+
+A scratch schema is seeded with ~1M vocabulary rows: 1000 users with 900 words each and one heavy user with
+100k words. Pages at increasing depth of the heavy user's vocabulary are fetched with both queries.
+Usage (from the repository root, the schema is dropped afterwards):
+    PYTHONPATH=src python benchmarks/vocabulary_pagination.py config.json [repeats]
+"""
+import statistics
+import sys
+import time
+
+import psycopg2
+import psycopg2.extras
+
+from language_bot.common.config import init_config
+
+SCHEMA = "vocabulary_pagination_bench"
+USERS = 1000
+WORDS_PER_USER = 900
+HEAVY_USER_WORDS = 100000
+# The bot requests one word more than it shows to tell if there is a next page
+PAGE_SIZE = 31
+PAGE_DEPTHS = (0, 10, 100, 1000, 3000)
+
+OFFSET_QUERY = (
+    f"SELECT word, learning_score, last_check FROM {SCHEMA}.vocabulary "
+    "WHERE user_id = %s AND language = %s "
+    "ORDER BY learning_score, last_check OFFSET %s LIMIT %s;"
+)
+KEYSET_QUERY = (
+    f"SELECT word, learning_score, last_check FROM {SCHEMA}.vocabulary "
+    "WHERE user_id = %s AND language = %s AND (learning_score, last_check, word) > (%s, %s, %s) "
+    "ORDER BY learning_score, last_check, word LIMIT %s;"
+)
+
+
+def seed(cur):
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+    cur.execute(f"CREATE SCHEMA {SCHEMA};")
+    cur.execute(
+        f"CREATE TABLE {SCHEMA}.vocabulary ("
+        "   word TEXT, language VARCHAR(2), user_id UUID, learning_score INT,"
+        "   last_check TIMESTAMP DEFAULT (now() at time zone 'utc'),"
+        "   PRIMARY KEY (user_id, language, word)"
+        ");"
+    )
+    cur.execute(
+        f"INSERT INTO {SCHEMA}.vocabulary (word, language, user_id, learning_score, last_check) "
+        "SELECT 'word' || w, 'de', u.user_id, (random() * 10)::int, "
+        "   now() - random() * interval '365 days' "
+        "FROM (SELECT gen_random_uuid() AS user_id FROM generate_series(1, %s)) AS u, generate_series(1, %s) AS w;",
+        (USERS, WORDS_PER_USER,)
+    )
+    cur.execute(
+        f"INSERT INTO {SCHEMA}.vocabulary (word, language, user_id, learning_score, last_check) "
+        "SELECT 'word' || w, 'de', '00000000-0000-0000-0000-000000000001', (random() * 10)::int, "
+        "   now() - random() * interval '365 days' "
+        "FROM generate_series(1, %s) AS w;",
+        (HEAVY_USER_WORDS,)
+    )
+
+
+def create_index(cur, keyset: bool):
+    cur.execute(f"DROP INDEX IF EXISTS {SCHEMA}.vocabulary_bench_index;")
+    if keyset:
+        cur.execute(
+            f"CREATE INDEX vocabulary_bench_index "
+            f"ON {SCHEMA}.vocabulary(user_id, language, learning_score, last_check, word);"
+        )
+    else:
+        cur.execute(f"CREATE INDEX vocabulary_bench_index ON {SCHEMA}.vocabulary(learning_score, last_check);")
+    cur.execute(f"ANALYZE {SCHEMA}.vocabulary;")
+
+
+def measure(cur, query, params, repeats):
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies), rows
+
+
+def main(config_filename: str, repeats: int):
+    config = init_config(config_filename)
+    psycopg2.extras.register_uuid()
+    connection = psycopg2.connect(
+        dbname=config.DB_NAME,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        host=config.DB_HOST,
+    )
+    connection.autocommit = True
+    cur = connection.cursor()
+    user_id = "00000000-0000-0000-0000-000000000001"
+    try:
+        started = time.perf_counter()
+        seed(cur)
+        cur.execute(f"SELECT COUNT(*) FROM {SCHEMA}.vocabulary;")
+        print(f"Seeded {cur.fetchone()[0]} rows in {time.perf_counter() - started:.1f} s")
+
+        # Positions every page of the keyset listing starts after
+        cur.execute(
+            f"SELECT learning_score, last_check, word FROM {SCHEMA}.vocabulary "
+            "WHERE user_id = %s AND language = 'de' ORDER BY learning_score, last_check, word;",
+            (user_id,)
+        )
+        ordered = cur.fetchall()
+
+        create_index(cur, keyset=False)
+        offset_latencies = {
+            depth: measure(cur, OFFSET_QUERY, (user_id, "de", depth * PAGE_SIZE, PAGE_SIZE), repeats)[0]
+            for depth in PAGE_DEPTHS
+        }
+
+        create_index(cur, keyset=True)
+        keyset_latencies = {}
+        for depth in PAGE_DEPTHS:
+            # Position before the first row of the page (the first page has nothing before it)
+            position = ordered[depth * PAGE_SIZE - 1] if depth > 0 else (-1, ordered[0][1], "")
+            keyset_latencies[depth] = measure(cur, KEYSET_QUERY, (user_id, "de", *position, PAGE_SIZE), repeats)[0]
+
+        print(f"{'page':>6} {'offset, ms':>12} {'keyset, ms':>12}")
+        for depth in PAGE_DEPTHS:
+            print(f"{depth + 1:>6} {1000 * offset_latencies[depth]:>12.3f} {1000 * keyset_latencies[depth]:>12.3f}")
+    finally:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        connection.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -0,0 +1,127 @@
+"""
+Compares per-user vocabulary queries on the plain vocabulary table with the same queries on vocabulary
+hash-partitioned by user_id into 16 partitions.
+
+Both layouts are seeded into a scratch schema with the same ~5M vocabulary rows: 10000 users with 500 words each.
+Queries are prepared with generic plans, like the bot's registered queries once they are cached, so partitions
+are pruned at execution time. Usage (from the repository root, the schema is dropped afterwards):
+    PYTHONPATH=src python benchmarks/vocabulary_partitioning.py config.json [repeats]
+"""
+import statistics
+import sys
+import time
+
+import psycopg2
+import psycopg2.extras
+
+from language_bot.common.config import init_config
+
+SCHEMA = "vocabulary_partitioning_bench"
+USERS = 10000
+WORDS_PER_USER = 500
+PARTITIONS = 16
+PAGE_SIZE = 31
+NEW_WORDS = 30
+
+COLUMNS = (
+    "word_id BIGINT NOT NULL, language VARCHAR(2), user_id UUID NOT NULL, learning_score INT, last_check TIMESTAMP,"
+    "   PRIMARY KEY (user_id, word_id)"
+)
+
+QUERIES = {
+    "page": (
+        "SELECT word_id, learning_score, last_check FROM {table} "
+        "WHERE user_id = $1 AND language = 'de' "
+        "ORDER BY learning_score, last_check, word_id LIMIT $2",
+        lambda user_id: (user_id, PAGE_SIZE,),
+    ),
+    "count": (
+        "SELECT COUNT(*) FROM {table} WHERE user_id = $1 AND language = 'de'",
+        lambda user_id: (user_id,),
+    ),
+    "upsert": (
+        "INSERT INTO {table} (word_id, language, user_id, learning_score) "
+        "SELECT w, 'de', $1, 0 FROM generate_series($2::bigint, $2::bigint + $3) AS w "
+        "ON CONFLICT (user_id, word_id) DO UPDATE SET learning_score = excluded.learning_score",
+        lambda user_id: (user_id, WORDS_PER_USER, NEW_WORDS,),
+    ),
+}
+
+
+def seed(cur):
+    cur.execute(f"CREATE TABLE {SCHEMA}.plain ({COLUMNS});")
+    cur.execute(f"CREATE TABLE {SCHEMA}.partitioned ({COLUMNS}) PARTITION BY HASH (user_id);")
+    for remainder in range(PARTITIONS):
+        cur.execute(
+            f"CREATE TABLE {SCHEMA}.partitioned_p{remainder:02} PARTITION OF {SCHEMA}.partitioned "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder});"
+        )
+
+    cur.execute(
+        f"INSERT INTO {SCHEMA}.plain (word_id, language, user_id, learning_score, last_check) "
+        "SELECT w, 'de', u.user_id, (random() * 10)::int, now() - random() * interval '365 days' "
+        "FROM (SELECT gen_random_uuid() AS user_id FROM generate_series(1, %s)) AS u, generate_series(1, %s) AS w;",
+        (USERS, WORDS_PER_USER,)
+    )
+    cur.execute(f"INSERT INTO {SCHEMA}.partitioned SELECT * FROM {SCHEMA}.plain;")
+    for table in ("plain", "partitioned"):
+        cur.execute(f"CREATE INDEX ON {SCHEMA}.{table}(user_id, language, learning_score, last_check, word_id);")
+        started = time.perf_counter()
+        cur.execute(f"VACUUM ANALYZE {SCHEMA}.{table};")
+        print(f"VACUUM ANALYZE of {table} table took {time.perf_counter() - started:.1f} s")
+
+
+def measure(cur, table, user_ids):
+    latencies = {}
+    for name, (query, params) in QUERIES.items():
+        statement = f"bench_{table}_{name}"
+        cur.execute(f"PREPARE {statement} AS {query.format(table=f'{SCHEMA}.{table}')};")
+        samples = []
+        for user_id in user_ids:
+            started = time.perf_counter()
+            cur.execute(f"EXECUTE {statement} ({', '.join(['%s'] * len(params(user_id)))});", params(user_id))
+            if cur.description is not None:
+                cur.fetchall()
+            samples.append(time.perf_counter() - started)
+        latencies[name] = statistics.median(samples)
+
+    cur.execute(f"EXPLAIN (ANALYZE, COSTS OFF) EXECUTE bench_{table}_page (%s, %s);", (user_ids[0], PAGE_SIZE,))
+    plan = "\n".join(entry[0] for entry in cur.fetchall())
+    return latencies, plan
+
+
+def main(config_filename: str, repeats: int):
+    config = init_config(config_filename)
+    psycopg2.extras.register_uuid()
+    connection = psycopg2.connect(
+        dbname=config.DB_NAME,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        host=config.DB_HOST,
+    )
+    connection.autocommit = True
+    cur = connection.cursor()
+    try:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        cur.execute(f"CREATE SCHEMA {SCHEMA};")
+        started = time.perf_counter()
+        seed(cur)
+        print(f"Seeded {USERS * WORDS_PER_USER} rows per layout in {time.perf_counter() - started:.1f} s")
+
+        # Generic plans are what prepared statements end up with, partitions have to be pruned at execution time
+        cur.execute("SET plan_cache_mode = force_generic_plan;")
+        cur.execute(f"SELECT DISTINCT user_id FROM {SCHEMA}.plain LIMIT %s;", (repeats,))
+        user_ids = [entry[0] for entry in cur.fetchall()]
+
+        results = {table: measure(cur, table, user_ids) for table in ("plain", "partitioned")}
+        print(f"{'layout':>12} " + " ".join(f"{name + ', ms':>11}" for name in QUERIES))
+        for table, (latencies, _) in results.items():
+            print(f"{table:>12} " + " ".join(f"{1000 * latencies[name]:>11.3f}" for name in QUERIES))
+        print(f"Page plan of the partitioned table:\n{results['partitioned'][1]}")
+    finally:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        connection.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 100)
@@ -0,0 +1,153 @@
+"""
+Compares storage size and query latency of vocabulary keyed by (word, language) text columns with vocabulary
+keyed by the word_id BIGINT surrogate key.
+
+Both layouts are seeded into a scratch schema with the same ~1M vocabulary rows: 1000 users with 1000 words each,
+drawn from 50k distinct words. Usage (from the repository root, the schema is dropped afterwards):
+    PYTHONPATH=src python benchmarks/word_id_storage.py config.json [repeats]
+"""
+import random
+import statistics
+import sys
+import time
+
+import psycopg2
+import psycopg2.extras
+
+from language_bot.common.config import init_config
+
+SCHEMA = "word_id_bench"
+USERS = 1000
+WORDS_PER_USER = 1000
+DISTINCT_WORDS = 50000
+PAGE_SIZE = 31
+NEW_WORDS = 30
+
+LAYOUTS = {
+    "text keys": {
+        "schema": [
+            f"CREATE TABLE {SCHEMA}.text_words ("
+            "   word TEXT, language VARCHAR(2), category TEXT, PRIMARY KEY (word, language));",
+            f"CREATE TABLE {SCHEMA}.text_vocabulary ("
+            "   word TEXT, language VARCHAR(2), user_id UUID, learning_score INT, last_check TIMESTAMP,"
+            "   PRIMARY KEY (user_id, language, word),"
+            f"   FOREIGN KEY (word, language) REFERENCES {SCHEMA}.text_words(word, language));",
+            f"CREATE INDEX ON {SCHEMA}.text_vocabulary(user_id, language, learning_score, last_check, word);",
+        ],
+        "seed": [
+            f"INSERT INTO {SCHEMA}.text_words (word, language) "
+            "SELECT 'word' || w, 'de' FROM generate_series(1, %(words)s) AS w;",
+            f"INSERT INTO {SCHEMA}.text_vocabulary (word, language, user_id, learning_score, last_check) "
+            f"SELECT 'word' || ((u.n * 7919 + w) %% %(words)s + 1), 'de', u.user_id, (random() * 10)::int, "
+            "   now() - random() * interval '365 days' "
+            "FROM (SELECT n, gen_random_uuid() AS user_id FROM generate_series(1, %(users)s) AS n) AS u, "
+            "   generate_series(1, %(words_per_user)s) AS w;",
+        ],
+        "tables": ["text_words", "text_vocabulary"],
+        "page": (
+            f"SELECT v.word, w.category, v.learning_score, v.last_check "
+            f"FROM {SCHEMA}.text_vocabulary AS v "
+            f"INNER JOIN {SCHEMA}.text_words AS w ON v.word = w.word AND v.language = w.language "
+            "WHERE v.user_id = %s AND v.language = 'de' "
+            "ORDER BY v.learning_score, v.last_check, v.word LIMIT %s;"
+        ),
+        "unique": (
+            "SELECT nw FROM unnest(%s::text[]) AS nw "
+            f"LEFT JOIN {SCHEMA}.text_vocabulary AS v ON nw = v.word AND v.language = 'de' AND v.user_id = %s "
+            "WHERE v.word IS NULL;"
+        ),
+    },
+    "word_id": {
+        "schema": [
+            f"CREATE TABLE {SCHEMA}.id_words ("
+            "   word_id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,"
+            "   word TEXT, language VARCHAR(2), category TEXT, UNIQUE (word, language));",
+            f"CREATE TABLE {SCHEMA}.id_vocabulary ("
+            "   word_id BIGINT, language VARCHAR(2), user_id UUID, learning_score INT, last_check TIMESTAMP,"
+            "   PRIMARY KEY (user_id, word_id),"
+            f"   FOREIGN KEY (word_id) REFERENCES {SCHEMA}.id_words(word_id));",
+            f"CREATE INDEX ON {SCHEMA}.id_vocabulary(user_id, language, learning_score, last_check, word_id);",
+        ],
+        "seed": [
+            f"INSERT INTO {SCHEMA}.id_words (word, language) SELECT word, language FROM {SCHEMA}.text_words;",
+            f"INSERT INTO {SCHEMA}.id_vocabulary (word_id, language, user_id, learning_score, last_check) "
+            "SELECT w.word_id, v.language, v.user_id, v.learning_score, v.last_check "
+            f"FROM {SCHEMA}.text_vocabulary AS v "
+            f"INNER JOIN {SCHEMA}.id_words AS w ON v.word = w.word AND v.language = w.language;",
+        ],
+        "tables": ["id_words", "id_vocabulary"],
+        "page": (
+            f"SELECT w.word, w.category, v.learning_score, v.last_check "
+            f"FROM {SCHEMA}.id_vocabulary AS v "
+            f"INNER JOIN {SCHEMA}.id_words AS w ON v.word_id = w.word_id "
+            "WHERE v.user_id = %s AND v.language = 'de' "
+            "ORDER BY v.learning_score, v.last_check, v.word_id LIMIT %s;"
+        ),
+        "unique": (
+            "SELECT nw FROM unnest(%s::text[]) AS nw "
+            f"LEFT JOIN {SCHEMA}.id_words AS w ON nw = w.word AND w.language = 'de' "
+            f"LEFT JOIN {SCHEMA}.id_vocabulary AS v ON v.word_id = w.word_id AND v.user_id = %s "
+            "WHERE v.word_id IS NULL;"
+        ),
+    },
+}
+
+
+def measure(cur, query, params_list):
+    latencies = []
+    for params in params_list:
+        started = time.perf_counter()
+        cur.execute(query, params)
+        cur.fetchall()
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies)
+
+
+def main(config_filename: str, repeats: int):
+    config = init_config(config_filename)
+    psycopg2.extras.register_uuid()
+    connection = psycopg2.connect(
+        dbname=config.DB_NAME,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        host=config.DB_HOST,
+    )
+    connection.autocommit = True
+    cur = connection.cursor()
+    try:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        cur.execute(f"CREATE SCHEMA {SCHEMA};")
+        seed_params = {"words": DISTINCT_WORDS, "users": USERS, "words_per_user": WORDS_PER_USER}
+        for name, layout in LAYOUTS.items():
+            started = time.perf_counter()
+            for statement in layout["schema"] + layout["seed"]:
+                cur.execute(statement, seed_params)
+            for table in layout["tables"]:
+                cur.execute(f"VACUUM ANALYZE {SCHEMA}.{table};")
+            print(f"Seeded {name} layout in {time.perf_counter() - started:.1f} s")
+
+        cur.execute(f"SELECT DISTINCT user_id FROM {SCHEMA}.text_vocabulary LIMIT %s;", (repeats,))
+        user_ids = [entry[0] for entry in cur.fetchall()]
+        new_words = [[f"word{random.randint(1, 2 * DISTINCT_WORDS)}" for _ in range(NEW_WORDS)] for _ in user_ids]
+
+        print(f"{'layout':>10} {'table, MB':>10} {'indexes, MB':>12} {'page, ms':>9} {'unique words, ms':>17}")
+        for name, layout in LAYOUTS.items():
+            vocabulary_table = f"{SCHEMA}.{layout['tables'][1]}"
+            cur.execute(
+                "SELECT pg_relation_size(%s::regclass), pg_indexes_size(%s::regclass);",
+                (vocabulary_table, vocabulary_table,)
+            )
+            table_size, indexes_size = cur.fetchone()
+            page_latency = measure(cur, layout["page"], [(user_id, PAGE_SIZE) for user_id in user_ids])
+            unique_latency = measure(
+                cur, layout["unique"], [(words, user_id) for words, user_id in zip(new_words, user_ids)]
+            )
+            print(f"{name:>10} {table_size / 2 ** 20:>10.1f} {indexes_size / 2 ** 20:>12.1f} "
+                  f"{1000 * page_latency:>9.3f} {1000 * unique_latency:>17.3f}")
+    finally:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        connection.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 100)
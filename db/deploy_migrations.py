@@ -1,13 +1,72 @@
 import os
+import re
 import subprocess
+import time
 import psycopg2
 
+BATCH_EXT = ".batch.sql"
+# Contract migrations drop schema the previous release of the bot still uses. Deployment stops before them
+# until it is run with DEPLOY_CONTRACT_MIGRATIONS=1 once every bot process runs the current release
+CONTRACT_EXT = ".contract.sql"
+# Statements which can't run in the single transaction psql wraps the file in
+NON_TRANSACTIONAL = re.compile(
+    # BEGIN of PL/pgSQL blocks isn't followed by a semicolon on the same line
+    r"^\s*(BEGIN|COMMIT|ROLLBACK|START\s+TRANSACTION)\b[^;\n]*;|^\s*VACUUM\b|\bCONCURRENTLY\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def psql_command(db_host: str, db_name: str, db_user: str, path: str) -> list:
+    """
+    psql stops at the first failed statement, otherwise a broken migration would be recorded as deployed.
+    Files without their own transaction control are applied atomically
+    """
+    command = ["psql", "-h", db_host, db_name, db_user, "-v", "ON_ERROR_STOP=1", "-a", "-f", path]
+    with open(path, "r") as migration_file:
+        if NON_TRANSACTIONAL.search(migration_file.read()) is None:
+            command.append("--single-transaction")
+
+    return command
+
+
+def run_batches(connection, path: str) -> bool:
+    """
+    Batch migration is a single statement moving a limited number of rows. It is repeated in separate
+    transactions until it affects no rows, so tables are never locked for long.
+    """
+    with open(path, "r") as migration_file:
+        statement = migration_file.read()
+
+    cur = connection.cursor()
+    batches = 0
+    rows = 0
+    started = time.monotonic()
+    try:
+        while True:
+            cur.execute(statement)
+            connection.commit()
+            if cur.rowcount <= 0:
+                break
+
+            batches += 1
+            rows += cur.rowcount
+            if batches % 100 == 0:
+                print(f"{batches} batches, {rows} rows, {time.monotonic() - started:.1f} s")
+    except psycopg2.Error as e:
+        connection.rollback()
+        print(f"Batch {batches + 1} failed: {e}")
+        return False
+
+    print(f"{batches} batches, {rows} rows, {time.monotonic() - started:.1f} s")
+    return True
+
 
 if __name__ == "__main__":
     db_name = os.environ.get('DB_NAME', None)
     db_user = os.environ.get('DB_USER', None)
     db_password = os.environ.get('DB_PASSWORD', None)
     db_host = os.environ.get('DB_HOST', None)
+    deploy_contract = os.environ.get('DEPLOY_CONTRACT_MIGRATIONS', None) == "1"
 
     assert (db_name is not None)
     assert (db_user is not None)
@@ -46,21 +105,34 @@ if __name__ == "__main__":
             print(f"Skipping migration {migration_file_name}")
             continue
 
-        if ext_sql == ".sql":
+        if migration_file_name.endswith(CONTRACT_EXT) and not deploy_contract:
+            # Later migrations may depend on it, so none of them are deployed either
+            print(
+                f"Stopping before contract migration {migration_file_name}, deploy again with "
+                f"DEPLOY_CONTRACT_MIGRATIONS=1 once every bot process runs the current release"
+            )
+            break
+
+        if migration_file_name.endswith(BATCH_EXT):
+            print(f"Deploying batch SQL migration {migration_file_name}...")
+            succeeded = run_batches(connection, os.path.join("./migrations", migration_file_name))
+        elif ext_sql == ".sql":
             print(f"Deploying SQL migration {migration_file_name}...")
             result = subprocess.run(
-                ["psql", "-h", db_host, db_name, db_user, "-a", "-f", os.path.join("./migrations", migration_file_name)]
+                psql_command(db_host, db_name, db_user, os.path.join("./migrations", migration_file_name))
             )
+            succeeded = result.returncode == 0
         elif ext_py == ".py":
             print(f"Deploying Python migration {migration_file_name}...")
             result = subprocess.run(
                 ["python3", os.path.join("./migrations", migration_file_name)]
             )
+            succeeded = result.returncode == 0
         else:
             print(f"Wrong file in migrations directory: {migration_file_name}")
             exit(1)
 
-        if result.returncode == 0:
+        if succeeded:
             print("Deployed successfully.")
             try:
                 cur = connection.cursor()
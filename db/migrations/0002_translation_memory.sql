@@ -0,0 +1,11 @@
+CREATE TABLE IF NOT EXISTS translation_memory (
+    -- md5(source_text), so that other tables can be joined by md5() of their text columns
+    text_hash CHAR(32),
+    source_language VARCHAR(8),
+    target_language VARCHAR(8),
+    source_text TEXT NOT NULL,
+    target_text TEXT NOT NULL,
+    created TIMESTAMP DEFAULT (now() at time zone 'utc'),
+
+    PRIMARY KEY (text_hash, source_language, target_language)
+);
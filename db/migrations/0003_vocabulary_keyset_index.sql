@@ -0,0 +1,14 @@
+-- Serves keyset pagination of a single vocabulary: the scan starts right at the requested user, language
+-- and position. CONCURRENTLY keeps the table writable while the index is being built.
+-- A failed concurrent build leaves an INVALID index which IF NOT EXISTS would skip on the next run, so it is
+-- dropped first. \gexec runs the generated statement outside a transaction, as DROP INDEX CONCURRENTLY requires
+SELECT 'DROP INDEX CONCURRENTLY ' || indexrelid::regclass
+FROM pg_index
+WHERE indexrelid = to_regclass('vocabulary_user_language_learning_score_last_check_word') AND NOT indisvalid
+\gexec
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS vocabulary_user_language_learning_score_last_check_word
+    ON vocabulary(user_id, language, learning_score, last_check, word);
+
+-- The global index is not used by any query since vocabularies are always listed per user
+DROP INDEX CONCURRENTLY IF EXISTS vocabulary_learning_score_last_check;
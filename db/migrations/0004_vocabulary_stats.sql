@@ -0,0 +1,77 @@
+-- Word counters of every vocabulary, kept up to date by triggers on vocabulary
+CREATE TABLE IF NOT EXISTS vocabulary_stats (
+    user_id UUID,
+    language VARCHAR(2),
+    word_count INT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (user_id, language),
+    FOREIGN KEY (user_id) REFERENCES botuser(user_id)
+);
+
+-- Statement-level triggers update every counter once per statement, no matter how many words are inserted.
+-- Rows updated by INSERT ... ON CONFLICT DO UPDATE are not in the transition table of the insert trigger.
+CREATE OR REPLACE FUNCTION vocabulary_stats_on_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO public.vocabulary_stats (user_id, language, word_count)
+    SELECT user_id, language, COUNT(*) FROM inserted_words GROUP BY user_id, language
+    ON CONFLICT (user_id, language) DO UPDATE SET word_count = vocabulary_stats.word_count + excluded.word_count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION vocabulary_stats_on_delete() RETURNS trigger AS $$
+BEGIN
+    UPDATE public.vocabulary_stats AS s
+    SET word_count = s.word_count - d.word_count
+    FROM (SELECT user_id, language, COUNT(*) AS word_count FROM deleted_words GROUP BY user_id, language) AS d
+    WHERE s.user_id = d.user_id AND s.language = d.language;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recounts all vocabularies and fixes counters which have drifted (e.g. after manual changes with triggers
+-- disabled). Writes to vocabulary are blocked while it runs.
+-- Returns the number of fixed counters.
+CREATE OR REPLACE FUNCTION reconcile_vocabulary_stats() RETURNS INT AS $$
+DECLARE
+    fixed INT;
+BEGIN
+    LOCK TABLE public.vocabulary IN SHARE MODE;
+
+    WITH actual AS (
+        SELECT user_id, language, COUNT(*) AS word_count FROM public.vocabulary GROUP BY user_id, language
+    ), drifted AS (
+        SELECT COALESCE(a.user_id, s.user_id) AS user_id,
+               COALESCE(a.language, s.language) AS language,
+               COALESCE(a.word_count, 0) AS word_count
+        FROM actual AS a
+        FULL JOIN public.vocabulary_stats AS s ON a.user_id = s.user_id AND a.language = s.language
+        WHERE a.word_count IS DISTINCT FROM s.word_count AND NOT (a.word_count IS NULL AND s.word_count = 0)
+    )
+    INSERT INTO public.vocabulary_stats (user_id, language, word_count)
+    SELECT user_id, language, word_count FROM drifted
+    ON CONFLICT (user_id, language) DO UPDATE SET word_count = excluded.word_count;
+
+    GET DIAGNOSTICS fixed = ROW_COUNT;
+    RETURN fixed;
+END;
+$$ LANGUAGE plpgsql;
+
+BEGIN;
+-- Triggers and the initial counters should see the same set of words
+LOCK TABLE vocabulary IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS vocabulary_stats_insert ON vocabulary;
+CREATE TRIGGER vocabulary_stats_insert
+    AFTER INSERT ON vocabulary
+    REFERENCING NEW TABLE AS inserted_words
+    FOR EACH STATEMENT EXECUTE FUNCTION vocabulary_stats_on_insert();
+
+DROP TRIGGER IF EXISTS vocabulary_stats_delete ON vocabulary;
+CREATE TRIGGER vocabulary_stats_delete
+    AFTER DELETE ON vocabulary
+    REFERENCING OLD TABLE AS deleted_words
+    FOR EACH STATEMENT EXECUTE FUNCTION vocabulary_stats_on_delete();
+
+SELECT reconcile_vocabulary_stats();
+COMMIT;
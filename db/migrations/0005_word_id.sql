@@ -0,0 +1,24 @@
+-- First step of moving vocabulary to the word_id surrogate key: new columns are added without rewriting
+-- the tables, existing rows are backfilled by 0006_word_id_backfill.py in small batches
+CREATE SEQUENCE IF NOT EXISTS words_word_id_seq AS BIGINT;
+ALTER TABLE words ADD COLUMN IF NOT EXISTS word_id BIGINT;
+-- Default set after the column is added applies to new rows only, so the table is not rewritten
+ALTER TABLE words ALTER COLUMN word_id SET DEFAULT nextval('words_word_id_seq');
+ALTER SEQUENCE words_word_id_seq OWNED BY words.word_id;
+
+ALTER TABLE vocabulary ADD COLUMN IF NOT EXISTS word_id BIGINT;
+
+-- Vocabulary rows written by the running bot during the backfill get their word_id right away
+CREATE OR REPLACE FUNCTION vocabulary_fill_word_id() RETURNS trigger AS $$
+BEGIN
+    IF NEW.word_id IS NULL THEN
+        SELECT w.word_id INTO NEW.word_id FROM public.words AS w WHERE w.word = NEW.word AND w.language = NEW.language;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS vocabulary_fill_word_id ON vocabulary;
+CREATE TRIGGER vocabulary_fill_word_id
+    BEFORE INSERT OR UPDATE ON vocabulary
+    FOR EACH ROW EXECUTE FUNCTION vocabulary_fill_word_id();
@@ -0,0 +1,71 @@
+"""
+Assigns word_id to existing words and vocabulary rows. Tables are walked in primary key order in short
+transactions, so the bot keeps working while the backfill is running.
+"""
+import os
+import time
+
+import psycopg2
+
+BATCH_SIZE = 5000
+
+
+def backfill(connection, table: str, key_columns: str, update: str):
+    """
+    :param key_columns: primary key columns the table is walked by
+    :param update: UPDATE statement filling the rows with primary key from the first to the last key
+        of the batch, {key} and {placeholders} are substituted with the key columns and their placeholders
+    """
+    key = f"({key_columns})"
+    placeholders = "(" + ", ".join(["%s"] * len(key_columns.split(","))) + ")"
+    cur = connection.cursor()
+    position = None
+    updated = 0
+    started = time.monotonic()
+    while True:
+        if position is None:
+            cur.execute(f"SELECT {key_columns} FROM public.{table} ORDER BY {key_columns} LIMIT %s;", (BATCH_SIZE,))
+        else:
+            cur.execute(
+                f"SELECT {key_columns} FROM public.{table} WHERE {key} > {placeholders} "
+                f"ORDER BY {key_columns} LIMIT %s;",
+                (*position, BATCH_SIZE,)
+            )
+        keys = cur.fetchall()
+        if not keys:
+            break
+
+        cur.execute(update.format(key=key, placeholders=placeholders), (*keys[0], *keys[-1],))
+        updated += cur.rowcount
+        connection.commit()
+        position = keys[-1]
+
+    print(f"Backfilled word_id of {updated} {table} rows in {time.monotonic() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    connection = psycopg2.connect(
+        dbname=os.environ["DB_NAME"],
+        user=os.environ["DB_USER"],
+        password=os.environ["DB_PASSWORD"],
+        host=os.environ["DB_HOST"],
+    )
+
+    backfill(
+        connection,
+        "words",
+        "word, language",
+        "UPDATE public.words SET word_id = nextval('public.words_word_id_seq') "
+        "WHERE {key} >= {placeholders} AND {key} <= {placeholders} AND word_id IS NULL;",
+    )
+    backfill(
+        connection,
+        "vocabulary",
+        "user_id, language, word",
+        "UPDATE public.vocabulary AS v SET word_id = w.word_id "
+        "FROM public.words AS w "
+        "WHERE (v.user_id, v.language, v.word) >= {placeholders} "
+        "AND (v.user_id, v.language, v.word) <= {placeholders} "
+        "AND v.word_id IS NULL AND w.word = v.word AND w.language = v.language;",
+    )
+    connection.close()
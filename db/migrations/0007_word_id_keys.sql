@@ -0,0 +1,53 @@
+-- Expand step of moving vocabulary to the word_id surrogate key, all rows have word_id after 0006.
+-- vocabulary is keyed by (user_id, word_id) while vocabulary.word is kept and filled, so the bot released before
+-- word_id and the current one can run against the schema side by side. The word column is dropped by 0009
+-- once every running bot is the current one.
+-- Invalid indexes left by a failed concurrent build would be skipped by IF NOT EXISTS, so they are dropped first
+SELECT 'DROP INDEX CONCURRENTLY ' || indexrelid::regclass
+FROM pg_index
+WHERE indexrelid IN (
+    to_regclass('words_word_id'),
+    to_regclass('vocabulary_user_id_word_id'),
+    to_regclass('vocabulary_user_id_language_word'),
+    to_regclass('vocabulary_user_language_learning_score_last_check_word_id')
+) AND NOT indisvalid
+\gexec
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS words_word_id ON words(word_id);
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS vocabulary_user_id_word_id ON vocabulary(user_id, word_id);
+-- Replaces the old primary key as the conflict target of the previous bot's upsert
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS vocabulary_user_id_language_word ON vocabulary(user_id, language, word);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS vocabulary_user_language_learning_score_last_check_word_id
+    ON vocabulary(user_id, language, learning_score, last_check, word_id);
+
+-- Validated check constraints let SET NOT NULL skip the full table scan under exclusive lock.
+-- They are dropped first, so the file can be run again if validation has stopped it
+ALTER TABLE words DROP CONSTRAINT IF EXISTS words_word_id_not_null;
+ALTER TABLE vocabulary DROP CONSTRAINT IF EXISTS vocabulary_word_id_not_null;
+ALTER TABLE words ADD CONSTRAINT words_word_id_not_null CHECK (word_id IS NOT NULL) NOT VALID;
+ALTER TABLE words VALIDATE CONSTRAINT words_word_id_not_null;
+ALTER TABLE vocabulary ADD CONSTRAINT vocabulary_word_id_not_null CHECK (word_id IS NOT NULL) NOT VALID;
+ALTER TABLE vocabulary VALIDATE CONSTRAINT vocabulary_word_id_not_null;
+
+-- The previous bot writes word only and the current one word_id only, each column is filled from the other
+CREATE OR REPLACE FUNCTION vocabulary_fill_word_id() RETURNS trigger AS $$
+BEGIN
+    IF NEW.word_id IS NULL THEN
+        SELECT w.word_id INTO NEW.word_id FROM public.words AS w WHERE w.word = NEW.word AND w.language = NEW.language;
+    ELSIF NEW.word IS NULL THEN
+        SELECT w.word INTO NEW.word FROM public.words AS w WHERE w.word_id = NEW.word_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+BEGIN;
+ALTER TABLE words ALTER COLUMN word_id SET NOT NULL;
+ALTER TABLE vocabulary ALTER COLUMN word_id SET NOT NULL;
+ALTER TABLE words DROP CONSTRAINT words_word_id_not_null;
+ALTER TABLE vocabulary DROP CONSTRAINT vocabulary_word_id_not_null;
+
+ALTER TABLE vocabulary DROP CONSTRAINT vocabulary_pkey;
+ALTER TABLE vocabulary ADD CONSTRAINT vocabulary_pkey PRIMARY KEY USING INDEX vocabulary_user_id_word_id;
+ALTER TABLE vocabulary ALTER COLUMN word DROP NOT NULL;
+COMMIT;
@@ -0,0 +1,57 @@
+-- Recounting all vocabularies under LOCK TABLE ... SHARE MODE blocked every write to vocabulary for the whole recount.
+-- Vocabularies are now recounted range of users by range, each range in its own short transaction.
+DROP FUNCTION IF EXISTS reconcile_vocabulary_stats();
+
+-- Recounts vocabularies of the next batch_size users after range_start and fixes counters which have drifted.
+-- Returns the last user of the range and the number of fixed counters, no rows once all users are processed.
+CREATE OR REPLACE FUNCTION reconcile_vocabulary_stats(range_start UUID, batch_size INT)
+RETURNS TABLE (range_end UUID, fixed INT) AS $$
+BEGIN
+    SELECT max(u.user_id) INTO range_end
+    FROM (SELECT user_id FROM public.botuser WHERE user_id > range_start ORDER BY user_id LIMIT batch_size) AS u;
+    IF range_end IS NULL THEN
+        RETURN;
+    END IF;
+
+    -- Triggers of concurrent writes to these vocabularies wait for the counters locked here, so every word
+    -- is either counted below or added by its trigger after the recount, never both
+    PERFORM 1 FROM public.vocabulary_stats
+    WHERE user_id > range_start AND user_id <= range_end
+    ORDER BY user_id, language
+    FOR UPDATE;
+
+    WITH actual AS (
+        SELECT user_id, language, COUNT(*) AS word_count
+        FROM public.vocabulary
+        WHERE user_id > range_start AND user_id <= range_end
+        GROUP BY user_id, language
+    ), counters AS (
+        SELECT user_id, language, word_count
+        FROM public.vocabulary_stats
+        WHERE user_id > range_start AND user_id <= range_end
+    ), drifted AS (
+        SELECT COALESCE(a.user_id, s.user_id) AS user_id,
+               COALESCE(a.language, s.language) AS language,
+               COALESCE(a.word_count, 0) AS word_count,
+               s.user_id IS NOT NULL AS has_counter
+        FROM actual AS a
+        FULL JOIN counters AS s ON a.user_id = s.user_id AND a.language = s.language
+        WHERE a.word_count IS DISTINCT FROM s.word_count AND NOT (a.word_count IS NULL AND s.word_count = 0)
+    ), updated AS (
+        UPDATE public.vocabulary_stats AS s
+        SET word_count = d.word_count
+        FROM drifted AS d
+        WHERE d.has_counter AND s.user_id = d.user_id AND s.language = d.language
+        RETURNING 1
+    ), inserted AS (
+        -- Counter created meanwhile by the trigger of a concurrent insert is not locked above, it is left as is
+        INSERT INTO public.vocabulary_stats (user_id, language, word_count)
+        SELECT user_id, language, word_count FROM drifted WHERE NOT has_counter
+        ON CONFLICT (user_id, language) DO NOTHING
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM updated) + (SELECT COUNT(*) FROM inserted) INTO fixed;
+
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,28 @@
+-- Contract step of moving vocabulary to the word_id surrogate key. The bot released before word_id still writes
+-- and reads vocabulary.word, so this is deployed once no such bot is running (see deploy_migrations.py).
+-- words is keyed by word_id, (word, language) stays unique, and vocabulary refers to words by word_id only.
+SELECT 'DROP INDEX CONCURRENTLY ' || indexrelid::regclass
+FROM pg_index
+WHERE indexrelid = to_regclass('words_word_language') AND NOT indisvalid
+\gexec
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS words_word_language ON words(word, language);
+
+BEGIN;
+DROP TRIGGER vocabulary_fill_word_id ON vocabulary;
+DROP FUNCTION vocabulary_fill_word_id();
+
+ALTER TABLE vocabulary DROP CONSTRAINT vocabulary_word_language_fkey;
+ALTER TABLE words DROP CONSTRAINT words_pkey;
+ALTER TABLE words ADD CONSTRAINT words_pkey PRIMARY KEY USING INDEX words_word_id;
+ALTER TABLE words ADD CONSTRAINT words_word_language UNIQUE USING INDEX words_word_language;
+-- Existing rows are checked after the swap without blocking writes
+ALTER TABLE vocabulary ADD CONSTRAINT vocabulary_word_id_fkey
+    FOREIGN KEY (word_id) REFERENCES words(word_id) NOT VALID;
+
+-- Also drops vocabulary_user_id_language_word and vocabulary_user_language_learning_score_last_check_word,
+-- which are replaced by the primary key and the word_id keyset index
+ALTER TABLE vocabulary DROP COLUMN word;
+COMMIT;
+
+ALTER TABLE vocabulary VALIDATE CONSTRAINT vocabulary_word_id_fkey;
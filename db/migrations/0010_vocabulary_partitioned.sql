@@ -0,0 +1,60 @@
+-- First step of partitioning vocabulary by user: every vocabulary query is scoped to one user, so it only
+-- touches one partition, and vacuum and index maintenance work on partitions of manageable size.
+-- Existing rows are moved by 0011_vocabulary_partitioned_move.batch.sql, tables are swapped by 0012.
+-- The new table has no word column, so partitioning follows the contract migration 0009 which drops it.
+CREATE TABLE IF NOT EXISTS vocabulary_partitioned (
+    word_id BIGINT NOT NULL,
+    language VARCHAR(2),
+    user_id UUID NOT NULL,
+    learning_score INT,
+    last_check TIMESTAMP DEFAULT (now() at time zone 'utc'),
+
+    PRIMARY KEY (user_id, word_id),
+    FOREIGN KEY (user_id) REFERENCES botuser(user_id),
+    FOREIGN KEY (word_id) REFERENCES words(word_id)
+) PARTITION BY HASH (user_id);
+
+DO $$
+BEGIN
+    FOR remainder IN 0..15 LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS vocabulary_p%s PARTITION OF vocabulary_partitioned '
+            'FOR VALUES WITH (MODULUS 16, REMAINDER %s);',
+            lpad(remainder::text, 2, '0'), remainder
+        );
+    END LOOP;
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS vocabulary_partitioned_keyset
+    ON vocabulary_partitioned(user_id, language, learning_score, last_check, word_id);
+
+-- Last key of vocabulary moved by the batch migration
+CREATE TABLE IF NOT EXISTS vocabulary_move_progress (
+    user_id UUID NOT NULL,
+    word_id BIGINT NOT NULL
+);
+INSERT INTO vocabulary_move_progress (user_id, word_id)
+SELECT '00000000-0000-0000-0000-000000000000', 0
+WHERE NOT EXISTS (SELECT 1 FROM vocabulary_move_progress);
+
+-- Words saved by the running bot while rows are moved are written to both tables
+CREATE OR REPLACE FUNCTION vocabulary_dual_write() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM public.vocabulary_partitioned WHERE user_id = OLD.user_id AND word_id = OLD.word_id;
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO public.vocabulary_partitioned (word_id, language, user_id, learning_score, last_check)
+    VALUES (NEW.word_id, NEW.language, NEW.user_id, NEW.learning_score, NEW.last_check)
+    ON CONFLICT (user_id, word_id) DO UPDATE
+    SET learning_score = excluded.learning_score, last_check = excluded.last_check;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS vocabulary_dual_write ON vocabulary;
+CREATE TRIGGER vocabulary_dual_write
+    AFTER INSERT OR UPDATE OR DELETE ON vocabulary
+    FOR EACH ROW EXECUTE FUNCTION vocabulary_dual_write();
@@ -0,0 +1,16 @@
+-- Moves the next 10000 vocabulary rows in primary key order, repeated by deploy_migrations.py until no rows are left.
+-- Rows already written by the dual-write trigger are newer, so they are kept as they are, but still counted.
+WITH batch AS (
+    SELECT v.word_id, v.language, v.user_id, v.learning_score, v.last_check
+    FROM public.vocabulary AS v, public.vocabulary_move_progress AS p
+    WHERE (v.user_id, v.word_id) > (p.user_id, p.word_id)
+    ORDER BY v.user_id, v.word_id
+    LIMIT 10000
+), progress AS (
+    UPDATE public.vocabulary_move_progress AS p
+    SET user_id = last.user_id, word_id = last.word_id
+    FROM (SELECT user_id, word_id FROM batch ORDER BY user_id DESC, word_id DESC LIMIT 1) AS last
+)
+INSERT INTO public.vocabulary_partitioned (word_id, language, user_id, learning_score, last_check)
+SELECT word_id, language, user_id, learning_score, last_check FROM batch
+ON CONFLICT (user_id, word_id) DO UPDATE SET learning_score = vocabulary_partitioned.learning_score;
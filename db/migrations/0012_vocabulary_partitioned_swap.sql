@@ -0,0 +1,39 @@
+-- Last step of partitioning vocabulary, all rows are in vocabulary_partitioned after 0011.
+-- A word deleted while its row was being moved could be moved back, but the bot never deletes words.
+BEGIN;
+LOCK TABLE vocabulary IN ACCESS EXCLUSIVE MODE;
+
+-- The swap is skipped if it has been committed by a run which failed later, so the file can be run again
+DO $$
+BEGIN
+    IF to_regclass('public.vocabulary_partitioned') IS NULL THEN
+        RAISE NOTICE 'vocabulary is already partitioned';
+        RETURN;
+    END IF;
+
+    DROP TRIGGER vocabulary_dual_write ON vocabulary;
+    DROP FUNCTION vocabulary_dual_write();
+    DROP TABLE vocabulary;
+    DROP TABLE vocabulary_move_progress;
+
+    ALTER TABLE vocabulary_partitioned RENAME TO vocabulary;
+    ALTER TABLE vocabulary RENAME CONSTRAINT vocabulary_partitioned_pkey TO vocabulary_pkey;
+    ALTER TABLE vocabulary RENAME CONSTRAINT vocabulary_partitioned_user_id_fkey TO vocabulary_user_id_fkey;
+    ALTER TABLE vocabulary RENAME CONSTRAINT vocabulary_partitioned_word_id_fkey TO vocabulary_word_id_fkey;
+    ALTER INDEX vocabulary_partitioned_keyset RENAME TO vocabulary_user_language_learning_score_last_check_word_id;
+
+    -- Statement-level triggers of the partitioned table see the rows of all partitions in their transition tables
+    CREATE TRIGGER vocabulary_stats_insert
+        AFTER INSERT ON vocabulary
+        REFERENCING NEW TABLE AS inserted_words
+        FOR EACH STATEMENT EXECUTE FUNCTION vocabulary_stats_on_insert();
+
+    CREATE TRIGGER vocabulary_stats_delete
+        AFTER DELETE ON vocabulary
+        REFERENCING OLD TABLE AS deleted_words
+        FOR EACH STATEMENT EXECUTE FUNCTION vocabulary_stats_on_delete();
+END
+$$;
+COMMIT;
+
+ANALYZE vocabulary;
@@ -0,0 +1,5 @@
+#!/bin/bash
+
+# Pre-translates UI strings of the bot into all supported languages.
+# Requires running translation services and Redis configured in the given config file.
+cd ./src && python3 -m language_bot.build_ui_catalog "${1:-../config.json}" "${@:2}"
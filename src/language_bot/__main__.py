@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import sys
+from telegram import Update
+from telegram.ext import (Application, ApplicationBuilder, CommandHandler, ContextTypes, MessageHandler,
+                          ChatMemberHandler, CallbackQueryHandler, StringCommandHandler)
+
+from .common.config import Config, init_config
+from .translators import init_translation_service
+from .session.session import (Session, get_session, save_session, discard_session, init_sessions, close_sessions,
+                              session_stats)
+from .common.identity_cache import IDENTITIES
+from .common.database import Database, DatabaseUnavailable, AsyncCursor
+from .service_context import ServiceContext
+from .chatbots.gpt4all_bot import GPT4AllService
+from .common.metrics import register_stats, report_stats
+from .common.queries import query_stats
+from .common.update_scheduler import UpdateScheduler
+from .common.webhook_server import WebhookServer, run_webhook
+from .common.telegram_request import SideEffectTrackingRequest
+from .vocabulary import reconcile_vocabulary_stats
+
+logLevels = {
+    "CRITICAL": logging.CRITICAL,
+    "ERROR": logging.ERROR,
+    "WARNING": logging.WARNING,
+    "INFO": logging.INFO,
+    "DEBUG": logging.DEBUG
+}
+
+DATABASE_DEGRADED_MESSAGE = "Service is temporarily unavailable, please try again in a minute"
+
+config: Config = init_config(sys.argv[1])
+logging.basicConfig(level=logLevels.get(config.LOG_LEVEL))
+logger = logging.getLogger(__name__)
+logger.info("Starting Language Bot")
+database = Database(config)
+init_sessions(config)
+IDENTITIES.configure(max_size=config.IDENTITY_CACHE_SIZE, ttl=config.IDENTITY_CACHE_TTL)
+translation_service=init_translation_service(config, database)
+gpt4all_service = GPT4AllService()
+register_stats("translation_service", translation_service.get_stats)
+register_stats("database", database.stats)
+register_stats("queries", query_stats)
+register_stats("sessions", session_stats)
+register_stats("identities", IDENTITIES.stats)
+# An update holds a connection while translation memory checks out one more. Once the pool is exhausted they wait
+# at most DB_POOL_TIMEOUT for a connection, translation memory is skipped then and updates fail
+if config.MAX_CONCURRENT_UPDATES >= config.DB_POOL_MAX_SIZE:
+    logger.warning(
+        f"MAX_CONCURRENT_UPDATES ({config.MAX_CONCURRENT_UPDATES}) is not below DB_POOL_MAX_SIZE "
+        f"({config.DB_POOL_MAX_SIZE}), updates may wait up to {config.DB_POOL_TIMEOUT}s for a database connection"
+    )
+update_scheduler: UpdateScheduler[int] = UpdateScheduler(config.MAX_CONCURRENT_UPDATES)
+register_stats("updates", update_scheduler.stats)
+
+
+def bot_event_handler(method_name):
+    async def process(update: Update, context: ContextTypes.DEFAULT_TYPE, cur: AsyncCursor) -> Session:
+        session = await get_session(
+            platform="tg",
+            platform_user_id=str(update.effective_user.id),
+            chatbot_service=gpt4all_service,
+            cur=cur
+        )
+        try:
+            await getattr(session, method_name)(
+                ServiceContext(
+                    update=update,
+                    context=context,
+                    translation_service=translation_service,
+                    cur=cur,
+                )
+            )
+        except DatabaseUnavailable:
+            # The handler may have changed the session half way, the retry starts from a fresh one
+            discard_session("tg", str(update.effective_user.id))
+            raise
+        return session
+
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        # Updates are dispatched concurrently, but session of the user changes one update at a time
+        async with update_scheduler.slot(update.effective_user.id):
+            # Each update gets its own connection and transaction, rolled back if the handler fails
+            try:
+                session = await database.run(lambda cur: process(update, context, cur), kind="update")
+            except DatabaseUnavailable as e:
+                logger.warning(f"Update {update.update_id} not processed: {e}")
+                # Commit may have failed after the session has been changed
+                discard_session("tg", str(update.effective_user.id))
+                if update.effective_message:
+                    await update.effective_message.reply_text(DATABASE_DEGRADED_MESSAGE)
+                return
+
+            # Saved after commit, so that the stored state never refers to changes which have been rolled back
+            await save_session(session)
+
+    return wrapper
+
+
+async def vocabulary_stats_reconciliation(interval: float, batch_size: int):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            fixed = await database.run(
+                lambda cur: reconcile_vocabulary_stats(cur, batch_size),
+                retries=0,
+                kind="vocabulary_stats",
+            )
+        except Exception as e:
+            logger.warning(f"Vocabulary stats reconciliation failed: {e}")
+            continue
+
+        if fixed is None:
+            logger.info("Vocabulary stats are being reconciled by another process")
+        elif fixed > 0:
+            logger.warning(f"Fixed {fixed} drifted vocabulary word counters")
+
+
+async def on_startup(application: Application):
+    await translation_service.start()
+    if config.STATS_REPORT_INTERVAL > 0:
+        application.create_task(report_stats(config.STATS_REPORT_INTERVAL))
+    if config.VOCABULARY_STATS_RECONCILE_INTERVAL > 0:
+        application.create_task(vocabulary_stats_reconciliation(
+            config.VOCABULARY_STATS_RECONCILE_INTERVAL,
+            config.VOCABULARY_STATS_RECONCILE_BATCH,
+        ))
+
+
+async def on_shutdown(_):
+    await translation_service.close()
+    await close_sessions()
+    gpt4all_service.close()
+    database.close()
+
+
+telegram_app = (ApplicationBuilder()
+                .token(config.TG_API_KEY)
+                # Pool size ApplicationBuilder uses by default
+                .request(SideEffectTrackingRequest(connection_pool_size=256))
+                .concurrent_updates(config.MAX_PENDING_UPDATES)
+                .post_init(on_startup)
+                .post_shutdown(on_shutdown)
+                .build())
+telegram_app.add_handler(CommandHandler(command="start", callback=bot_event_handler("start_command_handler")))
+telegram_app.add_handler(CommandHandler(command="menu", callback=bot_event_handler("menu_command_handler")))
+telegram_app.add_handler(MessageHandler(filters=None, callback=bot_event_handler("message_handler")))
+telegram_app.add_handler(CallbackQueryHandler(callback=bot_event_handler("callback_query_handler")))
+
+logger.info("Starting Telegram Bot...")
+if config.UPDATE_MODE == "webhook":
+    if config.WEBHOOK_URL is None:
+        raise RuntimeError("WEBHOOK_URL is required in webhook mode")
+
+    webhook_server = WebhookServer(
+        application=telegram_app,
+        listen=config.WEBHOOK_LISTEN,
+        port=config.WEBHOOK_PORT,
+        path=config.WEBHOOK_PATH,
+        secret_token=config.WEBHOOK_SECRET_TOKEN,
+    )
+    register_stats("webhook", webhook_server.stats)
+    asyncio.run(run_webhook(telegram_app, webhook_server, config.WEBHOOK_URL, config.WEBHOOK_MAX_CONNECTIONS))
+else:
+    telegram_app.run_polling()
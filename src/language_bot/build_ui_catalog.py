@@ -0,0 +1,76 @@
+import asyncio
+import glob
+import logging
+import os
+import sys
+
+from .common.config import init_config
+from .common.database import Database
+from .translators import init_translation_service
+from .translators.translation_service_interface import TranslationServiceInterface
+from .translators.ui_catalog import (UiCatalog, UI_LANGUAGE, DEFAULT_UI_CATALOG_PATH, extract_ui_strings,
+                                     expand_templates, get_placeholders)
+
+
+logger = logging.getLogger(__name__)
+SESSION_SOURCES = os.path.join(os.path.dirname(__file__), "session", "*.py")
+
+
+async def build_ui_catalog(
+        translation_service: TranslationServiceInterface,
+        concurrency: int = 16,
+) -> UiCatalog:
+    templates = extract_ui_strings(sorted(glob.glob(SESSION_SOURCES)))
+    target_languages = [
+        language for language in translation_service.get_supported_target_languages() if language != UI_LANGUAGE
+    ]
+    keys = expand_templates(templates, translation_service.get_supported_target_languages())
+    logger.info(f"Found {len(templates)} UI strings ({len(keys)} after expansion), "
+                f"{len(target_languages)} target languages")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    catalog = UiCatalog()
+
+    async def translate_key(key: str, target_language: str):
+        async with semaphore:
+            try:
+                translation = await translation_service.translate(
+                    source_text=key,
+                    source_language=UI_LANGUAGE,
+                    target_language=target_language,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to translate '{key}' into {target_language}: {e}")
+                return
+
+        # Translator may damage placeholders, such entries are left to be translated at runtime
+        if get_placeholders(translation.target_text) != get_placeholders(key):
+            logger.warning(f"Placeholders lost in translation of '{key}' into {target_language}")
+            return
+
+        catalog.translations.setdefault(target_language, {})[key] = translation.target_text
+
+    await asyncio.gather(*[
+        translate_key(key, target_language) for target_language in target_languages for key in keys
+    ])
+    return catalog
+
+
+async def main(config_filename: str, output_path: str):
+    config = init_config(config_filename)
+    database = Database(config)
+    translation_service = init_translation_service(config, database)
+    try:
+        await translation_service.refresh_capabilities()
+        catalog = await build_ui_catalog(translation_service)
+    finally:
+        await translation_service.close()
+        database.close()
+
+    catalog.save(output_path)
+    logger.info(f"Saved {len(catalog)} UI translations to {output_path}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else DEFAULT_UI_CATALOG_PATH))
@@ -1,9 +1,21 @@
 
+import asyncio
+
+
 class ChatbotSession:
     def prompt(self, request: str) -> str:
         raise RuntimeError("ChatbotSession.prompt")
 
+    async def prompt_async(self, request: str) -> str:
+        """
+        prompt() which doesn't block the event loop
+        """
+        return await asyncio.to_thread(self.prompt, request)
+
 
 class ChatbotServiceInterface:
     def start_session(self, system_prompt: str | None) -> ChatbotSession:
         raise RuntimeError("ChatbotServiceInterface.start_session")
+
+    def close(self):
+        pass
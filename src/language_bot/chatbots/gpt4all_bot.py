@@ -1,5 +1,8 @@
 from gpt4all import GPT4All
+import asyncio
+import concurrent.futures
 import logging
+import threading
 
 from .chatbot_service_interface import ChatbotSession, ChatbotServiceInterface
 
@@ -8,12 +11,20 @@ logger = logging.getLogger(__name__)
 
 
 class GPT4AllSession(ChatbotSession):
-    def __init__(self, model: GPT4All):
+    def __init__(self, model: GPT4All, lock: threading.Lock, executor: concurrent.futures.ThreadPoolExecutor):
         self.model = model
+        self.lock = lock
+        self.executor = executor
 
     def prompt(self, request: str) -> str:
-        with self.model.chat_session():
-            return self.model.generate(prompt=request, temp=0)
+        # The model is shared by all sessions and prompts may come from several worker threads
+        with self.lock:
+            with self.model.chat_session():
+                return self.model.generate(prompt=request, temp=0)
+
+    async def prompt_async(self, request: str) -> str:
+        # Queued prompts wait in the model's own thread, not in the default executor shared with database work
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.prompt, request)
 
 
 class GPT4AllService(ChatbotServiceInterface):
@@ -23,6 +34,12 @@ class GPT4AllService(ChatbotServiceInterface):
             device='gpu' if not device else device,
             n_ctx=4096,
         )
+        self.lock = threading.Lock()
+        # The model generates one response at a time anyway
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="gpt4all")
 
     def start_session(self, system_prompt: str | None) -> ChatbotSession:
-        return GPT4AllSession(self.model)
+        return GPT4AllSession(self.model, self.lock, self.executor)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,109 @@
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar, Hashable, Tuple, Dict, Any
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Bounded in-process cache with least-recently-used eviction and optional time-to-live for entries.
+    Not thread-safe: intended to be used from the event loop thread only.
+    """
+
+    def __init__(self, max_size: int, ttl: float | None = None, sliding: bool = False):
+        """
+        :param max_size: maximum number of entries kept in the cache
+        :param ttl: lifetime of the entry in seconds, None - entries live until evicted
+        :param sliding: whether every read extends the lifetime of the entry, so that ttl is the idle timeout
+        """
+        if max_size <= 0:
+            raise RuntimeError(f"LRUCache size should be positive, got {max_size}")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sliding = sliding
+        self._entries: OrderedDict[K, Tuple[float | None, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key: K, default: Any = None, count: bool = True) -> V | Any:
+        entry = self._entries.get(key, None)
+        if entry is not None:
+            expires_at, value = entry
+            now = time.monotonic()
+            if expires_at is None or expires_at > now:
+                if self.sliding and self.ttl is not None:
+                    self._entries[key] = (now + self.ttl, value)
+                self._entries.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return value
+
+            del self._entries[key]
+            self.expirations += 1
+
+        if count:
+            self.misses += 1
+        return default
+
+    def put(self, key: K, value: V):
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+        self.purge_expired()
+
+    def purge_expired(self):
+        """
+        Drops expired entries from the least recently used end, so that idle entries
+        don't hold memory until they are evicted
+        """
+        now = time.monotonic()
+        while self._entries:
+            expires_at, _ = next(iter(self._entries.values()))
+            if expires_at is None or expires_at > now:
+                break
+
+            self._entries.popitem(last=False)
+            self.expirations += 1
+
+    def pop(self, key: K, default: Any = None) -> V | Any:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+
+        return entry[1]
+
+    def items(self):
+        return [(key, entry[1]) for key, entry in self._entries.items()]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -1,11 +1,15 @@
 from pydantic import BaseModel, AnyUrl
-from typing import Literal, List
+from typing import Literal, List, Optional
 import os
 
 
 class TranslationServiceConfig(BaseModel):
     type: Literal["libretranslate"]
     url: AnyUrl
+    # Deadline for a single request to the service (seconds)
+    timeout: float = 10.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
 
 
 class Config(BaseModel):
@@ -15,11 +19,93 @@ class Config(BaseModel):
     DB_USER: str
     DB_PASSWORD: str
     DB_HOST: str
+    # Bounds of the Postgres connection pool, every update being processed holds one connection
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    # Idle connections beyond DB_POOL_MIN_SIZE are closed once unused for this long (seconds)
+    DB_POOL_IDLE_TIMEOUT: float = 300
+    # Time limit (seconds) of establishing a connection, so that an unreachable host fails fast
+    DB_CONNECT_TIMEOUT: int = 5
+    # Unit of work waits at most this (seconds) for a free connection of the pool
+    DB_POOL_TIMEOUT: float = 10
+    # Connections idle longer than this (seconds) are checked with a trivial query before use
+    DB_HEALTH_CHECK_INTERVAL: float = 30
+    # Once connection is lost, reconnect attempts are made with exponential backoff between these delays (seconds)
+    DB_RECONNECT_BASE_DELAY: float = 0.5
+    DB_RECONNECT_MAX_DELAY: float = 30
+    # Update whose connection was lost before it has written anything or replied to the user is processed again
+    # at most DB_RETRIES times, each retry waits at most DB_RETRY_TIMEOUT seconds for the connection to be restored
+    DB_RETRIES: int = 2
+    DB_RETRY_TIMEOUT: float = 5
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_USERNAME: str
     REDIS_PASSWORD: str
     TG_API_KEY: str
+    # Size and entry lifetime (seconds) of the in-process translation cache in front of Redis
+    TRANSLATION_CACHE_SIZE: int = 10000
+    TRANSLATION_CACHE_TTL: float = 3600
+    # Keep translations of single words and UI strings in Postgres forever, behind the expiring Redis cache
+    TRANSLATION_MEMORY: bool = True
+    # Cached translations longer than this (bytes) are stored in Redis compressed, 0 - compression is disabled
+    TRANSLATION_CACHE_COMPRESSION_THRESHOLD: int = 256
+    # Lifetime (seconds) of the Redis lock preventing several bot processes from requesting the same
+    # translation simultaneously, 0 - lock is disabled
+    TRANSLATION_LOCK_TIMEOUT: float = 0
+    # Translation instances are probed every TRANSLATION_HEALTH_CHECK_INTERVAL seconds (0 - disabled).
+    # After TRANSLATION_FAILURE_THRESHOLD consecutive failures an instance gets no requests
+    # for TRANSLATION_CIRCUIT_RESET_TIMEOUT seconds.
+    TRANSLATION_HEALTH_CHECK_INTERVAL: float = 10
+    TRANSLATION_FAILURE_THRESHOLD: int = 5
+    TRANSLATION_CIRCUIT_RESET_TIMEOUT: float = 30
+    # Delay (seconds) after which slow translation request is duplicated to another instance, None - disabled
+    TRANSLATION_HEDGE_DELAY: Optional[float] = None
+    # Supported language pairs of all translators are persisted in this file and used on the next start,
+    # they are refreshed every TRANSLATION_SNAPSHOT_REFRESH_INTERVAL seconds (0 - only at startup)
+    TRANSLATION_SNAPSHOT_PATH: str = "translators_snapshot.json"
+    TRANSLATION_SNAPSHOT_REFRESH_INTERVAL: float = 3600
+    # Answer confident language detection requests with in-process n-gram detector
+    LOCAL_LANGUAGE_DETECTION: bool = True
+    # Pre-translated UI strings produced by build_ui_catalog, None - default location inside the package
+    UI_CATALOG_PATH: Optional[str] = None
+    # Interval (seconds) of dumping internal counters into the log, 0 - disabled
+    STATS_REPORT_INTERVAL: float = 300
+    # Interval (seconds) of recounting vocabularies to fix drifted word counters, 0 - disabled.
+    # Vocabularies are recounted for VOCABULARY_STATS_RECONCILE_BATCH users per transaction
+    VOCABULARY_STATS_RECONCILE_INTERVAL: float = 86400
+    VOCABULARY_STATS_RECONCILE_BATCH: int = 1000
+    # Maximum number of user sessions kept in memory, the least recently active are evicted first
+    SESSION_STORE_SIZE: int = 10000
+    # Time (seconds) since the last update after which the session is dropped.
+    # Evicted sessions are rebuilt on the next update starting from the main menu
+    SESSION_IDLE_TTL: float = 3600
+    # Maximum number of external users and bot users (and ids known to be absent) cached in memory
+    IDENTITY_CACHE_SIZE: int = 20000
+    # Time (seconds) after which cached users are read from the database again
+    IDENTITY_CACHE_TTL: float = 3600
+    # Number of sessions measured to estimate memory used by sessions
+    SESSION_SIZE_SAMPLE: int = 100
+    # Where session states live between updates: "memory" - in the bot process,
+    # "redis" - in Redis, so that several bot processes can serve the same users and restarts keep sessions
+    SESSION_STORE: Literal["memory", "redis"] = "memory"
+    # Maximum number of updates processed at the same time, updates of the same user are always processed in order.
+    # Updates beyond DB_POOL_MAX_SIZE - 1 wait for a database connection, at most DB_POOL_TIMEOUT
+    MAX_CONCURRENT_UPDATES: int = 32
+    # Maximum number of updates received from Telegram and not processed yet, including those waiting
+    # for the previous update of the same user
+    MAX_PENDING_UPDATES: int = 1024
+    # How updates are received: "polling" - the bot requests them from Telegram,
+    # "webhook" - Telegram sends them to the embedded HTTP server
+    UPDATE_MODE: Literal["polling", "webhook"] = "polling"
+    # Public HTTPS address of the webhook, requests to it should be proxied to WEBHOOK_LISTEN:WEBHOOK_PORT
+    WEBHOOK_URL: Optional[str] = None
+    WEBHOOK_LISTEN: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8443
+    WEBHOOK_PATH: str = "/telegram"
+    # Telegram sends it with every update, requests without it are rejected
+    WEBHOOK_SECRET_TOKEN: Optional[str] = None
+    # Maximum number of connections Telegram opens to deliver updates concurrently (1-100)
+    WEBHOOK_MAX_CONNECTIONS: int = 40
 
 
 def init_config(config_filename: str) -> Config:
@@ -1,59 +1,516 @@
+import asyncio
+import contextlib
+import contextvars
 import logging
+import random
+import threading
+import time
+from typing import AsyncIterator, Dict, Any, Iterator, Tuple, List, Sequence, Callable, Awaitable, TypeVar, Set
 
 from .config import Config
+from .queries import Query
 import psycopg2
 import psycopg2.extras
-from psycopg2.extensions import cursor
-from time import sleep
+from psycopg2.extensions import cursor, connection
 
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+class DatabaseUnavailable(RuntimeError):
+    """
+    Connection to Postgres is lost, the database is degraded until the reconnect supervisor restores it
+    """
+    pass
+
+
+class ConnectionPoolExhausted(DatabaseUnavailable):
+    """
+    No connection of the pool has been released within DB_POOL_TIMEOUT
+    """
+    pass
+
+
+class Connection(connection):
+    """
+    Remembers statements prepared on this connection
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: Set[str] = set()
+
+
+class AsyncCursor:
+    """
+    Awaitable facade of psycopg2 cursor: statements are executed in a worker thread, so the event loop
+    keeps serving other updates while Postgres is working. The result set is transferred to the client
+    by execute(), so fetching rows doesn't block
+    """
+
+    def __init__(self, cur: cursor):
+        self._cur = cur
+        self._after_commit: List[Callable[[], None]] = []
+
+    def after_commit(self, callback: Callable[[], None]):
+        """
+        Defers the callback until the unit of work is committed, it is dropped if the unit of work is rolled back.
+        Used to publish changes to in-process caches shared with other units of work
+        """
+        self._after_commit.append(callback)
+
+    def _committed(self):
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    async def execute(self, query: str, params: Sequence[Any] | Dict[str, Any] | None = None):
+        await asyncio.to_thread(self._cur.execute, query, params)
+
+    async def executemany(self, query: str, params_seq: Sequence[Sequence[Any]]):
+        await asyncio.to_thread(self._cur.executemany, query, params_seq)
+
+    def _run(self, query: Query, params: Sequence[Any]):
+        if not query.prepare:
+            self._cur.execute(query.sql, params)
+            return
+
+        prepared = self._cur.connection.prepared
+        if query.name not in prepared:
+            self._cur.execute(query.prepare_sql)
+            prepared.add(query.name)
+
+        self._cur.execute(query.execute_sql, params)
+
+    async def run(self, query: Query, params: Sequence[Any] = ()):
+        """
+        Executes registered query, its statement is prepared on the first use on this connection
+        """
+        started = time.perf_counter()
+        failed = True
+        try:
+            await asyncio.to_thread(self._run, query, params)
+            failed = False
+        finally:
+            query.record(time.perf_counter() - started, failed)
+
+    def fetchone(self) -> Tuple | None:
+        return self._cur.fetchone()
+
+    def fetchall(self) -> List[Tuple]:
+        return self._cur.fetchall()
+
+    @property
+    def rowcount(self) -> int:
+        return self._cur.rowcount
+
+    def __iter__(self) -> Iterator[Tuple]:
+        return iter(self._cur)
+
+
+class LazyCursor(AsyncCursor):
+    """
+    Cursor of a unit of work which may not need the database at all. Connection is checked out
+    on the first statement, read-only queries are executed in autocommit mode and the transaction
+    is only started by the first statement which may write
+    """
+
+    def __init__(self, database: "Database", stack: contextlib.AsyncExitStack):
+        super().__init__(None)
+        self._database = database
+        self._stack = stack
+        self._conn: connection | None = None
+        self.written = False
+        # set once the unit of work has done something outside the database, e.g. sent a message
+        self.side_effects = False
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    @property
+    def retryable(self) -> bool:
+        """
+        Unit of work may be repeated from scratch only if nothing it has done can be observed
+        """
+        return not self.written and not self.side_effects
+
+    def _reset(self):
+        # Connections are kept in the pool in transactional mode
+        if not self._conn.closed:
+            self._conn.autocommit = False
+
+    async def _prepare(self, readonly: bool):
+        if self._conn is None:
+            self._conn = await self._stack.enter_async_context(self._database.connection())
+            self._conn.autocommit = True
+            self._stack.callback(self._reset)
+            self._cur = self._stack.enter_context(self._conn.cursor())
+
+        if not readonly and not self.written:
+            # psycopg2 begins a transaction before the next statement
+            self._conn.autocommit = False
+            self.written = True
+
+    async def execute(self, query: str, params: Sequence[Any] | Dict[str, Any] | None = None):
+        await self._prepare(readonly=False)
+        await super().execute(query, params)
+
+    async def executemany(self, query: str, params_seq: Sequence[Sequence[Any]]):
+        await self._prepare(readonly=False)
+        await super().executemany(query, params_seq)
+
+    async def run(self, query: Query, params: Sequence[Any] = ()):
+        await self._prepare(readonly=query.readonly)
+        await super().run(query, params)
+
+    async def commit(self):
+        if self.written:
+            await asyncio.to_thread(self._conn.commit)
+
+    async def rollback(self):
+        if self.written and not self._conn.closed:
+            await asyncio.to_thread(self._conn.rollback)
+
+
+# Unit of work being run by Database.run() in the current task
+CURRENT_UNIT_OF_WORK: contextvars.ContextVar[LazyCursor | None] = contextvars.ContextVar(
+    "CURRENT_UNIT_OF_WORK",
+    default=None,
+)
+
+
+def mark_side_effect():
+    """
+    Tells that the current unit of work has changed something outside the database, so it is not retried
+    """
+    cur = CURRENT_UNIT_OF_WORK.get()
+    if cur is not None:
+        cur.side_effects = True
+
 
 class Database:
-    _conn: any = None
-    _config: Config
+    """
+    Pool of Postgres connections. Every unit of work checks out its own connection,
+    so transactions of different updates never interfere
+    """
 
     def __init__(self, config: Config):
         self._config = config
         psycopg2.extras.register_uuid()
-        self._reconnect()
+        logger.info("Initializing Database connection pool...")
+        self._min_size = config.DB_POOL_MIN_SIZE
+        self._max_size = config.DB_POOL_MAX_SIZE
+        self._idle_timeout = config.DB_POOL_IDLE_TIMEOUT
+        self._health_check_interval = config.DB_HEALTH_CHECK_INTERVAL
+        # Waiting for a free connection is done here, the pool itself never blocks
+        self._semaphore = asyncio.Semaphore(config.DB_POOL_MAX_SIZE)
+        self._pool_timeout = config.DB_POOL_TIMEOUT
+        # maps id of connection -> time it was returned to the pool
+        self._released: Dict[int, float] = {}
+        # psycopg2's pool closes every connection returned while it holds minconn idle ones, so under load
+        # most checkouts would connect anew. Idle connections are kept here instead, most recently used last
+        self._idle: List[connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.connections_opened = 0
+        self.connections_closed = 0
+        for _ in range(self._min_size):
+            conn = self._connect()
+            self._released[id(conn)] = time.monotonic()
+            self._idle.append(conn)
+        self.in_use = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.pool_timeouts = 0
+        self.health_check_failures = 0
+
+        self._reconnect_base_delay = config.DB_RECONNECT_BASE_DELAY
+        self._reconnect_max_delay = config.DB_RECONNECT_MAX_DELAY
+        self._retries = config.DB_RETRIES
+        self._retry_timeout = config.DB_RETRY_TIMEOUT
+        self._supervisor: asyncio.Task | None = None
+        self._recovered = asyncio.Event()
+        self._recovered.set()
+        self.degraded = False
+        self.outages = 0
+        self.reconnect_attempts = 0
+        self.retries = 0
+        self.rejected = 0
+        # maps kind of unit of work -> [units, units which have executed statements, units which have written]
+        self.units_of_work: Dict[str, List[int]] = {}
+
+    def _check(self, conn: connection) -> bool:
+        if conn.closed:
+            return False
+
+        # Connections which have been idle for a while may have been dropped by the server or network
+        released = self._released.get(id(conn), None)
+        if released is None or time.monotonic() - released < self._health_check_interval:
+            return True
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            logger.info(f"{e} - Database connection will be reset")
+            return False
+
+    def _connect(self) -> connection:
+        conn = psycopg2.connect(
+            dbname=self._config.DB_NAME,
+            user=self._config.DB_USER,
+            password=self._config.DB_PASSWORD,
+            host=self._config.DB_HOST,
+            connect_timeout=self._config.DB_CONNECT_TIMEOUT,
+            connection_factory=Connection,
+        )
+        self.connections_opened += 1
+        return conn
+
+    def _discard(self, conn: connection):
+        self._released.pop(id(conn), None)
+        self.connections_closed += 1
+        if not conn.closed:
+            conn.close()
+
+    def _checkout(self) -> connection:
+        # After an outage every idle connection may be dead, each one is dropped until a live or new one is found.
+        # New connections are not in _released and aren't checked, so this ends once idle connections are exhausted
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+            if self._check(conn):
+                return conn
+
+            self.health_check_failures += 1
+            self._discard(conn)
 
-    def _reconnect(self):
-        logger.info("Initializing Database connection...")
-        # Close old connection
-        if self._conn:
-            self._conn.close()
+    def _release(self, conn: connection):
+        if self._closed or conn.closed:
+            self._discard(conn)
+            return
 
-        # Reconnect
-        self._conn = psycopg2.connect(
+        status = conn.info.transaction_status
+        if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+            self._discard(conn)
+            return
+        if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+
+        now = time.monotonic()
+        self._released[id(conn)] = now
+        expired = []
+        with self._lock:
+            self._idle.append(conn)
+            # Only connections beyond the minimum size which have not been used for a while are closed
+            while len(self._idle) > self._min_size and now - self._released[id(self._idle[0])] > self._idle_timeout:
+                expired.append(self._idle.pop(0))
+        for idle in expired:
+            self._discard(idle)
+
+    def _probe(self):
+        # A fresh connection is used because idle connections of the pool may be dead even if Postgres is back
+        conn = psycopg2.connect(
             dbname=self._config.DB_NAME,
             user=self._config.DB_USER,
             password=self._config.DB_PASSWORD,
-            host=self._config.DB_HOST
+            host=self._config.DB_HOST,
+            connect_timeout=self._config.DB_CONNECT_TIMEOUT,
         )
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+        finally:
+            conn.close()
+
+    def _connection_lost(self, error: Exception):
+        if self.degraded:
+            return
+
+        logger.error(f"{error} - Database is degraded until connection is restored")
+        self.degraded = True
+        self.outages += 1
+        self._recovered.clear()
+        self._supervisor = asyncio.create_task(self._reconnect_loop())
 
-    def begin(self) -> cursor:
+    async def _reconnect_loop(self):
+        attempt = 0
+        while True:
+            # Exponential backoff with full jitter, so that bot processes don't reconnect in lockstep
+            delay = min(self._reconnect_max_delay, self._reconnect_base_delay * 2 ** attempt)
+            await asyncio.sleep(random.uniform(0, delay))
+            attempt += 1
+            self.reconnect_attempts += 1
+            try:
+                await asyncio.to_thread(self._probe)
+            except psycopg2.Error as e:
+                logger.info(f"Database reconnect attempt {attempt} failed: {e}")
+                continue
+
+            # Connections opened before the outage are checked before their next use
+            self._released = dict.fromkeys(self._released.keys(), 0.0)
+            self.degraded = False
+            self._recovered.set()
+            logger.info(f"Database connection restored after {attempt} attempts")
+            return
+
+    async def wait_recovered(self, timeout: float) -> bool:
         try:
-            return self._conn.cursor()
-        except psycopg2.InterfaceError as e:
-            logger.info(f'{e} - Database connection will be reset')
-            sleep(2)
-            self._reconnect()
-            return self._conn.cursor()
-
-    def commit(self):
+            async with asyncio.timeout(timeout):
+                await self._recovered.wait()
+        except TimeoutError as _:
+            pass
+
+        return not self.degraded
+
+    @contextlib.asynccontextmanager
+    async def connection(self) -> AsyncIterator[connection]:
+        # Fail fast instead of queueing behind the reconnect
+        if self.degraded:
+            self.rejected += 1
+            raise DatabaseUnavailable("Database is degraded")
+
+        started = time.monotonic()
+        self.waiting += 1
         try:
-            self._conn.commit()
-        except psycopg2.InterfaceError as e:
-            logger.info(f'{e} - Database connection will be reset')
-            sleep(2)
-            self._reconnect()
+            async with asyncio.timeout(self._pool_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError as e:
+            self.pool_timeouts += 1
+            raise ConnectionPoolExhausted(f"No database connection released within {self._pool_timeout}s") from e
+        finally:
+            self.waiting -= 1
 
-    def rollback(self):
+        wait_time = time.monotonic() - started
+        self.checkouts += 1
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
         try:
-            self._conn.rollback()
-        except psycopg2.InterfaceError as e:
-            logger.info(f'{e} - Database connection will be reset')
-            sleep(2)
-            self._reconnect()
+            # Establishing a connection and health check may take a while
+            try:
+                conn = await asyncio.to_thread(self._checkout)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                self._connection_lost(e)
+                raise DatabaseUnavailable(f"Failed to connect to database: {e}") from e
+
+            self.in_use += 1
+            try:
+                yield conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                if not conn.closed:
+                    raise
+                self._connection_lost(e)
+                raise DatabaseUnavailable(f"Database connection lost: {e}") from e
+            finally:
+                self.in_use -= 1
+                self._release(conn)
+        finally:
+            self._semaphore.release()
+
+    @contextlib.asynccontextmanager
+    async def transaction(self, kind: str = "other") -> AsyncIterator[LazyCursor]:
+        """
+        Commits on success and rolls back if the block raises. Blocks which haven't executed any statement
+        don't check out a connection, blocks which have only executed read-only queries don't commit
+        :param kind: what the unit of work is, units are counted separately for each kind
+        """
+        async with contextlib.AsyncExitStack() as stack:
+            cur = LazyCursor(self, stack)
+            try:
+                yield cur
+                await cur.commit()
+                cur._committed()
+            except BaseException:
+                await cur.rollback()
+                raise
+            finally:
+                counters = self.units_of_work.setdefault(kind, [0, 0, 0])
+                counters[0] += 1
+                counters[1] += cur.connected
+                counters[2] += cur.written
+
+    async def run(
+            self,
+            unit_of_work: Callable[[AsyncCursor], Awaitable[T]],
+            retries: int | None = None,
+            kind: str = "other",
+    ) -> T:
+        """
+        Runs the unit of work in a transaction. If connection is lost before the unit of work has written anything
+        or has had side effects (see mark_side_effect()), it is repeated from scratch once connection is restored,
+        at most `retries` times
+        :raises DatabaseUnavailable: if the database is degraded or the unit of work can not be retried
+        """
+        retries = self._retries if retries is None else retries
+        attempt = 0
+        while True:
+            was_degraded = self.degraded
+            cur: LazyCursor | None = None
+            try:
+                async with self.transaction(kind) as cur:
+                    token = CURRENT_UNIT_OF_WORK.set(cur)
+                    try:
+                        return await unit_of_work(cur)
+                    finally:
+                        CURRENT_UNIT_OF_WORK.reset(token)
+            except DatabaseUnavailable as e:
+                # Only the unit of work which has hit the outage is retried, the others fail fast.
+                # A failed commit is never retried: it may have been applied before connection was lost
+                if was_degraded or attempt >= retries or cur is None or not cur.retryable:
+                    raise
+
+                # Connections are busy rather than lost, retrying would only add load
+                if isinstance(e, ConnectionPoolExhausted):
+                    raise
+
+                if not await self.wait_recovered(self._retry_timeout):
+                    raise
+
+                attempt += 1
+                self.retries += 1
+                logger.warning(f"{e} - Retrying unit of work ({attempt}/{retries})")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "degraded": self.degraded,
+            "outages": self.outages,
+            "reconnect_attempts": self.reconnect_attempts,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "units_of_work": {
+                kind: {"units": units, "with_queries": with_queries, "with_writes": with_writes}
+                for kind, (units, with_queries, with_writes) in self.units_of_work.items()
+            },
+            "min_size": self._min_size,
+            "max_size": self._max_size,
+            "idle": len(self._idle),
+            "connections_opened": self.connections_opened,
+            "connections_closed": self.connections_closed,
+            "in_use": self.in_use,
+            "utilisation": self.in_use / self._max_size,
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "wait_time_avg": self.wait_time_total / self.checkouts if self.checkouts else 0.0,
+            "wait_time_max": self.wait_time_max,
+            "pool_timeouts": self.pool_timeouts,
+            "health_check_failures": self.health_check_failures,
+        }
+
+    def close(self):
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+        # Connections in use are closed once they are returned
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
@@ -0,0 +1,70 @@
+from typing import Hashable, Dict, Any, Tuple, List
+
+from .cache import LRUCache
+
+
+# Returned by IdentityCache.get() if nothing is known about the identity, None means it is known to be absent
+NOT_CACHED = object()
+
+
+class IdentityCache:
+    """
+    Bounded cache of user identities of all kinds (external users, bot users). Identities which are absent
+    in the database are cached too, so that repeated lookups of unknown users don't hit the database either
+    """
+
+    def __init__(self, max_size: int, ttl: float | None = None):
+        self._entries: LRUCache[Tuple[str, Hashable], Any] = LRUCache(max_size=max_size, ttl=ttl)
+        # maps kind of identity -> [hits, misses]
+        self._counters: Dict[str, List[int]] = {}
+        self.negative_hits = 0
+        self.invalidations = 0
+
+    def configure(self, max_size: int, ttl: float | None):
+        """
+        Replaces the cache with an empty one of the given size
+        """
+        self._entries = LRUCache(max_size=max_size, ttl=ttl)
+
+    def get(self, kind: str, key: Hashable) -> Any:
+        """
+        :return: cached identity, None if it is known to be absent or NOT_CACHED
+        """
+        value = self._entries.get((kind, key), NOT_CACHED)
+        counters = self._counters.setdefault(kind, [0, 0])
+        if value is NOT_CACHED:
+            counters[1] += 1
+        else:
+            counters[0] += 1
+            self.negative_hits += value is None
+        return value
+
+    def put(self, kind: str, key: Hashable, value: Any | None):
+        """
+        :param value: identity loaded from the database, None if it is absent there
+        """
+        self._entries.put((kind, key), value)
+
+    def invalidate(self, kind: str, key: Hashable):
+        if self._entries.pop((kind, key), NOT_CACHED) is not NOT_CACHED:
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "size": len(self._entries),
+            "max_size": self._entries.max_size,
+            "evictions": self._entries.evictions,
+            "expirations": self._entries.expirations,
+            "negative_hits": self.negative_hits,
+            "invalidations": self.invalidations,
+        }
+        for kind, (hits, misses) in self._counters.items():
+            result[kind] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+        return result
+
+
+IDENTITIES = IdentityCache(max_size=10000)
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import sys
+import types
+from typing import Callable, Dict, Any, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# maps component name -> function returning current counters of this component
+STATS_PROVIDERS: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register_stats(name: str, provider: Callable[[], Dict[str, Any]]):
+    STATS_PROVIDERS[name] = provider
+
+
+def collect_stats() -> Dict[str, Dict[str, Any]]:
+    result = {}
+    for name, provider in STATS_PROVIDERS.items():
+        try:
+            result[name] = provider()
+        except Exception as e:
+            logger.warning(f"Failed to collect stats of {name}: {e}")
+
+    return result
+
+
+def approximate_size(obj: Any, shared: Tuple[type, ...] = ()) -> int:
+    """
+    Approximate number of bytes held by the object graph. Classes, modules, code of functions
+    and instances of `shared` types belong to the whole process, so they are neither counted nor followed
+    """
+    seen = set()
+    size = 0
+    pending = [obj]
+    while pending:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, (type, types.ModuleType) + shared):
+            continue
+
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        if isinstance(current, types.MethodType):
+            pending.append(current.__self__)
+        elif isinstance(current, types.FunctionType):
+            for cell in current.__closure__ or ():
+                try:
+                    pending.append(cell.cell_contents)
+                except ValueError as _:
+                    pass
+        elif isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            pending.extend(current)
+        elif hasattr(current, "__dict__"):
+            pending.append(current.__dict__)
+
+    return size
+
+
+async def report_stats(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        for name, stats in collect_stats().items():
+            logger.info(f"Stats {name}: {stats}")
@@ -0,0 +1,82 @@
+import re
+from typing import Dict, Any
+
+
+PLACEHOLDER_RE = re.compile(r"%[s%]")
+
+
+class Query:
+    """
+    Named SQL statement with psycopg2 placeholders (%s). Prepared statements are parsed and planned
+    by the server once per connection instead of on every execution
+    """
+
+    def __init__(self, name: str, sql: str, prepare: bool, readonly: bool):
+        self.name = name
+        self.sql = sql
+        self.prepare = prepare
+        self.readonly = readonly
+        self.calls = 0
+        self.errors = 0
+        self.time_total = 0.0
+        self.time_max = 0.0
+
+        # PREPARE takes positional $n parameters, the values are passed to EXECUTE
+        parameter_count = 0
+
+        def to_positional(match: re.Match) -> str:
+            nonlocal parameter_count
+            if match.group(0) == "%%":
+                return "%"
+            parameter_count += 1
+            return f"${parameter_count}"
+
+        self.prepare_sql = f"PREPARE {name} AS {PLACEHOLDER_RE.sub(to_positional, sql).rstrip(';')};"
+        self.execute_sql = f"EXECUTE {name}"
+        if parameter_count > 0:
+            self.execute_sql += f" ({', '.join(['%s'] * parameter_count)})"
+        self.execute_sql += ";"
+
+    def record(self, duration: float, failed: bool):
+        self.calls += 1
+        self.errors += failed
+        self.time_total += duration
+        self.time_max = max(self.time_max, duration)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "time_avg": self.time_total / self.calls if self.calls else 0.0,
+            "time_max": self.time_max,
+            "time_total": self.time_total,
+        }
+
+
+# maps query name -> query
+QUERIES: Dict[str, Query] = {}
+
+
+def register_query(name: str, sql: str, prepare: bool = True, readonly: bool = False) -> Query:
+    """
+    :param name: unique identifier, used as the name of the prepared statement
+    :param prepare: whether the statement is hot enough to be kept prepared on every connection
+    :param readonly: whether the statement never writes, so it doesn't need a transaction
+    """
+    if name in QUERIES:
+        raise RuntimeError(f"Query {name} is already registered")
+
+    query = Query(name, sql, prepare, readonly)
+    QUERIES[name] = query
+    return query
+
+
+def query_stats() -> Dict[str, Any]:
+    """
+    Statistics of executed queries, the most time consuming first
+    """
+    return {
+        query.name: query.stats()
+        for query in sorted(QUERIES.values(), key=lambda query: query.time_total, reverse=True)
+        if query.calls > 0
+    }
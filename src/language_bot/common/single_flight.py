@@ -0,0 +1,78 @@
+import asyncio
+from typing import Generic, TypeVar, Hashable, Dict, Callable, Awaitable
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Coalesces concurrent calls for the same key: the first caller (leader) performs the call,
+    others await its result instead of repeating the call
+    """
+
+    def __init__(self):
+        self._calls: Dict[K, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def join(self, key: K) -> asyncio.Future | None:
+        future = self._calls.get(key, None)
+        if future is not None:
+            self.followers += 1
+        return future
+
+    def lead(self, key: K) -> asyncio.Future:
+        if key in self._calls:
+            raise RuntimeError(f"Call {key} is already in flight")
+
+        future = asyncio.get_running_loop().create_future()
+        # Exception is retrieved here to avoid warnings when nobody joined the call
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        self.leaders += 1
+        return future
+
+    def complete(self, key: K, result: V = None, exception: BaseException | None = None):
+        future = self._calls.pop(key, None)
+        if future is None or future.done():
+            return
+
+        if isinstance(exception, asyncio.CancelledError):
+            # followers will retry the call themselves
+            future.cancel()
+        elif exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    async def do(self, key: K, call: Callable[[], Awaitable[V]]) -> V:
+        while True:
+            future = self.join(key)
+            if future is None:
+                break
+
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    # this caller was cancelled, not the leader
+                    raise
+
+        self.lead(key)
+        try:
+            result = await call()
+        except BaseException as e:
+            self.complete(key, exception=e)
+            raise
+
+        self.complete(key, result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
@@ -0,0 +1,15 @@
+from telegram.request import HTTPXRequest
+
+from .database import mark_side_effect
+
+
+class SideEffectTrackingRequest(HTTPXRequest):
+    """
+    Bot API request which marks the current unit of work as having side effects: a message which may have
+    been sent can not be taken back, so the update is not processed again if the database fails afterwards
+    """
+
+    async def do_request(self, *args, **kwargs):
+        # Marked before the request, it may reach Telegram even if it fails
+        mark_side_effect()
+        return await super().do_request(*args, **kwargs)
@@ -0,0 +1,78 @@
+import asyncio
+import contextlib
+import time
+from typing import Generic, TypeVar, Hashable, Dict, Any, AsyncIterator
+
+
+K = TypeVar("K", bound=Hashable)
+
+
+class _KeyLock:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # number of updates holding or waiting for the lock
+        self.users = 0
+
+
+class UpdateScheduler(Generic[K]):
+    """
+    Processes updates of different users concurrently, at most `max_concurrent` at a time, while updates
+    of the same user are processed one by one in the order they arrived. asyncio.Lock wakes up waiters
+    in FIFO order, so the order is kept as long as updates enter slot() in the order they arrived
+    """
+
+    def __init__(self, max_concurrent: int):
+        if max_concurrent <= 0:
+            raise RuntimeError(f"Number of concurrent updates should be positive, got {max_concurrent}")
+
+        self.max_concurrent = max_concurrent
+        # Waiting for the user's lock doesn't take a processing slot from other users
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._locks: Dict[K, _KeyLock] = {}
+        self.processing = 0
+        self.waiting = 0
+        self.started = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    @contextlib.asynccontextmanager
+    async def slot(self, key: K) -> AsyncIterator[None]:
+        started = time.monotonic()
+        key_lock = self._locks.get(key, None)
+        if key_lock is None:
+            key_lock = _KeyLock()
+            self._locks[key] = key_lock
+        key_lock.users += 1
+        self.waiting += 1
+        waiting = True
+        try:
+            async with key_lock.lock:
+                async with self._semaphore:
+                    wait_time = time.monotonic() - started
+                    self.waiting -= 1
+                    waiting = False
+                    self.started += 1
+                    self.wait_time_total += wait_time
+                    self.wait_time_max = max(self.wait_time_max, wait_time)
+                    self.processing += 1
+                    try:
+                        yield
+                    finally:
+                        self.processing -= 1
+        finally:
+            if waiting:
+                self.waiting -= 1
+            key_lock.users -= 1
+            if key_lock.users == 0:
+                del self._locks[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "processing": self.processing,
+            "waiting": self.waiting,
+            "users": len(self._locks),
+            "started": self.started,
+            "wait_time_avg": self.wait_time_total / self.started if self.started else 0.0,
+            "wait_time_max": self.wait_time_max,
+        }
@@ -0,0 +1,250 @@
+import asyncio
+import hmac
+import json
+import logging
+import signal
+from typing import Dict, Tuple, Set, Any
+
+from telegram import Update
+from telegram.ext import Application
+
+
+logger = logging.getLogger(__name__)
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+}
+
+
+class HttpError(RuntimeError):
+    def __init__(self, status: int):
+        super().__init__(HTTP_REASONS.get(status, str(status)))
+        self.status = status
+
+
+async def read_request(
+        reader: asyncio.StreamReader,
+        max_body_size: int,
+        idle_timeout: float | None = None,
+        request_timeout: float | None = None,
+        max_header_size: int = 8192,
+        max_headers: int = 100,
+) -> Tuple[str, str, Dict[str, str], bytes] | None:
+    """
+    Reads HTTP/1.1 request with Content-Length body
+    :param idle_timeout: time (seconds) to wait for the request to start
+    :param request_timeout: time (seconds) to receive the rest of the request once it has started
+    :param max_header_size: limit of the request line and headers together (bytes)
+    :return: method, target, headers with lowercase names and body, None if the client has closed the connection
+    :raises TimeoutError: if the client is idle or too slow
+    """
+    async with asyncio.timeout(idle_timeout):
+        request_line = await reader.readline()
+    if not request_line:
+        return None
+
+    async with asyncio.timeout(request_timeout):
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError as _:
+            raise HttpError(400)
+
+        headers = {}
+        header_size = len(request_line)
+        header_count = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            header_size += len(line)
+            header_count += 1
+            if header_size > max_header_size or header_count > max_headers:
+                raise HttpError(431)
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError as _:
+            raise HttpError(400)
+        if length < 0:
+            raise HttpError(400)
+        if length > max_body_size:
+            raise HttpError(413)
+
+        body = await reader.readexactly(length) if length > 0 else b""
+    return method, target, headers, body
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, body: bytes = b"", keep_alive: bool = True):
+    writer.write(
+        f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n".encode("latin-1") + body
+    )
+
+
+class WebhookServer:
+    """
+    Minimal HTTP/1.1 server receiving updates pushed by Telegram. Updates are only parsed and put into
+    the update queue of the application before the response, so bursts are absorbed by the queue
+    and Telegram can keep all its connections busy
+    """
+
+    def __init__(
+            self,
+            application: Application,
+            listen: str,
+            port: int,
+            path: str,
+            secret_token: str | None,
+            max_body_size: int = 1 << 20,
+            idle_timeout: float = 60,
+            request_timeout: float = 10,
+    ):
+        """
+        :param idle_timeout: keep-alive connection without requests for this time (seconds) is closed
+        :param request_timeout: time (seconds) a client has to send the whole request, slower ones are disconnected
+        """
+        self.application = application
+        self.listen = listen
+        self.port = port
+        self.path = path
+        self.secret_token = secret_token
+        self.max_body_size = max_body_size
+        self.idle_timeout = idle_timeout
+        self.request_timeout = request_timeout
+        self._server: asyncio.Server | None = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self.connections = 0
+        self.received = 0
+        self.rejected = 0
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.listen, self.port)
+        logger.info(f"Listening for webhook updates on {self.listen}:{self.port}{self.path}")
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    request = await read_request(
+                        reader,
+                        self.max_body_size,
+                        idle_timeout=self.idle_timeout,
+                        request_timeout=self.request_timeout,
+                    )
+                except HttpError as e:
+                    self.rejected += 1
+                    write_response(writer, e.status, keep_alive=False)
+                    await writer.drain()
+                    break
+
+                if request is None:
+                    break
+
+                method, target, headers, body = request
+                status = await self._handle(method, target, headers, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                write_response(writer, status, keep_alive=keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except TimeoutError as _:
+            logger.debug("Webhook connection closed: idle or too slow client")
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            logger.debug(f"Webhook connection dropped: {e}")
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _handle(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> int:
+        if target != self.path:
+            self.rejected += 1
+            return 404
+
+        if method != "POST":
+            self.rejected += 1
+            return 405
+
+        if self.secret_token is not None and not hmac.compare_digest(
+                headers.get("x-telegram-bot-api-secret-token", "").encode("latin-1"),
+                self.secret_token.encode("latin-1"),
+        ):
+            self.rejected += 1
+            return 403
+
+        try:
+            update = Update.de_json(json.loads(body), self.application.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Malformed webhook update: {e}")
+            self.rejected += 1
+            return 400
+
+        await self.application.update_queue.put(update)
+        self.received += 1
+        return 200
+
+    async def stop(self):
+        if self._server is None:
+            return
+
+        self._server.close()
+        # Telegram keeps connections open, the server would wait for them forever
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": self.connections,
+            "open_connections": len(self._writers),
+            "received": self.received,
+            "rejected": self.rejected,
+            "queued": self.application.update_queue.qsize(),
+        }
+
+
+async def run_webhook(application: Application, server: WebhookServer, url: str, max_connections: int):
+    """
+    Runs the application fed by the webhook server until SIGINT or SIGTERM, like Application.run_polling()
+    :param url: public HTTPS address Telegram sends updates to, it should be proxied to the server
+    :param max_connections: maximum number of connections Telegram opens to deliver updates concurrently
+    """
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stopped.set)
+
+    await application.initialize()
+    try:
+        if application.post_init is not None:
+            await application.post_init(application)
+        await application.bot.set_webhook(
+            url=url,
+            secret_token=server.secret_token,
+            max_connections=max_connections,
+            allowed_updates=Update.ALL_TYPES,
+        )
+        await application.start()
+        await server.start()
+        await stopped.wait()
+    finally:
+        # Only what has started is stopped, but resources of post_init are released in any case.
+        # The webhook is kept, Telegram holds updates until the bot is back
+        await server.stop()
+        if application.running:
+            await application.stop()
+        await application.shutdown()
+        if application.post_shutdown is not None:
+            await application.post_shutdown(application)
@@ -1,7 +1,32 @@
+import functools
 from pydantic import BaseModel
 from uuid import UUID
 from typing import Dict, Any, Optional
-from psycopg2.extensions import cursor
+from .common.database import AsyncCursor
+from .common.identity_cache import IDENTITIES, NOT_CACHED
+from .common.queries import register_query
+
+
+SET_EXTERNAL_USER_USER = register_query(
+    "set_external_user_user",
+    'UPDATE public.external_user SET user_id = %s WHERE platform = %s AND platform_user_id = %s;',
+    prepare=False
+)
+CREATE_EXTERNAL_USER = register_query(
+    "create_external_user",
+    'INSERT INTO public.external_user (platform, platform_user_id, user_id, additional_info) '
+    'VALUES (%s, %s, %s, %s);',
+    prepare=False
+)
+GET_EXTERNAL_USER = register_query(
+    "get_external_user",
+    'SELECT platform, platform_user_id, user_id, additional_info '
+    'FROM public.external_user '
+    'WHERE platform = %s AND platform_user_id = %s;',
+    readonly=True
+)
+
+EXTERNAL_USER = "external_user"
 
 
 class ExternalUser(BaseModel):
@@ -13,29 +38,22 @@ class ExternalUser(BaseModel):
     def get_user_ref(self) -> str:
         return f"{self.platform}/{self.platform_user_id}"
 
-    def set_user(self, user_id: UUID, cur: cursor):
-        cur.execute(
-            'UPDATE public.external_user SET user_id = %s WHERE platform = %s AND platform_user_id = %s;',
-            (user_id, self.platform, self.platform_user_id,)
-        )
+    async def set_user(self, user_id: UUID, cur: AsyncCursor):
+        await cur.run(SET_EXTERNAL_USER_USER, (user_id, self.platform, self.platform_user_id,))
         self.user_id = user_id
+        # Dropped right away too, since the cached entry is this very object
+        IDENTITIES.invalidate(EXTERNAL_USER, self.get_user_ref())
+        cur.after_commit(functools.partial(IDENTITIES.invalidate, EXTERNAL_USER, self.get_user_ref()))
 
 
-EXTERNAL_USERS: Dict[str, ExternalUser] = {}
-
-
-def create_external_user(
+async def create_external_user(
         platform: str,
         platform_user_id: str,
         user_id: UUID | None,
         additional_info: Dict[str, Any] | None,
-        cur: cursor
+        cur: AsyncCursor
 ) -> ExternalUser:
-    cur.execute(
-        'INSERT INTO public.external_user (platform, platform_user_id, user_id, additional_info) '
-        'VALUES (%s, %s, %s, %s);',
-        (platform, platform_user_id, user_id, additional_info)
-    )
+    await cur.run(CREATE_EXTERNAL_USER, (platform, platform_user_id, user_id, additional_info))
 
     external_user = ExternalUser(
         platform=platform,
@@ -43,32 +61,34 @@ def create_external_user(
         user_id=user_id,
         additional_into=None,
     )
-    EXTERNAL_USERS[f"{platform}/{platform_user_id}"] = external_user
+    cur.after_commit(functools.partial(IDENTITIES.put, EXTERNAL_USER, external_user.get_user_ref(), external_user))
     return external_user
 
 
-def get_external_user(platform: str, platform_user_id: str, cur: cursor) -> ExternalUser | None:
+async def get_external_user(
+        platform: str,
+        platform_user_id: str,
+        cur: AsyncCursor,
+        use_cache: bool = True
+) -> ExternalUser | None:
+    """
+    :param use_cache: False if the user may have been changed by another bot process
+    """
     external_user_ref = f"{platform}/{platform_user_id}"
-    external_user = EXTERNAL_USERS.get(external_user_ref, None)
-    if external_user:
-        return external_user
+    if use_cache:
+        external_user = IDENTITIES.get(EXTERNAL_USER, external_user_ref)
+        if external_user is not NOT_CACHED:
+            return external_user
 
-    cur.execute(
-        'SELECT platform, platform_user_id, user_id, additional_info '
-        'FROM public.external_user '
-        'WHERE platform = %s AND platform_user_id = %s;',
-        (platform, platform_user_id,)
-    )
+    await cur.run(GET_EXTERNAL_USER, (platform, platform_user_id,))
 
     entry = cur.fetchone()
-    if entry:
-        return ExternalUser(
-            platform=platform,
-            platform_user_id=platform_user_id,
-            user_id=entry[2],
-            additional_info=entry[3],
-        )
-
-    return None
-
-
+    external_user = ExternalUser(
+        platform=platform,
+        platform_user_id=platform_user_id,
+        user_id=entry[2],
+        additional_info=entry[3],
+    ) if entry else None
+    # Published on commit, the row may be uncommitted yet
+    cur.after_commit(functools.partial(IDENTITIES.put, EXTERNAL_USER, external_user_ref, external_user))
+    return external_user
@@ -1,9 +1,9 @@
 from dataclasses import dataclass
-from psycopg2.extensions import cursor
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from .translators.translation_service_interface import TranslationServiceInterface
+from .common.database import AsyncCursor
 
 
 @dataclass
@@ -11,4 +11,4 @@ class ServiceContext:
     update: Update
     context: ContextTypes.DEFAULT_TYPE
     translation_service: TranslationServiceInterface
-    cur: cursor
+    cur: AsyncCursor
@@ -8,7 +8,7 @@ import logging
 
 from .word_properties_state import WordPropertiesState
 from .session_state import SessionState, back_button
-from ..vocabulary import get_user_vocabulary, Vocabulary, VocabularyWord
+from ..vocabulary import get_user_vocabulary, Vocabulary, VocabularyWord, save_words
 from ..translators.translation_service_interface import TranslationResult
 from ..service_context import ServiceContext
 from .session_context import SessionContext
@@ -21,7 +21,7 @@ tokenizer = NISTTokenizer()
 NON_WESTERN_LANGS = ["ar", "bn", "fa", "he", "hi", "id", "ja", "ko", "ms", "th", "tl", "ur", "zh"]
 
 
-def prepare_word_button_params(
+async def prepare_word_button_params(
         target_language: str,
         words: Dict[str, VocabularyWord],
         service_context: ServiceContext
@@ -31,7 +31,16 @@ def prepare_word_button_params(
         callback_data=word
     ) for word in words.keys()]
 
-    buttons = [[back_button(service_context=service_context, language=target_language, action_name="add_words_back")]]
+    buttons = [[await back_button(service_context=service_context, language=target_language, action_name="add_words_back")]]
+    if len(word_buttons) > 1:
+        buttons.append([InlineKeyboardButton(
+            text=await service_context.translation_service.translate_ui(
+                "Add all words",
+                target_language=target_language,
+            ) + " 📚",
+            callback_data="add_words_all",
+        )])
+
     for i in range(0, len(word_buttons), 2):
         buttons.append(word_buttons[i:i + 2])
 
@@ -40,11 +49,11 @@ def prepare_word_button_params(
     )
 
 
-def determine_word_category(
+async def determine_word_category(
         word: VocabularyWord,
         chatbot_session: ChatbotSession
 ) -> str:
-    response = chatbot_session.prompt(
+    response = await chatbot_session.prompt_async(
         f"Determine category of the {langcodes.get(word.language).language_name()} "
         f"word: {word.word}. Output answer as a single word"
     )
@@ -77,20 +86,20 @@ class AddWordsToVocabularyState(SessionState):
                 continue
             new_words.add(word.lower())
 
-        vocabulary = get_user_vocabulary(
+        vocabulary = await get_user_vocabulary(
             user_id=session_context.user.user_id,
             language=translation.source_language,
             cur=service_context.cur,
         )
 
-        unique_words = vocabulary.get_unique_words(new_words=list(new_words), cur=service_context.cur)
+        unique_words = await vocabulary.get_unique_words(new_words=list(new_words), cur=service_context.cur)
         await service_context.update.callback_query.edit_message_text(
-            text=service_context.translation_service.translate(
-                source_text=f"(Translated from {langcodes.get(translation.source_language).language_name()})",
-                source_language="en",
+            text=await service_context.translation_service.translate_ui(
+                "(Translated from {language})",
                 target_language=session_context.user.language.language,
-            ).target_text + " : " + translation.target_text,
-            reply_markup=prepare_word_button_params(
+                language=langcodes.get(translation.source_language).language_name(),
+            ) + " : " + translation.target_text,
+            reply_markup=await prepare_word_button_params(
                 target_language=session_context.user.language.language,
                 words=unique_words,
                 service_context=service_context,
@@ -107,12 +116,12 @@ class AddWordsToVocabularyState(SessionState):
 
     async def show_menu(self, service_context: ServiceContext):
         await service_context.update.callback_query.edit_message_text(
-            text=service_context.translation_service.translate(
-                source_text=f"(Translated from {langcodes.get(self.translation.source_language).language_name()})",
-                source_language="en",
+            text=await service_context.translation_service.translate_ui(
+                "(Translated from {language})",
                 target_language=self.session_context.user.language.language,
-            ).target_text + " : " + self.translation.target_text,
-            reply_markup=prepare_word_button_params(
+                language=langcodes.get(self.translation.source_language).language_name(),
+            ) + " : " + self.translation.target_text,
+            reply_markup=await prepare_word_button_params(
                 target_language=self.session_context.user.language.language,
                 words=self.unique_words,
                 service_context=service_context,
@@ -124,7 +133,7 @@ class AddWordsToVocabularyState(SessionState):
         return self
 
     async def on_word_store(self, word: VocabularyWord, service_context: ServiceContext) -> SessionState:
-        word.save(service_context.cur)
+        await word.save(service_context.cur)
         del self.unique_words[word.word]
         await self.show_menu(service_context)
         return self
@@ -136,13 +145,21 @@ class AddWordsToVocabularyState(SessionState):
         if service_context.update.callback_query.data == "add_words_back":
             return await self.on_back(service_context)
 
+        if service_context.update.callback_query.data == "add_words_all":
+            # Categories are left undetermined, asking chatbot about every word would take too long
+            await save_words(list(self.unique_words.values()), service_context.cur)
+            self.unique_words.clear()
+            await self.show_menu(service_context)
+            return self
+
         word = self.unique_words.get(service_context.update.callback_query.data, None)
         if not word:
             logger.warning(f"Word {service_context.update.callback_query.data} not found")
             return self
 
         if word.category is None:
-            word.category = determine_word_category(word, self.session_context.chatbot_session)
+            # Generation takes seconds, updates of other users are processed meanwhile
+            word.category = await determine_word_category(word, self.session_context.chatbot_session)
 
         new_state = WordPropertiesState(
             session_context=self.session_context,
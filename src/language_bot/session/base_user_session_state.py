@@ -25,12 +25,12 @@ class BaseUserSessionState(SessionState):
             await service_context.update.callback_query.delete_message()
 
         self.text = service_context.update.message.text
-        detected_languages = service_context.translation_service.detect_language(
+        detected_languages = await service_context.translation_service.detect_language(
             source_text=service_context.update.message.text
         )
 
         if len(detected_languages.root) == 1:
-            translation = service_context.translation_service.translate(
+            translation = await service_context.translation_service.translate(
                 source_text=service_context.update.message.text,
                 source_language=detected_languages.root[0].language,
                 target_language=self.session_context.user.language.language,
@@ -43,22 +43,21 @@ class BaseUserSessionState(SessionState):
         buttons = []
         for detected_lang in detected_languages.root:
             buttons.append([InlineKeyboardButton(
-                text=service_context.translation_service.translate(
-                    source_text=langcodes.get(detected_lang.language).language_name(),
-                    source_language="en",
+                text=await service_context.translation_service.translate_ui(
+                    "{language}",
                     target_language=self.session_context.user.language.language,
-                ).target_text + f" - {detected_lang.confidence}%",
+                    language=langcodes.get(detected_lang.language).language_name(),
+                ) + f" - {detected_lang.confidence}%",
                 callback_data=f"{detected_lang.language}_translate",
             )])
 
         await service_context.update.message.reply_text(
-            text=service_context.translation_service.translate(
-                source_text="I've found several possible languages to which this text may belong. "
-                            "Please select the correct one. If you didn't find the right language, "
-                            "then I can't translate this text for you, sorry. 😓",
-                source_language="en",
+            text=await service_context.translation_service.translate_ui(
+                "I've found several possible languages to which this text may belong. "
+                "Please select the correct one. If you didn't find the right language, "
+                "then I can't translate this text for you, sorry. 😓",
                 target_language=self.session_context.user.language.language,
-            ).target_text,
+            ),
             reply_markup=InlineKeyboardMarkup(buttons),
         )
         return self
@@ -69,7 +68,7 @@ class BaseUserSessionState(SessionState):
     ) -> "SessionState" or None:
         select_language_match = SELECT_LANGUAGE_COMMAND_RE.match(service_context.update.callback_query.data)
         if select_language_match:
-            translation = service_context.translation_service.translate(
+            translation = await service_context.translation_service.translate(
                 source_text=self.text,
                 source_language=select_language_match[1],
                 target_language=self.session_context.user.language.language,
@@ -17,14 +17,13 @@ class BasicTrainVocabularyState(SessionState):
             service_context: ServiceContext,
     ) -> SessionState:
         await service_context.update.callback_query.edit_message_text(
-            text=service_context.translation_service.translate(
-                source_text="Training mode is in process of implementation. "
-                            "I'll let you know when ready",
-                source_language="en",
+            text=await service_context.translation_service.translate_ui(
+                "Training mode is in process of implementation. "
+                "I'll let you know when ready",
                 target_language=self.session_context.user.language.language,
-            ).target_text,
+            ),
             reply_markup=InlineKeyboardMarkup([
-                [back_button(
+                [await back_button(
                     service_context=service_context,
                     language=self.session_context.user.language.language,
                     action_name="back"
@@ -17,30 +17,30 @@ logger = logging.getLogger(__name__)
 
 async def create_menu_params(service_context: ServiceContext, user_language: langcodes.Language):
     return {
-        "text": service_context.translation_service.translate(
-            source_text=(f"Hello, @{service_context.update.effective_user.username}! "
-                         "Please, finish registration procedure to use this bot. "
-                         f"I see you are speaking {user_language.language_name()}. "
-                         f"{user_language.language_name()} language will be used in explanations and translations. "
-                         "Do you want to keep it as your default language or change it?"),
-            source_language="en",
+        "text": await service_context.translation_service.translate_ui(
+            "Hello, @{username}! "
+            "Please, finish registration procedure to use this bot. "
+            "I see you are speaking {language}. "
+            "{language} language will be used in explanations and translations. "
+            "Do you want to keep it as your default language or change it?",
             target_language=user_language.language,
-        ).target_text,
+            username=service_context.update.effective_user.username,
+            language=user_language.language_name(),
+        ),
         "reply_markup": telegram.InlineKeyboardMarkup([[
             telegram.InlineKeyboardButton(
-                text=service_context.translation_service.translate(
-                    source_text=f"{user_language.language_name()}",
-                    source_language="en",
+                text=await service_context.translation_service.translate_ui(
+                    "{language}",
                     target_language=user_language.language,
-                ).target_text + " 👌",
+                    language=user_language.language_name(),
+                ) + " 👌",
                 callback_data="keep_language"
             ),
             telegram.InlineKeyboardButton(
-                text=service_context.translation_service.translate(
-                    source_text=f"Other language",
-                    source_language="en",
+                text=await service_context.translation_service.translate_ui(
+                    "Other language",
                     target_language=user_language.language,
-                ).target_text + " 🙅‍♂️️",
+                ) + " 🙅‍♂️️",
                 callback_data="other_language"
             )
         ]])
@@ -50,6 +50,8 @@ async def create_menu_params(service_context: ServiceContext, user_language: lan
 @dataclass
 class NewUserInitialState(SessionState):
     user_language: Optional[langcodes.Language] = None
+    # Language of the user being registered, either the detected one or the one chosen from the list
+    selected_language: Optional[langcodes.Language] = None
 
     async def show(self, service_context: ServiceContext) -> "SessionState" or None:
         self.user_language = langcodes.get(service_context.update.effective_user.language_code)
@@ -99,11 +101,10 @@ class NewUserInitialState(SessionState):
             service_context: ServiceContext,
     ) -> "SessionState" or None:
         await service_context.update.message.reply_text(
-            text=service_context.translation_service.translate(
-                source_text=f"Please, finish registration procedure to use this bot.",
-                source_language="en",
-                target_language="en" if self.user_language is None else self.user_language.language
-            ).target_text
+            text=await service_context.translation_service.translate_ui(
+                "Please, finish registration procedure to use this bot.",
+                target_language="en" if self.user_language is None else self.user_language.language,
+            )
         )
 
         return self
@@ -114,8 +115,8 @@ class NewUserInitialState(SessionState):
             username: str,
             service_context: ServiceContext
     ):
-        user = create_user(name=username, language=user_language, cur=service_context.cur)
-        self.session_context.external_user.set_user(user.user_id, service_context.cur)
+        user = await create_user(name=username, language=user_language, cur=service_context.cur)
+        await self.session_context.external_user.set_user(user.user_id, service_context.cur)
         self.session_context.user = user
         new_state = UserMenuState(session_context=self.session_context)
         return await new_state.show(
@@ -138,72 +139,58 @@ class NewUserInitialState(SessionState):
 
         match service_context.update.callback_query.data:
             case "keep_language":
-                async def on_select_name_back(service_context2: ServiceContext) -> SessionState:
-                    await service_context2.update.callback_query.edit_message_text(
-                        **await create_menu_params(service_context, self.user_language)
-                    )
-                    return self
-
-                async def on_select_name_complete(
-                        username: str, service_context2: ServiceContext
-                ) -> SessionState | None:
-                    return await self.create_user(
-                        user_language=self.user_language,
-                        username=username,
-                        service_context=service_context2
-                    )
-
+                self.selected_language = self.user_language
                 return await SelectUserNameState.create(
                     session_context=self.session_context,
                     user_language=self.user_language,
                     service_context=service_context,
-                    on_back=on_select_name_back,
-                    on_complete=on_select_name_complete,
+                    on_back=self.on_back,
+                    on_complete=self.on_select_name_complete,
                 )
 
             case "other_language":
-                async def on_back(service_context2: ServiceContext) -> SessionState:
-                    await service_context2.update.callback_query.edit_message_text(
-                        **await create_menu_params(service_context2, self.user_language)
-                    )
-                    return self
-
-                async def on_complete(
-                        selected_language: langcodes.Language,
-                        service_context2: ServiceContext,
-                ) -> SessionState:
-                    async def on_select_name_back(service_context3: ServiceContext) -> SessionState:
-                        return await SelectLanguageState.create(
-                            session_context=self.session_context,
-                            user_language=self.user_language,
-                            service_context=service_context3,
-                            on_back=on_back,
-                            on_complete=on_complete,
-                        )
-
-                    async def on_select_name_complete(
-                            username: str, service_context2: ServiceContext
-                    ) -> SessionState | None:
-                        return await self.create_user(
-                            user_language=selected_language,
-                            username=username,
-                            service_context=service_context2
-                        )
-
-                    return await SelectUserNameState.create(
-                        session_context=self.session_context,
-                        user_language=selected_language,
-                        service_context=service_context2,
-                        on_back=on_select_name_back,
-                        on_complete=on_select_name_complete,
-                    )
-
                 return await SelectLanguageState.create(
                     user_language=self.user_language,
                     session_context=self.session_context,
                     service_context=service_context,
-                    on_back=on_back,
-                    on_complete=on_complete,
+                    on_back=self.on_back,
+                    on_complete=self.on_language_selected,
                 )
 
         return self
+
+    async def on_back(self, service_context: ServiceContext) -> SessionState:
+        await service_context.update.callback_query.edit_message_text(
+            **await create_menu_params(service_context, self.user_language)
+        )
+        return self
+
+    async def on_language_selected(
+            self,
+            selected_language: langcodes.Language,
+            service_context: ServiceContext,
+    ) -> SessionState:
+        self.selected_language = selected_language
+        return await SelectUserNameState.create(
+            session_context=self.session_context,
+            user_language=selected_language,
+            service_context=service_context,
+            on_back=self.on_select_name_back,
+            on_complete=self.on_select_name_complete,
+        )
+
+    async def on_select_name_back(self, service_context: ServiceContext) -> SessionState:
+        return await SelectLanguageState.create(
+            session_context=self.session_context,
+            user_language=self.user_language,
+            service_context=service_context,
+            on_back=self.on_back,
+            on_complete=self.on_language_selected,
+        )
+
+    async def on_select_name_complete(self, username: str, service_context: ServiceContext) -> SessionState | None:
+        return await self.create_user(
+            user_language=self.selected_language,
+            username=username,
+            service_context=service_context
+        )
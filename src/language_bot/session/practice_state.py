@@ -15,18 +15,18 @@ class PracticeState(SessionState):
     vocabularies: Optional[Dict[str, Vocabulary]] = None
 
     async def show(self, service_context: ServiceContext):
-        self.vocabularies = get_user_vocabularies(self.session_context.user.user_id, service_context.cur)
+        self.vocabularies = await get_user_vocabularies(self.session_context.user.user_id, service_context.cur)
         if len(self.vocabularies) == 0:
             await service_context.update.callback_query.edit_message_text(
-                text=service_context.translation_service.translate(
-                    source_text=f"{self.session_context.user.name}, You still don't have any vocabularies. "
-                                f"Send text here to translate and I will suggest you new "
-                                f"words for learning.",
-                    source_language="en",
+                text=await service_context.translation_service.translate_ui(
+                    "{name}, You still don't have any vocabularies. "
+                    "Send text here to translate and I will suggest you new "
+                    "words for learning.",
                     target_language=self.session_context.user.language.language,
-                ).target_text,
+                    name=self.session_context.user.name,
+                ),
                 reply_markup=telegram.InlineKeyboardMarkup([[
-                    back_button(
+                    await back_button(
                         service_context=service_context,
                         language=self.session_context.user.language.language,
                         action_name="practice_back"
@@ -35,30 +35,33 @@ class PracticeState(SessionState):
             )
         else:
             items = [[
-                back_button(
+                await back_button(
                     service_context=service_context,
                     language=self.session_context.user.language.language,
                     action_name="practice_back"
                 ),
             ]]
 
-            for _, vocabulary in self.vocabularies.items():
+            translations = await service_context.translation_service.translate_many(
+                source_texts=[
+                    f"{langcodes.get(vocabulary.language).language_name()} - ({vocabulary.word_count} words)"
+                    for vocabulary in self.vocabularies.values()
+                ],
+                source_language="en",
+                target_language=self.session_context.user.language.language,
+            )
+            for vocabulary, translation in zip(self.vocabularies.values(), translations):
                 items.append([telegram.InlineKeyboardButton(
-                    text=service_context.translation_service.translate(
-                        source_text=f"{langcodes.get(vocabulary.language).language_name()} "
-                                    f"- ({vocabulary.word_count} words)",
-                        source_language="en",
-                        target_language=self.session_context.user.language.language,
-                    ).target_text,
+                    text=translation.target_text,
                     callback_data=f"{vocabulary.language}_vocab"
                 )])
 
             await service_context.update.callback_query.edit_message_text(
-                text=service_context.translation_service.translate(
-                    source_text=f"{self.session_context.user.name}, select vocabulary to practice: ",
-                    source_language="en",
+                text=await service_context.translation_service.translate_ui(
+                    "{name}, select vocabulary to practice: ",
                     target_language=self.session_context.user.language.language,
-                ).target_text,
+                    name=self.session_context.user.name,
+                ),
                 reply_markup=telegram.InlineKeyboardMarkup(items),
             )
 
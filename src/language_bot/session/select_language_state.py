@@ -8,23 +8,25 @@ from ..service_context import ServiceContext
 from .session_context import SessionContext
 
 
-def create_language_buttons(
+async def create_language_buttons(
         target_language: str,
         service_context: ServiceContext,
 ) -> telegram.InlineKeyboardMarkup:
     items = []
-    for language in sorted(service_context.translation_service.get_supported_target_languages()):
+    languages = sorted(service_context.translation_service.get_supported_target_languages())
+    translations = await service_context.translation_service.translate_many(
+        source_texts=[langcodes.get(language).language_name() for language in languages],
+        source_language="en",
+        target_language=target_language,
+    )
+    for language, translation in zip(languages, translations):
         items.append([telegram.InlineKeyboardButton(
-            text=service_context.translation_service.translate(
-                source_text=f"{langcodes.get(language).language_name()}",
-                source_language="en",
-                target_language=target_language,
-            ).target_text,
+            text=translation.target_text,
             callback_data=f"{language}_language"
         )])
 
     items.append([
-        back_button(
+        await back_button(
             service_context=service_context,
             language=target_language,
             action_name="back"
@@ -48,14 +50,13 @@ class SelectLanguageState(SessionState):
             on_complete: Callable[[langcodes.Language, ServiceContext], Coroutine[Any, Any, SessionState]],
     ) -> "SelectLanguageState":
         await service_context.update.callback_query.edit_message_text(
-            text=service_context.translation_service.translate(
-                source_text=f"Select one of the languages which I know at the moment. "
+            text=await service_context.translation_service.translate_ui(
+                "Select one of the languages which I know at the moment. "
                 "I'm sorry if I still can not speak your native language. "
                 "I'm learning hard everyday to be better language bot. ",
-                source_language="en",
                 target_language=user_language.language,
-            ).target_text,
-            reply_markup=create_language_buttons(
+            ),
+            reply_markup=await create_language_buttons(
                 user_language.language,
                 service_context
             ),
@@ -23,14 +23,14 @@ class SelectUserNameState(SessionState):
             on_complete: Callable[[str, ServiceContext], Coroutine[Any, Any, SessionState]],
     ) -> "SelectUserNameState":
         await service_context.update.callback_query.edit_message_text(
-            text=service_context.translation_service.translate(
-                source_text=f"@{service_context.update.effective_user.username} please, "
-                f"send message here, how should I address You? "
+            text=await service_context.translation_service.translate_ui(
+                "@{username} please, "
+                "send message here, how should I address You? "
                 "Note: this name shouldn't be longer than 30 symbols.",
-                source_language="en",
                 target_language=user_language.language,
-            ).target_text,
-            reply_markup=telegram.InlineKeyboardMarkup([[back_button(
+                username=service_context.update.effective_user.username,
+            ),
+            reply_markup=telegram.InlineKeyboardMarkup([[await back_button(
                 service_context=service_context,
                 language=user_language.language,
                 action_name="back"
@@ -58,11 +58,10 @@ class SelectUserNameState(SessionState):
         username = service_context.update.message.text
         if len(username) > 30:
             await service_context.update.message.reply_text(
-                text=service_context.translation_service.translate(
-                    source_text=f"This is name is too long. Name should be shorter than 30 symbols. Try again please.",
-                    source_language="en",
+                text=await service_context.translation_service.translate_ui(
+                    "This is name is too long. Name should be shorter than 30 symbols. Try again please.",
                     target_language=self.user_language.language,
-                ).target_text,
+                ),
             )
 
             return self
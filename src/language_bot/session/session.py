@@ -1,17 +1,26 @@
 import logging
+import random
+import statistics
 from dataclasses import dataclass
-from typing import Dict, Optional
-from psycopg2.extensions import cursor
+from typing import Dict, Optional, Any
 
+import langcodes
+import redis.asyncio as redis
+
+from ..common.cache import LRUCache
+from ..common.config import Config
+from ..common.metrics import approximate_size
 from ..user import User, get_user
 from ..external_user import get_external_user, create_external_user
 from ..service_context import ServiceContext
+from ..common.database import AsyncCursor
 from .session_state import SessionState, UnprocessedEvent
 from .new_user_initial_state import NewUserInitialState
 from .user_menu_state import UserMenuState
 from .session_context import SessionContext
 from .base_user_session_state import BaseUserSessionState
-from ..chatbots.chatbot_service_interface import ChatbotServiceInterface
+from .session_store import RedisSessionStore
+from ..chatbots.chatbot_service_interface import ChatbotServiceInterface, ChatbotSession
 
 
 logger = logging.getLogger(__name__)
@@ -84,18 +93,66 @@ class Session:
             self.session_state = await self.session_state.message_handler(service_context)
 
 
-SESSIONS: Dict[str, Session] = {}
+# Chatbot model, services of the update and cached languages are shared by all sessions
+SHARED_TYPES = (ChatbotSession, ServiceContext, langcodes.Language)
+
+SESSIONS: LRUCache[str, Session] = LRUCache(max_size=10000)
+SESSION_SIZE_SAMPLE = 100
+# Shared store of session states, None - sessions are kept in SESSIONS
+SESSION_STORE: RedisSessionStore | None = None
+
+
+def init_sessions(config: Config):
+    global SESSIONS, SESSION_SIZE_SAMPLE, SESSION_STORE
+    SESSIONS = LRUCache(max_size=config.SESSION_STORE_SIZE, ttl=config.SESSION_IDLE_TTL, sliding=True)
+    SESSION_SIZE_SAMPLE = config.SESSION_SIZE_SAMPLE
+    if config.SESSION_STORE == "redis":
+        SESSION_STORE = RedisSessionStore(
+            redis_client=redis.Redis(
+                host=config.REDIS_HOST,
+                port=config.REDIS_PORT,
+                username=config.REDIS_USERNAME,
+                password=config.REDIS_PASSWORD,
+            ),
+            ttl=config.SESSION_IDLE_TTL,
+        )
+
+
+async def close_sessions():
+    if SESSION_STORE is not None:
+        await SESSION_STORE.close()
 
 
-def get_session(
+def session_stats() -> Dict[str, Any]:
+    """
+    Counters of the session store and memory held by sessions, estimated by a random sample of them
+    """
+    if SESSION_STORE is not None:
+        return SESSION_STORE.stats()
+
+    SESSIONS.purge_expired()
+    sessions = [session for _, session in SESSIONS.items()]
+    sample = random.sample(sessions, min(len(sessions), SESSION_SIZE_SAMPLE))
+    bytes_per_session = statistics.mean(
+        approximate_size(session, shared=SHARED_TYPES) for session in sample
+    ) if sample else 0
+    return {
+        **SESSIONS.stats(),
+        "bytes_per_session": bytes_per_session,
+        "bytes_total": bytes_per_session * len(sessions),
+    }
+
+
+async def get_session(
         platform: str,
         platform_user_id: str,
         chatbot_service: ChatbotServiceInterface,
-        cur: cursor
+        cur: AsyncCursor
 ) -> Session:
-    external_user = get_external_user(platform, platform_user_id, cur)
+    # Users served by several bot processes may have been changed by another process
+    external_user = await get_external_user(platform, platform_user_id, cur, use_cache=SESSION_STORE is None)
     if not external_user:
-        external_user = create_external_user(platform, platform_user_id, None, None, cur)
+        external_user = await create_external_user(platform, platform_user_id, None, None, cur)
         session = Session(
             session_context=SessionContext(
                 chatbot_session=chatbot_service.start_session(''),
@@ -105,11 +162,11 @@ def get_session(
             session_state=None
         )
     else:
-        session = SESSIONS.get(external_user.get_user_ref(), None)
+        session = SESSIONS.get(external_user.get_user_ref(), None) if SESSION_STORE is None else None
         if session:
             return session
 
-        user = get_user(external_user.user_id, cur)
+        user = await get_user(external_user.user_id, cur, use_cache=SESSION_STORE is None)
         session = Session(
             session_context=SessionContext(
                 chatbot_session=chatbot_service.start_session(''),
@@ -118,6 +175,25 @@ def get_session(
             ),
             session_state=None
         )
+        if SESSION_STORE is not None:
+            session.session_state = await SESSION_STORE.load(external_user.get_user_ref(), session.session_context)
 
-    SESSIONS[external_user.get_user_ref()] = session
+    if SESSION_STORE is None:
+        SESSIONS.put(external_user.get_user_ref(), session)
     return session
+
+
+def discard_session(platform: str, platform_user_id: str):
+    """
+    Forgets the session kept in memory, the next update of the user starts with a session restored from the database
+    """
+    if SESSION_STORE is None:
+        SESSIONS.pop(f"{platform}/{platform_user_id}", None)
+
+
+async def save_session(session: Session):
+    """
+    Stores the state the session has reached, sessions kept in memory need nothing
+    """
+    if SESSION_STORE is not None:
+        await SESSION_STORE.save(session.session_context.external_user.get_user_ref(), session.session_state)
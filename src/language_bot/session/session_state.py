@@ -1,5 +1,6 @@
 import telegram
 from dataclasses import dataclass
+from typing import Dict
 
 from ..service_context import ServiceContext
 from .session_context import SessionContext
@@ -9,10 +10,18 @@ class UnprocessedEvent(RuntimeError):
     pass
 
 
+# maps state kind -> state class, filled as state classes are defined
+STATE_KINDS: Dict[str, type] = {}
+
+
 @dataclass
 class SessionState:
     session_context: SessionContext
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        STATE_KINDS[cls.__name__] = cls
+
     async def callback_query_handler(
             self,
             service_context: ServiceContext,
@@ -26,16 +35,15 @@ class SessionState:
         raise UnprocessedEvent()
 
 
-def back_button(
+async def back_button(
         service_context: ServiceContext,
         language: str,
         action_name: str
 ) -> telegram.InlineKeyboardButton:
     return telegram.InlineKeyboardButton(
-        text=service_context.translation_service.translate(
-            source_text=f"Back",
-            source_language="en",
+        text=await service_context.translation_service.translate_ui(
+            "Back",
             target_language=language,
-        ).target_text + " ⬅️",
+        ) + " ⬅️",
         callback_data=action_name,
     )
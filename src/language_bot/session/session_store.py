@@ -0,0 +1,232 @@
+import collections.abc
+import dataclasses
+import functools
+import json
+import logging
+import types
+import typing
+import zlib
+from typing import Dict, Any, List, Callable, Tuple
+
+import langcodes
+import pydantic
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from .session_context import SessionContext
+from .session_state import SessionState, STATE_KINDS
+
+
+logger = logging.getLogger(__name__)
+
+SESSION_FORMAT_VERSION = 1
+SESSION_KEY_PREFIX = "session:"
+
+
+class SessionStateNotSerializable(RuntimeError):
+    pass
+
+
+class FieldCodec:
+    """
+    Converts value of a state field to JSON compatible value and back
+    """
+
+    def encode(self, value: Any, add_state: Callable[[SessionState], int]) -> Any:
+        raise RuntimeError("FieldCodec.encode")
+
+    def decode(self, value: Any) -> Any:
+        raise RuntimeError("FieldCodec.decode")
+
+
+class ModelCodec(FieldCodec):
+    def __init__(self, hint: Any):
+        self.adapter = pydantic.TypeAdapter(hint)
+
+    def encode(self, value: Any, add_state: Callable[[SessionState], int]) -> Any:
+        return self.adapter.dump_python(value, mode="json")
+
+    def decode(self, value: Any) -> Any:
+        return self.adapter.validate_python(value)
+
+
+class LanguageCodec(FieldCodec):
+    def encode(self, value: langcodes.Language | None, add_state: Callable[[SessionState], int]) -> str | None:
+        return None if value is None else value.to_tag()
+
+    def decode(self, value: str | None) -> langcodes.Language | None:
+        return None if value is None else langcodes.get(value)
+
+
+class CallbackCodec(FieldCodec):
+    """
+    Callbacks are methods of other states of the session, stored as [index of the state, method name]
+    """
+
+    def encode(self, value: Any, add_state: Callable[[SessionState], int]) -> List[Any]:
+        if not isinstance(value, types.MethodType) or not isinstance(value.__self__, SessionState):
+            raise SessionStateNotSerializable(f"Callback {value} is not a method of session state")
+
+        return [add_state(value.__self__), value.__func__.__name__]
+
+    def decode(self, value: List[Any]) -> Tuple[int, str]:
+        return value[0], value[1]
+
+
+@functools.cache
+def field_codecs(state_class: type) -> Dict[str, FieldCodec]:
+    hints = typing.get_type_hints(state_class)
+    codecs = {}
+    for field in dataclasses.fields(state_class):
+        if field.name == "session_context":
+            continue
+
+        hint = hints[field.name]
+        if typing.get_origin(hint) is collections.abc.Callable:
+            codecs[field.name] = CallbackCodec()
+        elif hint is langcodes.Language or langcodes.Language in typing.get_args(hint):
+            codecs[field.name] = LanguageCodec()
+        else:
+            codecs[field.name] = ModelCodec(hint)
+
+    return codecs
+
+
+def to_descriptors(state: SessionState) -> List[Dict[str, Any]]:
+    """
+    Reduces the state and all states reachable through its callbacks to descriptors: state kind and
+    its fields. The first descriptor is the given state, callbacks refer to the others by index
+    """
+    descriptors: List[Dict[str, Any] | None] = []
+    # maps id of state -> index of its descriptor, so that a state referenced by several callbacks is stored once
+    indexes: Dict[int, int] = {}
+
+    def add_state(current: SessionState) -> int:
+        index = indexes.get(id(current), None)
+        if index is not None:
+            return index
+
+        index = len(descriptors)
+        indexes[id(current)] = index
+        descriptors.append(None)
+        descriptor = {"kind": type(current).__name__}
+        for name, codec in field_codecs(type(current)).items():
+            descriptor[name] = codec.encode(getattr(current, name), add_state)
+        descriptors[index] = descriptor
+        return index
+
+    add_state(state)
+    return descriptors
+
+
+def from_descriptors(descriptors: List[Dict[str, Any]], session_context: SessionContext) -> SessionState:
+    states = []
+    callbacks = []
+    for descriptor in descriptors:
+        state_class = STATE_KINDS[descriptor["kind"]]
+        fields = {}
+        for name, codec in field_codecs(state_class).items():
+            value = codec.decode(descriptor[name])
+            if isinstance(codec, CallbackCodec):
+                # States may refer to each other, so callbacks are bound once all states are created
+                callbacks.append((len(states), name, value))
+                value = None
+            fields[name] = value
+        states.append(state_class(session_context=session_context, **fields))
+
+    for index, name, (state_index, method_name) in callbacks:
+        # The method may be renamed or removed by another version of the bot
+        method = getattr(states[state_index], method_name, None)
+        if not callable(method):
+            raise SessionStateNotSerializable(
+                f"{type(states[state_index]).__name__} has no callback method {method_name}"
+            )
+        setattr(states[index], name, method)
+
+    return states[0]
+
+
+def encode_state(state: SessionState) -> bytes:
+    data = json.dumps(
+        {"version": SESSION_FORMAT_VERSION, "states": to_descriptors(state)},
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return zlib.compress(data.encode("utf-8"))
+
+
+def decode_state(data: bytes, session_context: SessionContext) -> SessionState:
+    content = json.loads(zlib.decompress(data))
+    if content["version"] != SESSION_FORMAT_VERSION:
+        raise SessionStateNotSerializable(f"Unsupported session format version {content['version']}")
+
+    return from_descriptors(content["states"], session_context)
+
+
+class RedisSessionStore:
+    """
+    Keeps session states in Redis, so that any bot process can serve the next update of the user
+    and sessions survive restarts
+    """
+
+    def __init__(self, redis_client: redis.Redis, ttl: float):
+        """
+        :param ttl: time (seconds) since the last update after which the session is dropped
+        """
+        self.redis = redis_client
+        self.ttl = int(ttl)
+        self.loads = 0
+        self.misses = 0
+        self.saves = 0
+        self.errors = 0
+        self.bytes_saved = 0
+
+    async def load(self, user_ref: str, session_context: SessionContext) -> SessionState | None:
+        self.loads += 1
+        try:
+            data = await self.redis.get(SESSION_KEY_PREFIX + user_ref)
+        except RedisError as e:
+            logger.warning(f"Failed to load session of {user_ref}: {e}")
+            self.errors += 1
+            return None
+
+        if data is None:
+            self.misses += 1
+            return None
+
+        # State saved by another version of the bot may not match current states, the user starts over then
+        try:
+            return decode_state(data, session_context)
+        except (ValueError, KeyError, TypeError, IndexError, AttributeError, zlib.error,
+                pydantic.ValidationError, SessionStateNotSerializable) as e:
+            logger.warning(f"Failed to decode session of {user_ref}: {e}")
+            self.errors += 1
+            return None
+
+    async def save(self, user_ref: str, state: SessionState | None):
+        try:
+            if state is None:
+                await self.redis.delete(SESSION_KEY_PREFIX + user_ref)
+                return
+
+            data = encode_state(state)
+            await self.redis.set(SESSION_KEY_PREFIX + user_ref, data, ex=self.ttl)
+        except (RedisError, SessionStateNotSerializable) as e:
+            logger.warning(f"Failed to save session of {user_ref}: {e}")
+            self.errors += 1
+            return
+
+        self.saves += 1
+        self.bytes_saved += len(data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loads": self.loads,
+            "misses": self.misses,
+            "saves": self.saves,
+            "errors": self.errors,
+            "bytes_per_session": self.bytes_saved / self.saves if self.saves else 0.0,
+        }
+
+    async def close(self):
+        await self.redis.aclose()
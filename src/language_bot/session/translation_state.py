@@ -17,30 +17,29 @@ logger = logging.getLogger(__name__)
 class TranslationState(SessionState):
     translation: TranslationResult
 
-    def create_translation_result_params(
+    async def create_translation_result_params(
             self, service_context: ServiceContext
     ):
         return {
-            "text": service_context.translation_service.translate(
-                source_text=f"(Translated from {langcodes.get(self.translation.source_language).language_name()})",
-                source_language="en",
+            "text": await service_context.translation_service.translate_ui(
+                "(Translated from {language})",
                 target_language=self.translation.target_language,
-            ).target_text + " : " + self.translation.target_text,
+                language=langcodes.get(self.translation.source_language).language_name(),
+            ) + " : " + self.translation.target_text,
             "reply_markup": telegram.InlineKeyboardMarkup([
                 [telegram.InlineKeyboardButton(
-                    text=service_context.translation_service.translate(
-                        source_text="Add words to your vocabulary",
-                        source_language="en",
+                    text=await service_context.translation_service.translate_ui(
+                        "Add words to your vocabulary",
                         target_language=self.translation.target_language,
-                    ).target_text,
+                    ),
                     callback_data=f"add2vocab",
                 )],
                 [telegram.InlineKeyboardButton(
-                    text=service_context.translation_service.translate(
-                        source_text=f"This is not {langcodes.get(self.translation.source_language).language_name()}",
-                        source_language="en",
+                    text=await service_context.translation_service.translate_ui(
+                        "This is not {language}",
                         target_language=self.translation.target_language,
-                    ).target_text,
+                        language=langcodes.get(self.translation.source_language).language_name(),
+                    ),
                     callback_data=f"change_lang",
                 )]
             ])
@@ -49,11 +48,11 @@ class TranslationState(SessionState):
     async def show(self, service_context: ServiceContext) -> SessionState:
         if service_context.update.message:
             await service_context.update.message.reply_markdown(
-                **self.create_translation_result_params(service_context)
+                **await self.create_translation_result_params(service_context)
             )
         elif service_context.update.callback_query:
             await service_context.update.callback_query.edit_message_text(
-                **self.create_translation_result_params(service_context)
+                **await self.create_translation_result_params(service_context)
             )
         else:
             logger.warning("both message and callback_query are empty")
@@ -62,12 +61,12 @@ class TranslationState(SessionState):
 
     async def on_back(self, service_context: ServiceContext):
         await service_context.update.callback_query.edit_message_text(
-            **self.create_translation_result_params(service_context)
+            **await self.create_translation_result_params(service_context)
         )
         return self
 
     async def change_language(self, language: langcodes.Language, service_context: ServiceContext) -> SessionState:
-        self.translation = service_context.translation_service.translate(
+        self.translation = await service_context.translation_service.translate(
             source_text=self.translation.source_text,
             source_language=language.language,
             target_language=self.session_context.user.language.language
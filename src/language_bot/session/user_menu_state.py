@@ -8,25 +8,23 @@ from .user_settings_state import UserSettingsState
 from .practice_state import PracticeState
 
 
-def menu_buttons(service_context: ServiceContext, language: str) -> telegram.InlineKeyboardMarkup:
+async def menu_buttons(service_context: ServiceContext, language: str) -> telegram.InlineKeyboardMarkup:
     return telegram.InlineKeyboardMarkup([
         [
             telegram.InlineKeyboardButton(
-                text=service_context.translation_service.translate(
-                    source_text=f"Settings",
-                    source_language="en",
+                text=await service_context.translation_service.translate_ui(
+                    "Settings",
                     target_language=language,
-                ).target_text + " ⚙️",
+                ) + " ⚙️",
                 callback_data="menu_settings"
             )
         ],
         [
             telegram.InlineKeyboardButton(
-                text=service_context.translation_service.translate(
-                    source_text=f"Practice",
-                    source_language="en",
+                text=await service_context.translation_service.translate_ui(
+                    "Practice",
                     target_language=language,
-                ).target_text + " 💪",
+                ) + " 💪",
                 callback_data="menu_practice"
             ),
         ]
@@ -35,12 +33,15 @@ def menu_buttons(service_context: ServiceContext, language: str) -> telegram.Inl
 
 async def menu_params(text: str | None, service_context: ServiceContext, language: langcodes.Language):
     return {
-        "text": service_context.translation_service.translate(
-            source_text=f"Select action or send me any text and I will translate it for You" if text is None else text,
+        "text": await service_context.translation_service.translate_ui(
+            "Select action or send me any text and I will translate it for You",
+            target_language=language.language,
+        ) if text is None else (await service_context.translation_service.translate(
+            source_text=text,
             source_language="en",
             target_language=language.language,
-        ).target_text,
-        "reply_markup": menu_buttons(service_context, language.language),
+        )).target_text,
+        "reply_markup": await menu_buttons(service_context, language.language),
     }
 
 
@@ -12,29 +12,27 @@ from .select_user_name_state import SelectUserNameState
 
 async def settings_params(service_context: ServiceContext, user: User):
     return {
-        "text": service_context.translation_service.translate(
-            source_text=f"Settings of your account",
-            source_language="en",
+        "text": await service_context.translation_service.translate_ui(
+            "Settings of your account",
             target_language=user.language.language,
-        ).target_text,
+        ),
         "reply_markup": telegram.InlineKeyboardMarkup([
             [telegram.InlineKeyboardButton(
-                text=service_context.translation_service.translate(
-                    source_text=f"Default language ({langcodes.get(user.language).language_name()})",
-                    source_language="en",
-                    target_language=user.language.language
-                ).target_text,
+                text=await service_context.translation_service.translate_ui(
+                    "Default language ({language})",
+                    target_language=user.language.language,
+                    language=user.language.language_name(),
+                ),
                 callback_data="change_user_language"
             )],
             [telegram.InlineKeyboardButton(
-                text=service_context.translation_service.translate(
-                    source_text=f"Name",
-                    source_language="en",
-                    target_language=user.language.language
-                ).target_text + f" - {user.name}",
+                text=await service_context.translation_service.translate_ui(
+                    "Name",
+                    target_language=user.language.language,
+                ) + f" - {user.name}",
                 callback_data="change_user_name"
             )],
-            [back_button(
+            [await back_button(
                 service_context=service_context,
                 language=user.language.language,
                 action_name="settings_back"
@@ -58,54 +56,21 @@ class UserSettingsState(SessionState):
     ) -> "SessionState" or None:
         match service_context.update.callback_query.data:
             case "change_user_language":
-                async def on_back(service_context2: ServiceContext) -> SessionState:
-                    await service_context2.update.callback_query.edit_message_text(
-                        **await settings_params(service_context2, self.session_context.user)
-                    )
-                    return self
-
-                async def on_complete(
-                        selected_language: langcodes.Language,
-                        service_context2: ServiceContext,
-                ) -> SessionState:
-                    self.session_context.user.set_language(selected_language, service_context2.cur)
-                    return await self.on_return(
-                        f"{self.session_context.user.name}, now I will speak to You in {selected_language.language_name()}."
-                        f"What will we do next?",
-                        service_context2
-                    )
-
                 return await SelectLanguageState.create(
                     session_context=self.session_context,
                     user_language=self.session_context.user.language,
                     service_context=service_context,
-                    on_back=on_back,
-                    on_complete=on_complete
+                    on_back=self.on_back,
+                    on_complete=self.on_language_selected
                 )
 
             case "change_user_name":
-                async def on_back(service_context2: ServiceContext) -> SessionState:
-                    await service_context2.update.callback_query.edit_message_text(
-                        **await settings_params(service_context2, self.session_context.user)
-                    )
-                    return self
-
-                async def on_complete(
-                        user_name: str,
-                        service_context2: ServiceContext,
-                ) -> SessionState:
-                    self.session_context.user.set_name(user_name, service_context2.cur)
-                    return await self.on_return(
-                        f"Good, {self.session_context.user.name}. What will we do next?",
-                        service_context2
-                    )
-
                 return await SelectUserNameState.create(
                     session_context=self.session_context,
                     user_language=self.session_context.user.language,
                     service_context=service_context,
-                    on_back=on_back,
-                    on_complete=on_complete,
+                    on_back=self.on_back,
+                    on_complete=self.on_name_selected,
                 )
 
             case "settings_back":
@@ -113,3 +78,28 @@ class UserSettingsState(SessionState):
 
             case _:
                 return await super().callback_query_handler(service_context)
+
+    async def on_back(self, service_context: ServiceContext) -> SessionState:
+        await service_context.update.callback_query.edit_message_text(
+            **await settings_params(service_context, self.session_context.user)
+        )
+        return self
+
+    async def on_language_selected(
+            self,
+            selected_language: langcodes.Language,
+            service_context: ServiceContext,
+    ) -> SessionState:
+        await self.session_context.user.set_language(selected_language, service_context.cur)
+        return await self.on_return(
+            f"{self.session_context.user.name}, now I will speak to You in {selected_language.language_name()}."
+            f"What will we do next?",
+            service_context
+        )
+
+    async def on_name_selected(self, user_name: str, service_context: ServiceContext) -> SessionState:
+        await self.session_context.user.set_name(user_name, service_context.cur)
+        return await self.on_return(
+            f"Good, {self.session_context.user.name}. What will we do next?",
+            service_context
+        )
@@ -1,9 +1,9 @@
 from dataclasses import dataclass, field
 from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-from typing import Callable, Coroutine, Any
+from typing import Callable, Coroutine, Any, List, Optional
 
 from .session_state import SessionState, back_button, UnprocessedEvent
-from ..vocabulary import Vocabulary
+from ..vocabulary import Vocabulary, VocabularyCursor
 from ..service_context import ServiceContext
 from .basic_train_vocabularyState import BasicTrainVocabularyState
 
@@ -14,37 +14,48 @@ WORDS_PER_PAGE = 30
 class VocabularyState(SessionState):
     vocabulary: Vocabulary
     on_back: Callable[[ServiceContext], Coroutine[Any, Any, SessionState]]
-    page: int = field(default=0)
+    # Positions the shown pages start after, the last one is the current page
+    page_cursors: List[Optional[VocabularyCursor]] = field(default_factory=lambda: [None])
+    # Position the next page starts after, None if the current page is the last one
+    next_cursor: Optional[VocabularyCursor] = field(default=None)
 
     async def build_form(self, service_context: ServiceContext):
-        header = service_context.translation_service.translate(
-            source_text=f"Total {self.vocabulary.word_count} words",
-            source_language="en",
+        # One extra word tells if there is a next page
+        words = await self.vocabulary.get_words(
+            after=self.page_cursors[-1],
+            limit=WORDS_PER_PAGE + 1,
             target_language=self.session_context.user.language.language,
-        ).target_text + ". " + service_context.translation_service.translate(
-            source_text=f"Page {self.page + 1}",
-            source_language="en",
+            cur=service_context.cur
+        )
+        self.next_cursor = words[WORDS_PER_PAGE - 1].cursor() if len(words) > WORDS_PER_PAGE else None
+        words = words[:WORDS_PER_PAGE]
+
+        header = await service_context.translation_service.translate_ui(
+            "Total {n} words",
             target_language=self.session_context.user.language.language,
-        ).target_text
+            n=self.vocabulary.word_count,
+        ) + ". " + await service_context.translation_service.translate_ui(
+            "Page {n}",
+            target_language=self.session_context.user.language.language,
+            n=len(self.page_cursors),
+        )
 
         navigation_buttons = []
-        if self.page > 0:
+        if len(self.page_cursors) > 1:
             navigation_buttons.append(InlineKeyboardButton(
-                text="◀️ " + service_context.translation_service.translate(
-                    source_text=f"Previous page",
-                    source_language="en",
+                text="◀️ " + await service_context.translation_service.translate_ui(
+                    "Previous page",
                     target_language=self.session_context.user.language.language,
-                ).target_text,
+                ),
                 callback_data="prev_page",
             ))
 
-        if (self.page + 1) * WORDS_PER_PAGE < self.vocabulary.word_count:
+        if self.next_cursor is not None:
             navigation_buttons.append(InlineKeyboardButton(
-                text=service_context.translation_service.translate(
-                    source_text=f"Next page",
-                    source_language="en",
+                text=await service_context.translation_service.translate_ui(
+                    "Next page",
                     target_language=self.session_context.user.language.language,
-                ).target_text + " ▶️",
+                ) + " ▶️",
                 callback_data="next_page",
             ))
 
@@ -52,46 +63,42 @@ class VocabularyState(SessionState):
             navigation_buttons,
             [
                 InlineKeyboardButton(
-                    text=service_context.translation_service.translate(
-                        source_text=f"Start training",
-                        source_language="en",
+                    text=await service_context.translation_service.translate_ui(
+                        "Start training",
                         target_language=self.session_context.user.language.language,
-                    ).target_text + " 💪",
+                    ) + " 💪",
                     callback_data="start_train",
                 )
             ],
             #[
             #    InlineKeyboardButton(
-            #        text=service_context.translation_service.translate(
+            #        text=(await service_context.translation_service.translate(
             #            source_text=f"Edit words",
             #            source_language="en",
             #            target_language=self.session_context.user.language.language,
-            #        ).target_text + " 📝",
+            #        )).target_text + " 📝",
             #        callback_data="edit",
             #    )
             #],
-            [back_button(
+            [await back_button(
                 service_context=service_context,
                 language=self.session_context.user.language.language,
                 action_name="back",
             )]
         ]
 
-        words = self.vocabulary.get_words(
-            offset=self.page * WORDS_PER_PAGE,
-            limit=WORDS_PER_PAGE,
-            cur=service_context.cur
+        # Most words are translated by the translation memory joined in SQL, only the rest are requested
+        untranslated_words = [word for word in words if word.translation is None]
+        translations = await service_context.translation_service.translate_many(
+            source_texts=[word.word for word in untranslated_words],
+            source_language=self.vocabulary.language,
+            target_language=self.session_context.user.language.language
         )
+        for word, translation in zip(untranslated_words, translations):
+            word.translation = translation.target_text
 
         await service_context.update.callback_query.edit_message_text(
-            text=header + "\n\n" + "\n".join([
-                f"{word.word} - "
-                f"""{service_context.translation_service.translate(
-                    source_text=word.word,
-                    source_language=word.language,
-                    target_language=self.session_context.user.language.language
-                ).target_text}""" for word in words
-            ]),
+            text=header + "\n\n" + "\n".join([f"{word.word} - {word.translation}" for word in words]),
             reply_markup=InlineKeyboardMarkup(buttons)
         )
 
@@ -108,12 +115,14 @@ class VocabularyState(SessionState):
                 return await self.on_back(service_context)
 
             case "prev_page":
-                self.page -= 1
+                if len(self.page_cursors) > 1:
+                    self.page_cursors.pop()
                 await self.build_form(service_context)
                 return self
 
             case "next_page":
-                self.page += 1
+                if self.next_cursor is not None:
+                    self.page_cursors.append(self.next_cursor)
                 await self.build_form(service_context)
                 return self
 
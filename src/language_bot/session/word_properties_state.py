@@ -15,23 +15,22 @@ class WordPropertiesState(SessionState):
 
     async def show(self, service_context: ServiceContext):
         await service_context.update.callback_query.edit_message_text(
-            text=self.word.word + " - " + service_context.translation_service.translate(
+            text=self.word.word + " - " + (await service_context.translation_service.translate(
                 source_text=f"{self.word.word}",
                 source_language="en",
                 target_language=self.session_context.user.language.language,
-            ).target_text,
+            )).target_text,
             reply_markup=InlineKeyboardMarkup([
-                [back_button(
+                [await back_button(
                     service_context=service_context,
                     language=self.session_context.user.language.language,
                     action_name="word_back",
                 )],
                 [InlineKeyboardButton(
-                    text=service_context.translation_service.translate(
-                        source_text=f"Remember",
-                        source_language="en",
+                    text=await service_context.translation_service.translate_ui(
+                        "Remember",
                         target_language=self.session_context.user.language.language,
-                    ).target_text + " 🧠",
+                    ) + " 🧠",
                     callback_data="word_store",
                 )]
             ])
@@ -1,94 +1,282 @@
+import asyncio
 import datetime
-from typing import List, Dict
+from typing import List, Dict, Any, Tuple, Set
 import logging
 import langcodes
-import redis
+import redis.asyncio as redis
 import hashlib
+import os
 
 from ..common.config import Config
 from .translation_service_interface import (TranslatorInterface, TranslationServiceInterface,
                                             TranslationResult, DetectedLanguages)
 from .libretranslate import Libretranslate
+from .translation_cache import TranslationCache
+from .ui_catalog import UiCatalog, UI_LANGUAGE, DEFAULT_UI_CATALOG_PATH, LANGUAGE_PLACEHOLDER, get_placeholders
+from .language_detector import NgramLanguageDetector
+from .translator_pool import TranslatorPool, Backend
+from .capability_snapshot import load_snapshot, save_snapshot
+from .translation_memory import TranslationMemory, is_memorable
+from ..common.database import Database
+from ..common.single_flight import SingleFlight
 
 
 logger = logging.getLogger(__name__)
 TRANSLATION_EXPIRATION_DAYS = 7
 
 
+def get_translation_id(source_text: str, source_language: str, target_language: str) -> str:
+    hasher = hashlib.md5()
+    hasher.update((source_text + source_language + target_language).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def get_detection_id(source_text: str) -> str:
+    hasher = hashlib.md5()
+    hasher.update(source_text.encode('utf-8'))
+    return "detect:" + hasher.hexdigest()
+
+
 class TranslationServiceAggregator(TranslationServiceInterface):
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, database: Database):
         self.redis = redis.Redis(
             host=config.REDIS_HOST,
             port=config.REDIS_PORT,
             username=config.REDIS_USERNAME,
             password=config.REDIS_PASSWORD,
         )
+        self.cache = TranslationCache(
+            redis_client=self.redis,
+            expiration=datetime.timedelta(days=TRANSLATION_EXPIRATION_DAYS),
+            local_cache_size=config.TRANSLATION_CACHE_SIZE,
+            local_cache_ttl=config.TRANSLATION_CACHE_TTL,
+            compression_threshold=config.TRANSLATION_CACHE_COMPRESSION_THRESHOLD,
+        )
+        # Concurrent requests for the same translation or detection are sent to translator only once
+        self.single_flight: SingleFlight[str, TranslationResult | DetectedLanguages] = SingleFlight()
+        self.lock_timeout = config.TRANSLATION_LOCK_TIMEOUT
+        self.memory: TranslationMemory | None = None
+        if config.TRANSLATION_MEMORY:
+            self.memory = TranslationMemory(database)
+
+        ui_catalog_path = config.UI_CATALOG_PATH or DEFAULT_UI_CATALOG_PATH
+        if os.path.exists(ui_catalog_path):
+            self.ui_catalog = UiCatalog.load(ui_catalog_path)
+            logger.info(f"Loaded {len(self.ui_catalog)} UI translations from {ui_catalog_path}")
+        else:
+            logger.warning(f"UI catalog {ui_catalog_path} not found, UI strings will be translated at runtime")
+            self.ui_catalog = UiCatalog()
+        self.ui_catalog_hits = 0
+        self.ui_catalog_misses = 0
+
+        self.pool = TranslatorPool(
+            hedge_delay=config.TRANSLATION_HEDGE_DELAY,
+            failure_threshold=config.TRANSLATION_FAILURE_THRESHOLD,
+            reset_timeout=config.TRANSLATION_CIRCUIT_RESET_TIMEOUT,
+        )
+        self.health_check_interval = config.TRANSLATION_HEALTH_CHECK_INTERVAL
+        self.background_tasks: List[asyncio.Task] = []
 
-        # maps target_language -> source_language -> list of available translators
-        self.translation_table: Dict[str, Dict[str, List[TranslatorInterface]]] = {}
         for translator_config in config.TRANSLATION_SERVICES:
             match translator_config.type:
                 case "libretranslate":
-                    libretranslate_instance = Libretranslate(url=translator_config.url)
-                    for translation_pair in libretranslate_instance.get_supported_pairs():
-                        source_language = translation_pair[0]
-                        target_language = translation_pair[1]
-                        (self.translation_table
-                         .setdefault(target_language, {})
-                         .setdefault(source_language, [])
-                         .append(libretranslate_instance))
-
-    def get_translation_by_id(self, translation_id: str) -> TranslationResult | None:
-        cached_serialized = self.redis.get(translation_id)
-        if cached_serialized is not None:
+                    libretranslate_instance = Libretranslate(
+                        url=translator_config.url,
+                        timeout=translator_config.timeout,
+                        max_connections=translator_config.max_connections,
+                        max_keepalive_connections=translator_config.max_keepalive_connections,
+                    )
+                    self.pool.add(str(translator_config.url), libretranslate_instance)
+
+        # Supported pairs are taken from the snapshot of the previous run so that startup doesn't wait
+        # for translators, actual pairs are requested in background by refresh_capabilities()
+        self.snapshot_path = config.TRANSLATION_SNAPSHOT_PATH
+        self.snapshot_refresh_interval = config.TRANSLATION_SNAPSHOT_REFRESH_INTERVAL
+        snapshot = load_snapshot(self.snapshot_path)
+        self.supported_pairs: Dict[str, List[Tuple[str, str]]] = {
+            name: snapshot[name] for name in self.pool.backends.keys() if name in snapshot
+        }
+        # maps target_language -> source_language -> list of translator instances supporting this pair
+        self.translation_table: Dict[str, Dict[str, List[Backend]]] = self.build_translation_table()
+
+        self.local_language_detection = config.LOCAL_LANGUAGE_DETECTION
+        self.language_detector: NgramLanguageDetector | None = None
+        self.language_detector_sources: Set[str] = set()
+        self.local_detections = 0
+        # Detector is trained in the background by start(), languages are detected remotely until then
+        self.language_detector_lock = asyncio.Lock()
+
+    def build_translation_table(self) -> Dict[str, Dict[str, List[Backend]]]:
+        translation_table = {}
+        for name, pairs in self.supported_pairs.items():
+            backend = self.pool.backends[name]
+            for source_language, target_language in pairs:
+                (translation_table
+                 .setdefault(target_language, {})
+                 .setdefault(source_language, [])
+                 .append(backend))
+
+        return translation_table
+
+    def get_source_languages(self) -> Set[str]:
+        return {
+            source_language
+            for _, source_languages in self.translation_table.items()
+            for source_language in source_languages.keys()
+        }
+
+    def update_language_detector(self):
+        if not self.local_language_detection:
+            return
+
+        source_languages = self.get_source_languages()
+        if not source_languages or source_languages == self.language_detector_sources:
+            return
+
+        try:
+            self.language_detector = NgramLanguageDetector.from_udhr(source_languages)
+            self.language_detector_sources = source_languages
+            logger.info(f"Local language detection enabled for {len(self.language_detector.languages())} languages")
+        except Exception as e:
+            logger.warning(f"Local language detection disabled: {e}")
+
+    async def refresh_capabilities(self):
+        supported_pairs = dict(self.supported_pairs)
+        for name, backend in self.pool.backends.items():
             try:
-                translation = TranslationResult.model_validate_json(cached_serialized)
-                # prolong lifetime of this translation
-                self.redis.expire(translation_id, datetime.timedelta(days=TRANSLATION_EXPIRATION_DAYS))
-                return translation
-            except ValueError as _:
-                logger.warning(f"Failed to deserialize cached translation. Will clear cache entry {translation_id}")
-                self.redis.delete(translation_id)
-
-        return None
-
-    def detect_language(self, source_text: str) -> DetectedLanguages:
-        available_translators: Dict[str, TranslatorInterface] = {}
-        for _, source_languages in self.translation_table.items():
-            for _, translators in source_languages.items():
-                logger.info(translators)
-                for translator in translators:
-                    available_translators.setdefault(translator.type(), translator)
-
-        for _, translator in available_translators.items():
-            return translator.detect_language(source_text=source_text)
-
-        raise RuntimeError(f"Can not detect language")
-
-    def translate(self, source_text: str, source_language: str, target_language: str) -> TranslationResult:
-        hasher = hashlib.md5()
-        hasher.update((source_text + source_language + target_language).encode('utf-8'))
-        translation_id = hasher.hexdigest()
-        translation = self.get_translation_by_id(translation_id)
-        if translation:
-            return translation
+                supported_pairs[name] = sorted(await backend.translator.load_supported_pairs())
+            except Exception as e:
+                # Pairs from the previous snapshot are kept for unavailable translator
+                logger.warning(f"Unable to get supported language pairs of {name}: {e}")
+
+        if supported_pairs == self.supported_pairs:
+            return
+
+        self.supported_pairs = supported_pairs
+        self.translation_table = self.build_translation_table()
+        logger.info(f"Translation table updated: {len(self.translation_table)} target languages")
+        try:
+            save_snapshot(self.snapshot_path, self.supported_pairs)
+        except OSError as e:
+            logger.warning(f"Failed to save translators snapshot {self.snapshot_path}: {e}")
+
+        await self.refresh_language_detector()
+
+    async def refresh_language_detector(self):
+        # Training takes a while, so it is moved off the event loop
+        async with self.language_detector_lock:
+            await asyncio.to_thread(self.update_language_detector)
+
+    async def refresh_capabilities_loop(self):
+        while True:
+            await asyncio.sleep(self.snapshot_refresh_interval)
+            await self.refresh_capabilities()
+
+    async def detect_language(self, source_text: str) -> DetectedLanguages:
+        if self.language_detector is not None:
+            detected_languages = self.language_detector.detect(source_text)
+            if detected_languages is not None:
+                self.local_detections += 1
+                return detected_languages
+
+        detection_id = get_detection_id(source_text)
+        detected_languages = await self.cache.get_detection(detection_id)
+        if detected_languages is not None:
+            return detected_languages
 
+        return await self.single_flight.do(
+            detection_id,
+            lambda: self.request_detection(source_text, detection_id)
+        )
+
+    async def request_detection(self, source_text: str, detection_id: str) -> DetectedLanguages:
+        backends = list(self.pool.backends.values())
+        if not backends:
+            raise RuntimeError(f"Can not detect language")
+
+        detected_languages = await self.pool.call(
+            backends,
+            lambda translator: translator.detect_language(source_text=source_text)
+        )
+        await self.cache.put_detection(detection_id, detected_languages)
+        return detected_languages
+
+    def get_backends(self, source_language: str, target_language: str) -> List[Backend]:
         source_languages = self.translation_table.get(target_language, None)
         if not source_languages:
             raise RuntimeError(f"Language {langcodes.get(target_language).language_name()} is not supported")
 
-        available_translators = {}
-        translators = source_languages.get(source_language, None)
-        if not translators:
+        backends = source_languages.get(source_language, None)
+        if not backends:
             raise RuntimeError(
                 f"Translation {langcodes.get(source_language).language_name()} -> "
                 f"{langcodes.get(target_language).language_name()} is not supported"
             )
-        for translator in translators:
-            available_translators.setdefault(translator.type(), translator)
 
-        for _, translator in available_translators.items():
-            target_text, source_language = translator.translate(source_text, source_language, target_language)
+        return backends
+
+    async def translate(self, source_text: str, source_language: str, target_language: str) -> TranslationResult:
+        return await self.translate_text(
+            source_text,
+            source_language,
+            target_language,
+            memorize=is_memorable(source_text, source_language),
+        )
+
+    async def translate_text(
+            self,
+            source_text: str,
+            source_language: str,
+            target_language: str,
+            memorize: bool,
+    ) -> TranslationResult:
+        translation_id = get_translation_id(source_text, source_language, target_language)
+        translation = await self.cache.get(translation_id)
+        if translation:
+            return translation
+
+        return await self.single_flight.do(
+            translation_id,
+            lambda: self.request_translation(source_text, source_language, target_language, translation_id, memorize)
+        )
+
+    async def request_translation(
+            self,
+            source_text: str,
+            source_language: str,
+            target_language: str,
+            translation_id: str,
+            memorize: bool,
+    ) -> TranslationResult:
+        memorize = memorize and self.memory is not None
+        if memorize:
+            memorized = await self.memory.get_many([source_text], source_language, target_language)
+            if source_text in memorized:
+                result = TranslationResult(
+                    source_text=source_text,
+                    source_language=source_language,
+                    target_text=memorized[source_text],
+                    target_language=target_language,
+                    translation_id=translation_id,
+                )
+                await self.cache.put(result)
+                return result
+
+        lock = None
+        if self.lock_timeout > 0:
+            # Other bot processes may be translating the same text right now
+            lock = await self.cache.lock(translation_id, self.lock_timeout)
+            if lock is None:
+                try:
+                    return await self.cache.wait(translation_id, self.lock_timeout)
+                except TimeoutError as _:
+                    logger.warning(f"Timed out waiting for translation {translation_id} from another process")
+
+        try:
+            target_text, source_language = await self.pool.call(
+                self.get_backends(source_language, target_language),
+                lambda translator: translator.translate(source_text, source_language, target_language)
+            )
             result = TranslationResult(
                 source_text=source_text,
                 source_language=source_language,
@@ -96,15 +284,169 @@ class TranslationServiceAggregator(TranslationServiceInterface):
                 target_language=target_language,
                 translation_id=translation_id,
             )
-            self.redis.set(translation_id, result.model_dump_json())
-            self.redis.expire(translation_id, datetime.timedelta(days=TRANSLATION_EXPIRATION_DAYS))
+            await self.cache.put(result)
+            if memorize:
+                await self.memory.put_many({source_text: target_text}, source_language, target_language)
+            return result
+        finally:
+            if lock is not None:
+                await self.cache.unlock(lock)
+
+    async def translate_many(
+            self,
+            source_texts: List[str],
+            source_language: str,
+            target_language: str
+    ) -> List[TranslationResult]:
+        translation_ids = {
+            source_text: get_translation_id(source_text, source_language, target_language)
+            for source_text in source_texts
+        }
+        translations = await self.cache.get_many(list(translation_ids.values()))
+
+        # Translations already requested by concurrent callers are awaited, the rest are requested in one batch
+        in_flight = {}
+        missing_texts = []
+        for source_text, translation_id in translation_ids.items():
+            if translation_id in translations:
+                continue
+
+            future = self.single_flight.join(translation_id)
+            if future is not None:
+                in_flight[source_text] = future
+            else:
+                self.single_flight.lead(translation_id)
+                missing_texts.append(source_text)
+
+        if missing_texts:
+            try:
+                target_texts = await self.request_many(missing_texts, source_language, target_language)
+                new_translations = [
+                    TranslationResult(
+                        source_text=source_text,
+                        source_language=source_language,
+                        target_text=target_texts[source_text],
+                        target_language=target_language,
+                        translation_id=translation_ids[source_text],
+                    ) for source_text in missing_texts
+                ]
+                await self.cache.put_many(new_translations)
+            except BaseException as e:
+                for source_text in missing_texts:
+                    self.single_flight.complete(translation_ids[source_text], exception=e)
+                raise
+
+            for translation in new_translations:
+                translations[translation.translation_id] = translation
+                self.single_flight.complete(translation.translation_id, translation)
+
+        for source_text, future in in_flight.items():
+            try:
+                translations[translation_ids[source_text]] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # request of the concurrent caller was cancelled
+                translations[translation_ids[source_text]] = await self.translate(
+                    source_text, source_language, target_language
+                )
+
+        return [translations[translation_ids[source_text]] for source_text in source_texts]
+
+    async def request_many(
+            self,
+            source_texts: List[str],
+            source_language: str,
+            target_language: str,
+    ) -> Dict[str, str]:
+        """
+        :return: maps source text -> target text
+        """
+        memorable_texts = []
+        if self.memory is not None:
+            memorable_texts = [
+                source_text for source_text in source_texts if is_memorable(source_text, source_language)
+            ]
+
+        result = {}
+        if memorable_texts:
+            result = await self.memory.get_many(memorable_texts, source_language, target_language)
+
+        requested_texts = [source_text for source_text in source_texts if source_text not in result]
+        if not requested_texts:
             return result
 
-        raise RuntimeError("translate: Unexpected error")
+        target_texts = await self.pool.call(
+            self.get_backends(source_language, target_language),
+            lambda translator: translator.translate_many(requested_texts, source_language, target_language)
+        )
+        translated = dict(zip(requested_texts, target_texts))
+        memorized = {
+            source_text: translated[source_text] for source_text in memorable_texts if source_text in translated
+        }
+        if memorized:
+            await self.memory.put_many(memorized, source_language, target_language)
+
+        result.update(translated)
+        return result
+
+    async def translate_ui(self, text: str, target_language: str, **params) -> str:
+        if target_language == UI_LANGUAGE:
+            return text.format(**params)
+
+        rendered = self.ui_catalog.render(text, target_language, params)
+        if rendered is not None:
+            self.ui_catalog_hits += 1
+            return rendered
+
+        self.ui_catalog_misses += 1
+        return (await self.translate_text(
+            source_text=text.format(**params),
+            source_language=UI_LANGUAGE,
+            target_language=target_language,
+            # UI strings with arbitrary parameters (counters, names) would flood the memory
+            memorize=get_placeholders(text) <= {LANGUAGE_PLACEHOLDER},
+        )).target_text
 
     def get_supported_target_languages(self) -> List[str]:
         return list(self.translation_table.keys())
 
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cache": self.cache.stats(),
+            "single_flight": self.single_flight.stats(),
+            "local_detections": self.local_detections,
+            "translators": self.pool.stats(),
+            "ui_catalog_hits": self.ui_catalog_hits,
+            "ui_catalog_misses": self.ui_catalog_misses,
+            "memory": self.memory.stats() if self.memory is not None else None,
+        }
+
+    async def start(self):
+        if not self.translation_table:
+            # Nothing to serve requests with until translators respond
+            await self.refresh_capabilities()
+        else:
+            self.background_tasks.append(asyncio.create_task(self.refresh_capabilities()))
+            self.background_tasks.append(asyncio.create_task(self.refresh_language_detector()))
+
+        if self.snapshot_refresh_interval > 0:
+            self.background_tasks.append(asyncio.create_task(self.refresh_capabilities_loop()))
+
+        if self.health_check_interval > 0:
+            self.background_tasks.append(
+                asyncio.create_task(self.pool.health_check_loop(self.health_check_interval))
+            )
+
+    async def close(self):
+        for task in self.background_tasks:
+            task.cancel()
+
+        for _, backend in self.pool.backends.items():
+            await backend.translator.close()
+
+        await self.redis.aclose()
+
 
-def init_translation_service(config: Config) -> TranslationServiceInterface:
-    return TranslationServiceAggregator(config)
+def init_translation_service(config: Config, database: Database) -> TranslationServiceInterface:
+    return TranslationServiceAggregator(config, database)
@@ -0,0 +1,87 @@
+import struct
+import zlib
+
+from .translation_service_interface import TranslationResult
+
+
+# Layout of the binary entry:
+#   version (1 byte), flags (1 byte), then the body, zlib-compressed if FLAG_COMPRESSED is set:
+#   source language length (1 byte), target language length (1 byte), source text length (4 bytes),
+#   source language, target language, source text, target text (the rest of the body)
+# Translation id is not stored since it is the key of the entry
+CACHE_FORMAT_VERSION = 1
+FLAG_COMPRESSED = 0x01
+HEADER = struct.Struct("!BB")
+BODY_HEADER = struct.Struct("!BBI")
+# Bodies shorter than this don't get noticeably smaller after compression
+DEFAULT_COMPRESSION_THRESHOLD = 256
+COMPRESSION_LEVEL = 6
+
+
+def encode_translation(
+        translation: TranslationResult,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+) -> bytes:
+    source_language = translation.source_language.encode("utf-8")
+    target_language = translation.target_language.encode("utf-8")
+    source_text = translation.source_text.encode("utf-8")
+    body = b"".join([
+        BODY_HEADER.pack(len(source_language), len(target_language), len(source_text)),
+        source_language,
+        target_language,
+        source_text,
+        translation.target_text.encode("utf-8"),
+    ])
+
+    flags = 0
+    if 0 < compression_threshold <= len(body):
+        compressed = zlib.compress(body, COMPRESSION_LEVEL)
+        if len(compressed) < len(body):
+            body = compressed
+            flags |= FLAG_COMPRESSED
+
+    return HEADER.pack(CACHE_FORMAT_VERSION, flags) + body
+
+
+def decode_translation(translation_id: str, serialized: bytes) -> TranslationResult:
+    """
+    Decodes both binary entries and JSON entries written by previous versions
+    :raises ValueError: if the entry is broken or has unknown format
+    """
+    # JSON entries always start with the opening brace which is never a valid version byte
+    if serialized[:1] == b"{":
+        return TranslationResult.model_validate_json(serialized)
+
+    if len(serialized) < HEADER.size:
+        raise ValueError("Cached translation is truncated")
+
+    version, flags = HEADER.unpack_from(serialized)
+    if version != CACHE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported cached translation format version {version}")
+
+    body = serialized[HEADER.size:]
+    if flags & FLAG_COMPRESSED:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error as e:
+            raise ValueError(f"Failed to decompress cached translation: {e}")
+
+    try:
+        source_language_length, target_language_length, source_text_length = BODY_HEADER.unpack_from(body)
+    except struct.error as e:
+        raise ValueError(f"Cached translation is truncated: {e}")
+
+    source_language_end = BODY_HEADER.size + source_language_length
+    target_language_end = source_language_end + target_language_length
+    source_text_end = target_language_end + source_text_length
+    if source_text_end > len(body):
+        raise ValueError("Cached translation is truncated")
+
+    # UnicodeDecodeError is a subclass of ValueError
+    return TranslationResult(
+        source_language=body[BODY_HEADER.size:source_language_end].decode("utf-8"),
+        target_language=body[source_language_end:target_language_end].decode("utf-8"),
+        source_text=body[target_language_end:source_text_end].decode("utf-8"),
+        target_text=body[source_text_end:].decode("utf-8"),
+        translation_id=translation_id,
+    )
@@ -0,0 +1,53 @@
+import json
+import logging
+import os
+from typing import Dict, List, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def load_snapshot(path: str) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    :return: maps translator name -> supported (source_language, target_language) pairs
+    """
+    try:
+        with open(path, "r") as snapshot_file:
+            content = json.load(snapshot_file)
+    except FileNotFoundError as _:
+        logger.info(f"Translators snapshot {path} not found")
+        return {}
+    except ValueError as e:
+        logger.warning(f"Translators snapshot {path} is broken: {e}")
+        return {}
+
+    if not isinstance(content, dict):
+        logger.warning(f"Translators snapshot {path} is broken: not an object")
+        return {}
+
+    if content.get("version") != SNAPSHOT_VERSION:
+        logger.warning(f"Unsupported translators snapshot version {content.get('version')} in {path}")
+        return {}
+
+    try:
+        return {
+            name: sorted((pair[0], pair[1]) for pair in pairs) for name, pairs in content["translators"].items()
+        }
+    except (AttributeError, TypeError, KeyError, IndexError) as e:
+        logger.warning(f"Translators snapshot {path} is broken: {e}")
+        return {}
+
+
+def save_snapshot(path: str, supported_pairs: Dict[str, List[Tuple[str, str]]]):
+    content = {
+        "version": SNAPSHOT_VERSION,
+        "translators": {name: sorted([list(pair) for pair in pairs]) for name, pairs in supported_pairs.items()},
+    }
+
+    # Written into a temporary file first so that a crash never leaves a truncated snapshot
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as snapshot_file:
+        json.dump(content, snapshot_file, separators=(",", ":"))
+    os.replace(temp_path, path)
@@ -0,0 +1,157 @@
+import logging
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Iterable
+
+import langcodes
+
+from .translation_service_interface import DetectedLanguages, DetectedLanguage
+
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZES = (1, 2, 3, 4, 5)
+PROFILE_SIZE = 300
+# Texts shorter than this are too ambiguous for n-gram statistics
+MIN_TEXT_LENGTH = 20
+# Relative distance between the best and the second best profile required to trust the result
+MIN_MARGIN = 0.08
+# Scripts used by a single language among the supported ones
+SCRIPT_LANGUAGES = {
+    "GREEK": "el",
+    "HEBREW": "he",
+    "THAI": "th",
+    "HANGUL": "ko",
+    "HIRAGANA": "ja",
+    "KATAKANA": "ja",
+    "BENGALI": "bn",
+    "DEVANAGARI": "hi",
+}
+WORD_RE = re.compile(r"[^\W\d_]+")
+
+
+def build_profile(text: str) -> Dict[str, int]:
+    """
+    Cavnar-Trenkle profile: ranks of the most frequent character n-grams of the text
+    """
+    ngrams = Counter()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            for i in range(len(padded) - size + 1):
+                ngrams[padded[i:i + size]] += 1
+
+    return {ngram: rank for rank, (ngram, _) in enumerate(ngrams.most_common(PROFILE_SIZE))}
+
+
+def get_script(char: str) -> str | None:
+    try:
+        return unicodedata.name(char).split(" ", 1)[0]
+    except ValueError as _:
+        return None
+
+
+class NgramLanguageDetector:
+    """
+    In-process language identifier answering only high-confidence cases, ambiguous texts
+    should be passed to the remote detector
+    """
+
+    def __init__(self, profiles: Dict[str, Dict[str, int]]):
+        self.profiles = profiles
+
+    @staticmethod
+    def train(texts: Dict[str, str]) -> "NgramLanguageDetector":
+        """
+        :param texts: maps language code -> sample text in this language
+        """
+        return NgramLanguageDetector({language: build_profile(text) for language, text in texts.items()})
+
+    @staticmethod
+    def from_udhr(languages: Iterable[str]) -> "NgramLanguageDetector":
+        """
+        Trains profiles on the Universal Declaration of Human Rights corpus distributed with NLTK
+        """
+        import nltk
+        nltk.download("udhr", quiet=True)
+        from nltk.corpus import udhr
+
+        texts = {}
+        for language, fileid in find_udhr_fileids(languages, udhr.fileids()).items():
+            try:
+                texts[language] = udhr.raw(fileid)
+            except (UnicodeDecodeError, LookupError) as e:
+                logger.warning(f"Failed to read UDHR text {fileid}: {e}")
+
+        return NgramLanguageDetector.train(texts)
+
+    def languages(self) -> List[str]:
+        return list(self.profiles.keys())
+
+    def detect_by_script(self, text: str) -> str | None:
+        scripts = Counter(get_script(char) for char in text if char.isalpha())
+        letters = sum(scripts.values())
+        if letters == 0:
+            return None
+
+        # Japanese mixes kana with CJK ideographs, so any noticeable amount of kana is decisive
+        kana = scripts["HIRAGANA"] + scripts["KATAKANA"]
+        if kana / letters > 0.2 and "ja" in self.profiles:
+            return "ja"
+
+        script, count = scripts.most_common(1)[0]
+        language = SCRIPT_LANGUAGES.get(script, None)
+        if language is not None and language in self.profiles and count / letters > 0.5:
+            return language
+
+        return None
+
+    def distance(self, text_profile: Dict[str, int], language: str) -> int:
+        language_profile = self.profiles[language]
+        return sum(
+            abs(rank - language_profile.get(ngram, PROFILE_SIZE)) for ngram, rank in text_profile.items()
+        )
+
+    def detect(self, text: str) -> DetectedLanguages | None:
+        """
+        :return: detected language or None if the text can not be identified reliably
+        """
+        language = self.detect_by_script(text)
+        if language is not None:
+            return DetectedLanguages([DetectedLanguage(language=language, confidence=100)])
+
+        if len(text) < MIN_TEXT_LENGTH or len(self.profiles) < 2:
+            return None
+
+        text_profile = build_profile(text)
+        if not text_profile:
+            return None
+
+        distances = sorted((self.distance(text_profile, language), language) for language in self.profiles.keys())
+        best_distance, best_language = distances[0]
+        second_distance, _ = distances[1]
+        margin = (second_distance - best_distance) / second_distance if second_distance else 0.0
+        if margin < MIN_MARGIN:
+            return None
+
+        return DetectedLanguages([DetectedLanguage(language=best_language, confidence=min(100, int(100 * margin * 5)))])
+
+
+def find_udhr_fileids(languages: Iterable[str], fileids: List[str]) -> Dict[str, str]:
+    """
+    Matches language codes with UDHR corpus files, e.g. "ru" -> "Russian-UTF8"
+    """
+    result = {}
+    for language in languages:
+        name = langcodes.get(language).language_name().split(" ")[0]
+        candidates = [fileid for fileid in fileids if name in fileid.rsplit("-", 1)[0].split("_")]
+        if not candidates:
+            logger.info(f"No UDHR text for {name}, it will be detected remotely only")
+            continue
+
+        # Prefer unicode and latin variants, then the shortest (most generic) name
+        candidates.sort(key=lambda fileid: (not fileid.endswith("UTF8"), "Cyrillic" in fileid, len(fileid)))
+        result[language] = candidates[0]
+
+    return result
@@ -1,6 +1,7 @@
+import asyncio
 import logging
-import requests
-from typing import List, Tuple, Dict
+import httpx
+from typing import List, Tuple
 from pydantic import AnyUrl, RootModel, BaseModel
 
 from .translation_service_interface import TranslatorInterface, DetectedLanguages
@@ -19,38 +20,52 @@ class SupportedLanguagesResponse(RootModel):
 
 
 class Libretranslate(TranslatorInterface):
-    def __init__(self, url: AnyUrl):
+    def __init__(
+            self,
+            url: AnyUrl,
+            timeout: float,
+            max_connections: int,
+            max_keepalive_connections: int,
+    ):
         logger.info(f"Initializing LibreTranslate at {url}")
-        self.session = requests.Session()
-        self.url = str(url)
-        response = self.session.get(url=f"{self.url}/languages")
-        if response.status_code != 200:
-            raise RuntimeError(f"Unable to get supported language pairs: {response.content}")
-
-        self.languages = SupportedLanguagesResponse.model_validate(response.json())
+        self.url = str(url).rstrip("/")
+        self.timeout = timeout
+        # Filled by load_supported_pairs()
+        self.languages = SupportedLanguagesResponse([])
+        # Pooled keep-alive connections shared by all concurrent requests to this instance
+        self.client = httpx.AsyncClient(
+            base_url=self.url,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+        )
 
     def type(self) -> str:
         return "libretranslate"
 
-    def detect_language(self, source_text: str) -> DetectedLanguages:
-        response = self.session.post(
-            url=f"{self.url}/detect",
-            data={"q": source_text}
-        )
+    async def _post(self, path: str, data: dict | None = None, json: dict | None = None) -> httpx.Response:
+        # httpx timeouts apply per network operation, so an overall deadline is enforced on top of them
+        async with asyncio.timeout(self.timeout):
+            return await self.client.post(url=path, data=data, json=json)
+
+    async def detect_language(self, source_text: str) -> DetectedLanguages:
+        response = await self._post("/detect", data={"q": source_text})
 
         if response.status_code != 200:
             raise RuntimeError(f"Unable to determine language: {response.content}")
 
         return DetectedLanguages.model_validate(response.json())
 
-    def translate(
+    async def translate(
             self,
             source_text: str,
             source_language: str,
             target_language: str
     ) -> Tuple[str, str]:
-        response = self.session.post(
-            url=f"{self.url}/translate",
+        response = await self._post(
+            "/translate",
             data={"q": source_text, "source": source_language, "target": target_language}
         )
 
@@ -59,6 +74,42 @@ class Libretranslate(TranslatorInterface):
 
         return response.json()["translatedText"], source_language
 
+    async def translate_many(
+            self,
+            source_texts: List[str],
+            source_language: str,
+            target_language: str
+    ) -> List[str]:
+        # LibreTranslate accepts list of texts in "q" and responds with the list of translations
+        response = await self._post(
+            "/translate",
+            json={"q": source_texts, "source": source_language, "target": target_language}
+        )
+
+        if response.status_code != 200:
+            raise RuntimeError(f"Unable to translate: {response.content}")
+
+        translated_texts = response.json()["translatedText"]
+        if len(translated_texts) != len(source_texts):
+            raise RuntimeError(f"Expected {len(source_texts)} translations, got {len(translated_texts)}")
+
+        return translated_texts
+
+    async def load_supported_pairs(self) -> List[Tuple[str, str]]:
+        async with asyncio.timeout(self.timeout):
+            response = await self.client.get(url="/languages")
+
+        if response.status_code != 200:
+            raise RuntimeError(f"Unable to get supported language pairs: {response.content}")
+
+        self.languages = SupportedLanguagesResponse.model_validate(response.json())
+        return self.get_supported_pairs()
+
+    async def check_health(self) -> bool:
+        async with asyncio.timeout(self.timeout):
+            response = await self.client.get(url="/languages")
+        return response.status_code == 200
+
     def get_supported_pairs(self) -> List[Tuple[str, str]]:
         result = []
         for source_language in self.languages.root:
@@ -66,3 +117,6 @@ class Libretranslate(TranslatorInterface):
                 result.append((source_language.code, target_language,))
 
         return result
+
+    async def close(self):
+        await self.client.aclose()
@@ -0,0 +1,187 @@
+import asyncio
+import datetime
+import logging
+from typing import Dict, Any, List
+import redis.asyncio as redis
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError
+
+from ..common.cache import LRUCache
+from .translation_service_interface import TranslationResult, DetectedLanguages
+from .cache_codec import encode_translation, decode_translation, DEFAULT_COMPRESSION_THRESHOLD
+
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationCache:
+    """
+    Two-tier cache of translations and detected languages: bounded in-process LRU in front of
+    the shared Redis storage
+    """
+
+    def __init__(
+            self,
+            redis_client: redis.Redis,
+            expiration: datetime.timedelta,
+            local_cache_size: int,
+            local_cache_ttl: float,
+            compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+    ):
+        self.redis = redis_client
+        self.expiration = expiration
+        self.compression_threshold = compression_threshold
+        self.local_cache: LRUCache[str, TranslationResult | DetectedLanguages] = LRUCache(
+            max_size=local_cache_size,
+            ttl=local_cache_ttl,
+        )
+        self.redis_hits = 0
+        self.redis_misses = 0
+
+    async def get(self, translation_id: str) -> TranslationResult | None:
+        translation = self.local_cache.get(translation_id)
+        if translation is not None:
+            return translation
+
+        # GETEX fetches entry and prolongs its lifetime in a single round trip
+        cached_serialized = await self.redis.getex(translation_id, ex=self.expiration)
+        if cached_serialized is None:
+            self.redis_misses += 1
+            return None
+
+        try:
+            translation = decode_translation(translation_id, cached_serialized)
+        except ValueError as _:
+            logger.warning(f"Failed to deserialize cached translation. Will clear cache entry {translation_id}")
+            await self.redis.delete(translation_id)
+            self.redis_misses += 1
+            return None
+
+        self.redis_hits += 1
+        self.local_cache.put(translation_id, translation)
+        return translation
+
+    async def get_many(self, translation_ids: List[str]) -> Dict[str, TranslationResult]:
+        result = {}
+        missing_ids = []
+        for translation_id in translation_ids:
+            translation = self.local_cache.get(translation_id)
+            if translation is not None:
+                result[translation_id] = translation
+            else:
+                missing_ids.append(translation_id)
+
+        if not missing_ids:
+            return result
+
+        # MGET and lifetime prolongation of all entries are sent in a single round trip
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            pipeline.mget(missing_ids)
+            for translation_id in missing_ids:
+                pipeline.expire(translation_id, self.expiration)
+            responses = await pipeline.execute()
+
+        broken_ids = []
+        for translation_id, cached_serialized in zip(missing_ids, responses[0]):
+            if cached_serialized is None:
+                self.redis_misses += 1
+                continue
+
+            try:
+                translation = decode_translation(translation_id, cached_serialized)
+            except ValueError as _:
+                logger.warning(f"Failed to deserialize cached translation. Will clear cache entry {translation_id}")
+                broken_ids.append(translation_id)
+                self.redis_misses += 1
+                continue
+
+            self.redis_hits += 1
+            self.local_cache.put(translation_id, translation)
+            result[translation_id] = translation
+
+        if broken_ids:
+            await self.redis.delete(*broken_ids)
+
+        return result
+
+    async def put(self, translation: TranslationResult):
+        self.local_cache.put(translation.translation_id, translation)
+        await self.redis.set(
+            translation.translation_id,
+            encode_translation(translation, self.compression_threshold),
+            ex=self.expiration,
+        )
+
+    async def put_many(self, translations: List[TranslationResult]):
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for translation in translations:
+                self.local_cache.put(translation.translation_id, translation)
+                pipeline.set(
+                    translation.translation_id,
+                    encode_translation(translation, self.compression_threshold),
+                    ex=self.expiration,
+                )
+            await pipeline.execute()
+
+    async def get_detection(self, detection_id: str) -> DetectedLanguages | None:
+        detected_languages = self.local_cache.get(detection_id)
+        if detected_languages is not None:
+            return detected_languages
+
+        cached_serialized = await self.redis.getex(detection_id, ex=self.expiration)
+        if cached_serialized is None:
+            self.redis_misses += 1
+            return None
+
+        try:
+            detected_languages = DetectedLanguages.model_validate_json(cached_serialized)
+        except ValueError as _:
+            logger.warning(f"Failed to deserialize cached detection. Will clear cache entry {detection_id}")
+            await self.redis.delete(detection_id)
+            self.redis_misses += 1
+            return None
+
+        self.redis_hits += 1
+        self.local_cache.put(detection_id, detected_languages)
+        return detected_languages
+
+    async def put_detection(self, detection_id: str, detected_languages: DetectedLanguages):
+        self.local_cache.put(detection_id, detected_languages)
+        await self.redis.set(detection_id, detected_languages.model_dump_json(), ex=self.expiration)
+
+    async def lock(self, translation_id: str, timeout: float) -> Lock | None:
+        """
+        Tries to acquire cross-process lock for the translation which is about to be requested from translator
+        :return: acquired lock or None if somebody else is translating this text
+        """
+        lock = self.redis.lock(f"lock:{translation_id}", timeout=timeout)
+        if await lock.acquire(blocking=False):
+            return lock
+
+        return None
+
+    @staticmethod
+    async def unlock(lock: Lock):
+        try:
+            await lock.release()
+        except LockError as e:
+            logger.warning(f"Translation lock was lost: {e}")
+
+    async def wait(self, translation_id: str, timeout: float, poll_interval: float = 0.05) -> TranslationResult | None:
+        """
+        Waits for translation being stored by another process
+        """
+        async with asyncio.timeout(timeout):
+            while True:
+                translation = await self.get(translation_id)
+                if translation is not None:
+                    return translation
+
+                await asyncio.sleep(poll_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "local": self.local_cache.stats(),
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+        }
@@ -0,0 +1,89 @@
+import logging
+from typing import Dict, List, Any
+
+import psycopg2
+
+from ..common.database import Database, DatabaseUnavailable
+from ..common.queries import register_query
+
+
+logger = logging.getLogger(__name__)
+
+GET_TRANSLATIONS = register_query(
+    "get_memorized_translations",
+    "SELECT source_text, target_text "
+    "FROM public.translation_memory "
+    "WHERE text_hash IN (SELECT md5(unnest(%s::text[]))) "
+    "AND source_language = %s AND target_language = %s;",
+    readonly=True
+)
+PUT_TRANSLATIONS = register_query(
+    "put_memorized_translations",
+    "INSERT INTO public.translation_memory "
+    "(text_hash, source_language, target_language, source_text, target_text) "
+    "SELECT md5(t.source_text), %s, %s, t.source_text, t.target_text "
+    "FROM unnest(%s::text[], %s::text[]) AS t(source_text, target_text) "
+    "ON CONFLICT DO NOTHING;"
+)
+
+
+def is_memorable(source_text: str, source_language: str) -> bool:
+    """
+    Only single words (vocabulary entries, button captions) are worth keeping forever
+    """
+    return source_language != "auto" and len(source_text.split()) == 1
+
+
+class TranslationMemory:
+    """
+    Durable tier of the translation cache in Postgres. Unlike Redis entries, its entries never expire
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    async def get_many(self, source_texts: List[str], source_language: str, target_language: str) -> Dict[str, str]:
+        """
+        :return: maps source text -> target text for texts found in the memory
+        """
+        try:
+            async with self.database.transaction("translation_memory") as cur:
+                await cur.run(GET_TRANSLATIONS, (source_texts, source_language, target_language,))
+                result = {entry[0]: entry[1] for entry in cur}
+        except (psycopg2.Error, DatabaseUnavailable) as e:
+            logger.warning(f"Failed to read translation memory: {e}")
+            self.errors += 1
+            return {}
+
+        self.hits += len(result)
+        self.misses += len(source_texts) - len(result)
+        return result
+
+    async def put_many(self, translations: Dict[str, str], source_language: str, target_language: str):
+        """
+        :param translations: maps source text -> target text
+        """
+        try:
+            async with self.database.transaction("translation_memory") as cur:
+                await cur.run(
+                    PUT_TRANSLATIONS,
+                    (source_language, target_language, list(translations.keys()), list(translations.values()),)
+                )
+        except (psycopg2.Error, DatabaseUnavailable) as e:
+            logger.warning(f"Failed to write translation memory: {e}")
+            self.errors += 1
+            return
+
+        self.writes += len(translations)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import List, Tuple, Dict, Any
 from pydantic import BaseModel, RootModel
 
 
@@ -23,10 +23,10 @@ class TranslatorInterface:
     def type(self) -> str:
         raise RuntimeError("TranslationServiceInterface.type")
 
-    def detect_language(self, source_text: str) -> DetectedLanguages:
+    async def detect_language(self, source_text: str) -> DetectedLanguages:
         raise RuntimeError("TranslationServiceInterface.detect_language")
 
-    def translate(self, source_text: str, source_language: str | None, target_language: str) -> Tuple[str, str]:
+    async def translate(self, source_text: str, source_language: str | None, target_language: str) -> Tuple[str, str]:
         """
         :param source_text:
         :param source_language:
@@ -35,25 +35,79 @@ class TranslatorInterface:
         """
         raise RuntimeError("TranslationServiceInterface.translate")
 
+    async def translate_many(self, source_texts: List[str], source_language: str, target_language: str) -> List[str]:
+        """
+        Translates several texts at once. Translators supporting batch requests should override it.
+        :return: translated texts in the same order
+        """
+        return [
+            (await self.translate(source_text, source_language, target_language))[0] for source_text in source_texts
+        ]
+
     def get_supported_pairs(self) -> List[Tuple[str, str]]:
         raise RuntimeError("TranslationServiceInterface.get_supported_pairs")
 
+    async def load_supported_pairs(self) -> List[Tuple[str, str]]:
+        """
+        Requests supported language pairs from the service
+        """
+        return self.get_supported_pairs()
+
+    async def check_health(self) -> bool:
+        return True
+
+    async def close(self):
+        pass
+
 
 class TranslationServiceInterface:
     def type(self) -> str:
         raise RuntimeError("TranslationServiceInterface.type")
 
-    def detect_language(self, source_text: str) -> DetectedLanguages:
+    async def detect_language(self, source_text: str) -> DetectedLanguages:
         raise RuntimeError("TranslationServiceInterface.detect_language")
 
-    def translate(self, source_text: str, source_language: str | None, target_language: str) -> TranslationResult:
+    async def translate(self, source_text: str, source_language: str | None, target_language: str) -> TranslationResult:
         raise RuntimeError("TranslationServiceInterface.translate")
 
+    async def translate_many(
+            self,
+            source_texts: List[str],
+            source_language: str,
+            target_language: str
+    ) -> List[TranslationResult]:
+        raise RuntimeError("TranslationServiceInterface.translate_many")
+
+    async def translate_ui(self, text: str, target_language: str, **params) -> str:
+        """
+        Translates UI string from the source code. Prefers pre-translated UI catalog.
+        :param text: english template, e.g. "Total {n} words"
+        :param target_language:
+        :param params: values of the placeholders in the template
+        :return: translated text
+        """
+        raise RuntimeError("TranslationServiceInterface.translate_ui")
+
     def get_supported_target_languages(self) -> List[str]:
         raise RuntimeError("TranslationServiceInterface.get_supported_target_languages")
 
     def get_supported_pairs(self) -> List[Tuple[str, str]]:
         raise RuntimeError("TranslationServiceInterface.get_supported_pairs")
 
-    def get_translation_by_id(self, translation_id: str) -> TranslationResult | None:
-        raise RuntimeError("TranslationServiceInterface.get_translation_by_id")
+    def get_stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def start(self):
+        """
+        Starts background activities, should be called once event loop is running
+        """
+        pass
+
+    async def refresh_capabilities(self):
+        """
+        Requests actual supported language pairs from translators
+        """
+        pass
+
+    async def close(self):
+        pass
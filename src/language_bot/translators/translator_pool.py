@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import random
+import time
+from typing import List, Callable, Awaitable, TypeVar, Dict, Any, Iterable
+
+from .translation_service_interface import TranslatorInterface
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to the backend after several consecutive failures. Once reset_timeout passes,
+    a single trial request is let through: success closes the circuit, failure opens it again.
+    A trial which doesn't finish within reset_timeout doesn't block the next one.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started_at = 0.0
+
+    def allows(self) -> bool:
+        """
+        Tells whether a request may be sent now, doesn't change the state
+        """
+        if self.state == CircuitBreaker.CLOSED:
+            return True
+
+        started_at = self.opened_at if self.state == CircuitBreaker.OPEN else self.trial_started_at
+        return time.monotonic() - started_at >= self.reset_timeout
+
+    def start_request(self) -> bool:
+        """
+        Called right before the request allowed by allows() is sent
+        :return: whether the request is the trial of half open circuit
+        """
+        if self.state == CircuitBreaker.CLOSED:
+            return False
+
+        self.state = CircuitBreaker.HALF_OPEN
+        self.trial_started_at = time.monotonic()
+        return True
+
+    def release_trial(self):
+        """
+        Trial has ended without telling anything about the backend, the next request may be a trial right away
+        """
+        if self.state == CircuitBreaker.HALF_OPEN:
+            self.trial_started_at = time.monotonic() - self.reset_timeout
+
+    def record_success(self):
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == CircuitBreaker.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = CircuitBreaker.OPEN
+            self.opened_at = time.monotonic()
+
+
+class Backend:
+    def __init__(self, translator: TranslatorInterface, breaker: CircuitBreaker):
+        self.translator = translator
+        self.breaker = breaker
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+
+    def available(self) -> bool:
+        return self.healthy and self.breaker.allows()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "circuit": self.breaker.state,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class TranslatorPool:
+    """
+    Spreads requests among translator instances by the least number of outstanding requests,
+    optionally hedging slow requests with a second instance
+    """
+
+    def __init__(
+            self,
+            hedge_delay: float | None,
+            failure_threshold: int,
+            reset_timeout: float,
+    ):
+        self.hedge_delay = hedge_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.backends: Dict[str, Backend] = {}
+        self.hedged_requests = 0
+
+    def add(self, name: str, translator: TranslatorInterface) -> Backend:
+        backend = Backend(translator, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+        self.backends[name] = backend
+        return backend
+
+    @staticmethod
+    def select(candidates: Iterable[Backend], exclude: List[Backend]) -> Backend | None:
+        available = [backend for backend in candidates if backend not in exclude and backend.available()]
+        if not available:
+            return None
+
+        least_outstanding = min(backend.outstanding for backend in available)
+        return random.choice([backend for backend in available if backend.outstanding == least_outstanding])
+
+    @staticmethod
+    async def run(backend: Backend, call: Callable[[TranslatorInterface], Awaitable[T]], trial: bool = False) -> T:
+        backend.outstanding += 1
+        backend.requests += 1
+        try:
+            result = await call(backend.translator)
+        except asyncio.CancelledError:
+            # Losing hedged request or cancelled caller, the backend may be just slower
+            if trial:
+                backend.breaker.release_trial()
+            raise
+        except Exception as _:
+            backend.failures += 1
+            backend.breaker.record_failure()
+            raise
+        finally:
+            backend.outstanding -= 1
+
+        backend.breaker.record_success()
+        return result
+
+    async def call(self, candidates: List[Backend], call: Callable[[TranslatorInterface], Awaitable[T]]) -> T:
+        tried: List[Backend] = []
+        last_error: Exception | None = None
+        while True:
+            backend = self.select(candidates, tried)
+            if backend is None:
+                if last_error is not None:
+                    raise last_error
+                raise RuntimeError("All translators are unavailable")
+
+            tried.append(backend)
+            # Right after select(), so that concurrent requests don't pick the same half open backend for a trial
+            trial = backend.breaker.start_request()
+            try:
+                return await self.call_hedged(backend, candidates, tried, call, trial)
+            except Exception as e:
+                logger.warning(f"Translator request failed: {e}")
+                last_error = e
+
+    async def call_hedged(
+            self,
+            backend: Backend,
+            candidates: List[Backend],
+            tried: List[Backend],
+            call: Callable[[TranslatorInterface], Awaitable[T]],
+            trial: bool = False,
+    ) -> T:
+        if self.hedge_delay is None:
+            return await self.run(backend, call, trial)
+
+        tasks = {asyncio.create_task(self.run(backend, call, trial))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+            if not done:
+                # The first request is slow, send the same request to another instance
+                hedge_backend = self.select(candidates, tried)
+                if hedge_backend is not None:
+                    tried.append(hedge_backend)
+                    hedge_trial = hedge_backend.breaker.start_request()
+                    tasks.add(asyncio.create_task(self.run(hedge_backend, call, hedge_trial)))
+                    self.hedged_requests += 1
+
+            error: Exception | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def check_health(self):
+        for name, backend in self.backends.items():
+            try:
+                healthy = await backend.translator.check_health()
+            except Exception as e:
+                logger.debug(f"Health check of {name} failed: {e}")
+                healthy = False
+
+            if healthy != backend.healthy:
+                logger.warning(f"Translator {name} is {'healthy' if healthy else 'unhealthy'}")
+            backend.healthy = healthy
+            if healthy and backend.breaker.state != CircuitBreaker.CLOSED:
+                logger.info(f"Circuit of translator {name} is closed by the health check")
+                backend.breaker.record_success()
+
+    async def health_check_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_health()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hedged_requests": self.hedged_requests,
+            "backends": {name: backend.stats() for name, backend in self.backends.items()},
+        }
@@ -0,0 +1,133 @@
+import ast
+import gzip
+import json
+import logging
+import os
+import string
+from typing import Dict, List, Set, Any, Iterable
+
+import langcodes
+
+
+logger = logging.getLogger(__name__)
+
+UI_CATALOG_VERSION = 1
+# Language of all UI strings in the source code
+UI_LANGUAGE = "en"
+# Placeholder which is expanded at build time with the names of all supported languages
+LANGUAGE_PLACEHOLDER = "language"
+DEFAULT_UI_CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ui_catalog.json.gz")
+
+
+class _KeepMissing(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def get_placeholders(template: str) -> Set[str]:
+    return {field_name for _, field_name, _, _ in string.Formatter().parse(template) if field_name}
+
+
+def catalog_key(template: str, params: Dict[str, Any]) -> str:
+    """
+    Substitutes language name into the template leaving all other placeholders in place.
+    Language names are part of the catalog keys because they should be translated together with the sentence.
+    """
+    if LANGUAGE_PLACEHOLDER not in params:
+        return template
+
+    return template.format_map(_KeepMissing({LANGUAGE_PLACEHOLDER: params[LANGUAGE_PLACEHOLDER]}))
+
+
+class UiCatalog:
+    """
+    Pre-translated UI strings. Maps target_language -> catalog key -> translated template
+    """
+
+    def __init__(self, translations: Dict[str, Dict[str, str]] | None = None):
+        self.translations = translations if translations is not None else {}
+
+    @staticmethod
+    def load(path: str) -> "UiCatalog":
+        with gzip.open(path, "rt", encoding="utf-8") as catalog_file:
+            content = json.load(catalog_file)
+
+        if content.get("version") != UI_CATALOG_VERSION:
+            raise RuntimeError(f"Unsupported UI catalog version {content.get('version')} in {path}")
+
+        sources = content["sources"]
+        translations = {}
+        for target_language, targets in content["translations"].items():
+            translations[target_language] = {
+                source: target for source, target in zip(sources, targets) if target is not None
+            }
+
+        return UiCatalog(translations)
+
+    def save(self, path: str):
+        sources = sorted({source for targets in self.translations.values() for source in targets.keys()})
+        content = {
+            "version": UI_CATALOG_VERSION,
+            "sources": sources,
+            "translations": {
+                target_language: [targets.get(source, None) for source in sources]
+                for target_language, targets in self.translations.items()
+            },
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as catalog_file:
+            json.dump(content, catalog_file, ensure_ascii=False, separators=(",", ":"))
+
+    def render(self, template: str, target_language: str, params: Dict[str, Any]) -> str | None:
+        targets = self.translations.get(target_language, None)
+        if not targets:
+            return None
+
+        translated_template = targets.get(catalog_key(template, params), None)
+        if translated_template is None:
+            return None
+
+        try:
+            return translated_template.format(**params)
+        except (KeyError, IndexError, ValueError) as _:
+            logger.warning(f"Broken UI catalog entry for '{template}' ({target_language})")
+            return None
+
+    def __len__(self) -> int:
+        return sum(len(targets) for targets in self.translations.values())
+
+
+def extract_ui_strings(source_paths: Iterable[str]) -> Set[str]:
+    """
+    Collects constant templates passed to translate_ui() in the given python source files
+    """
+    result = set()
+    for source_path in source_paths:
+        with open(source_path, "r", encoding="utf-8") as source_file:
+            tree = ast.parse(source_file.read(), filename=source_path)
+
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call):
+                continue
+            if not isinstance(node.func, ast.Attribute) or node.func.attr != "translate_ui":
+                continue
+
+            template = node.args[0] if node.args else next(
+                (keyword.value for keyword in node.keywords if keyword.arg == "text"), None
+            )
+            if isinstance(template, ast.Constant) and isinstance(template.value, str):
+                result.add(template.value)
+
+    return result
+
+
+def expand_templates(templates: Iterable[str], languages: Iterable[str]) -> List[str]:
+    language_names = sorted({langcodes.get(language).language_name() for language in languages})
+    result = set()
+    for template in templates:
+        if LANGUAGE_PLACEHOLDER in get_placeholders(template):
+            for language_name in language_names:
+                result.add(catalog_key(template, {LANGUAGE_PLACEHOLDER: language_name}))
+        else:
+            result.add(template)
+
+    return sorted(result)
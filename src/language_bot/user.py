@@ -1,7 +1,34 @@
+import functools
 from uuid import UUID
 from dataclasses import dataclass
 import langcodes
-from psycopg2.extensions import cursor
+from .common.database import AsyncCursor
+from .common.queries import register_query
+from .common.identity_cache import IDENTITIES, NOT_CACHED
+
+
+SET_USER_LANGUAGE = register_query(
+    "set_user_language",
+    'UPDATE public.botuser SET language = %s WHERE user_id = %s;',
+    prepare=False
+)
+SET_USER_NAME = register_query(
+    "set_user_name",
+    'UPDATE public.botuser SET name = %s WHERE user_id = %s;',
+    prepare=False
+)
+CREATE_USER = register_query(
+    "create_user",
+    'INSERT INTO public.botuser (name, language) VALUES (%s, %s) RETURNING user_id;',
+    prepare=False
+)
+GET_USER = register_query(
+    "get_user",
+    'SELECT user_id, name, language FROM public.botuser WHERE user_id = %s;',
+    readonly=True
+)
+
+USER = "user"
 
 
 @dataclass
@@ -10,46 +37,53 @@ class User:
     name: str
     language: langcodes.Language
 
-    def set_language(self, language: langcodes.Language, cur: cursor):
-        cur.execute(
-            'UPDATE public.botuser SET language = %s WHERE user_id = %s;',
-            (language.language, self.user_id,)
-        )
+    async def set_language(self, language: langcodes.Language, cur: AsyncCursor):
+        await cur.run(SET_USER_LANGUAGE, (language.language, self.user_id,))
         self.language = language
+        # The cached user is this very object, so it is dropped right away and once more after commit,
+        # in case a concurrent update has cached the previous state in between
+        IDENTITIES.invalidate(USER, self.user_id)
+        cur.after_commit(functools.partial(IDENTITIES.invalidate, USER, self.user_id))
 
-    def set_name(self, name: str, cur: cursor):
-        cur.execute(
-            'UPDATE public.botuser SET name = %s WHERE user_id = %s;',
-            (name, self.user_id,)
-        )
+    async def set_name(self, name: str, cur: AsyncCursor):
+        await cur.run(SET_USER_NAME, (name, self.user_id,))
         self.name = name
+        IDENTITIES.invalidate(USER, self.user_id)
+        cur.after_commit(functools.partial(IDENTITIES.invalidate, USER, self.user_id))
 
 
-def create_user(name: str, language: langcodes.Language, cur: cursor) -> User:
-    cur.execute(
-        'INSERT INTO public.botuser (name, language) VALUES (%s, %s) RETURNING user_id;',
-        (name, language.language,)
-    )
+async def create_user(name: str, language: langcodes.Language, cur: AsyncCursor) -> User:
+    await cur.run(CREATE_USER, (name, language.language,))
 
     entry = cur.fetchone()
     if not entry:
         raise RuntimeError(f"Failed to create new user")
 
-    return User(
+    user = User(
         user_id=entry[0],
         name=name,
         language=language
     )
+    cur.after_commit(functools.partial(IDENTITIES.put, USER, user.user_id, user))
+    return user
 
 
-def get_user(user_id: UUID, cur: cursor) -> User | None:
-    cur.execute(
-        'SELECT user_id, name, language FROM public.botuser WHERE user_id = %s;',
-        (user_id,)
-    )
-
-    entry = cur.fetchone()
-    if not entry:
+async def get_user(user_id: UUID | None, cur: AsyncCursor, use_cache: bool = True) -> User | None:
+    """
+    :param use_cache: False if the user may have been changed by another bot process
+    """
+    if user_id is None:
         return None
 
-    return User(user_id=entry[0], name=entry[1], language=langcodes.get(entry[2]))
+    if use_cache:
+        user = IDENTITIES.get(USER, user_id)
+        if user is not NOT_CACHED:
+            return user
+
+    await cur.run(GET_USER, (user_id,))
+
+    entry = cur.fetchone()
+    user = User(user_id=entry[0], name=entry[1], language=langcodes.get(entry[2])) if entry else None
+    # Not cached before commit, the transaction may see its own uncommitted changes
+    cur.after_commit(functools.partial(IDENTITIES.put, USER, user_id, user))
+    return user
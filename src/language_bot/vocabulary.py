@@ -3,7 +3,8 @@ import logging
 import langcodes
 from pydantic import BaseModel
 from uuid import UUID
-from psycopg2.extensions import cursor
+from .common.database import AsyncCursor
+from .common.queries import register_query
 from typing import List, Tuple, Dict
 
 from .chatbots.chatbot_service_interface import ChatbotSession
@@ -11,6 +12,98 @@ from .chatbots.chatbot_service_interface import ChatbotSession
 
 logger = logging.getLogger(__name__)
 
+INSERT_WORDS = register_query(
+    "insert_words",
+    'INSERT INTO public.words (word, language, category) '
+    'SELECT * FROM unnest(%s::text[], %s::varchar[], %s::text[]) '
+    'ON CONFLICT DO NOTHING;'
+)
+# Words are inserted by the previous statement of the same transaction, so all of them are found by the join
+UPSERT_VOCABULARY_WORDS = register_query(
+    "upsert_vocabulary_words",
+    "INSERT INTO public.vocabulary (word_id, language, user_id, learning_score, last_check) "
+    "SELECT w.word_id, w.language, n.user_id, n.learning_score, (now() at time zone 'utc') "
+    "FROM unnest(%s::text[], %s::varchar[], %s::uuid[], %s::int[]) AS n(word, language, user_id, learning_score) "
+    "INNER JOIN public.words AS w ON w.word = n.word AND w.language = n.language "
+    "ON CONFLICT (user_id, word_id) "
+    "DO UPDATE SET learning_score=excluded.learning_score, last_check=excluded.last_check;"
+)
+GET_UNIQUE_WORDS = register_query(
+    "get_unique_words",
+    "SELECT nw FROM "
+    "unnest(%s::text[]) AS nw "
+    "LEFT JOIN public.words AS w "
+    "ON nw = w.word AND w.language = %s "
+    "LEFT JOIN public.vocabulary AS v "
+    "ON v.word_id = w.word_id AND v.user_id = %s "
+    "WHERE v.word_id IS NULL;",
+    readonly=True
+)
+GET_WORDS_SELECT = (
+    'SELECT w.word, v.language, w.category, v.user_id, v.learning_score, v.last_check, tm.target_text, v.word_id '
+    'FROM public.vocabulary AS v '
+    'INNER JOIN public.words AS w '
+    'ON v.word_id = w.word_id '
+    'LEFT JOIN public.translation_memory AS tm '
+    'ON tm.text_hash = md5(w.word) AND tm.source_language = v.language AND tm.target_language = %s '
+    'WHERE v.user_id = %s AND v.language = %s '
+)
+GET_WORDS_FIRST_PAGE = register_query(
+    "get_words_first_page",
+    GET_WORDS_SELECT +
+    'ORDER BY v.learning_score, v.last_check, v.word_id LIMIT %s;',
+    readonly=True
+)
+# Row comparison lets Postgres start the index scan right at the requested position
+# instead of skipping all preceding words as OFFSET does
+GET_WORDS_AFTER = register_query(
+    "get_words_after",
+    GET_WORDS_SELECT +
+    'AND (v.learning_score, v.last_check, v.word_id) > (%s, %s, %s) '
+    'ORDER BY v.learning_score, v.last_check, v.word_id LIMIT %s;',
+    readonly=True
+)
+GET_USER_VOCABULARIES = register_query(
+    "get_user_vocabularies",
+    'SELECT language, word_count '
+    'FROM public.vocabulary_stats '
+    'WHERE user_id = %s AND word_count > 0;',
+    readonly=True
+)
+GET_USER_VOCABULARY = register_query(
+    "get_user_vocabulary",
+    'SELECT word_count '
+    'FROM public.vocabulary_stats '
+    'WHERE user_id = %s AND language = %s;',
+    readonly=True
+)
+RECONCILE_VOCABULARY_STATS = register_query(
+    "reconcile_vocabulary_stats",
+    'SELECT range_end, fixed FROM public.reconcile_vocabulary_stats(%s, %s);',
+    prepare=False
+)
+# Session-level advisory lock taken by the process which reconciles vocabulary stats
+RECONCILIATION_LOCK_ID = 0x766f6361
+TRY_LOCK_RECONCILIATION = register_query(
+    "try_lock_reconciliation",
+    'SELECT pg_try_advisory_lock(%s);',
+    readonly=True
+)
+UNLOCK_RECONCILIATION = register_query(
+    "unlock_reconciliation",
+    'SELECT pg_advisory_unlock(%s);',
+    readonly=True
+)
+
+
+class VocabularyCursor(BaseModel):
+    """
+    Position in the vocabulary listing, words are ordered by (learning_score, last_check, word_id)
+    """
+    learning_score: int
+    last_check: datetime.datetime
+    word_id: int
+
 
 class VocabularyWord(BaseModel):
     word: str
@@ -19,22 +112,39 @@ class VocabularyWord(BaseModel):
     user_id: UUID
     learning_score: int
     last_check: datetime.datetime
+    # Known translation into the user's language, filled by Vocabulary.get_words()
+    translation: str | None = None
+    # Assigned once the word is stored in the database
+    word_id: int | None = None
 
-    def save(self, cur: cursor):
-        cur.execute(
-            'INSERT INTO public.words (word, language, category) '
-            'VALUES(%s, %s, %s)'
-            'ON CONFLICT DO NOTHING;',
-            (self.word, self.language, self.category)
-        )
+    async def save(self, cur: AsyncCursor):
+        await save_words([self], cur)
+
+    def cursor(self) -> VocabularyCursor:
+        return VocabularyCursor(learning_score=self.learning_score, last_check=self.last_check, word_id=self.word_id)
+
+
+async def save_words(words: List[VocabularyWord], cur: AsyncCursor):
+    """
+    Stores any number of words with two statements
+    """
+    if not words:
+        return
 
-        cur.execute(
-            "INSERT INTO public.vocabulary (word, language, user_id, learning_score, last_check) "
-            "VALUES (%s, %s, %s, %s, (now() at time zone 'utc')) "
-            "ON CONFLICT (user_id, language, word) "
-            "DO UPDATE SET learning_score=excluded.learning_score, last_check=excluded.last_check;",
-            (self.word, self.language, self.user_id, self.learning_score, )
+    await cur.run(
+        INSERT_WORDS,
+        ([word.word for word in words], [word.language for word in words], [word.category for word in words],)
+    )
+
+    await cur.run(
+        UPSERT_VOCABULARY_WORDS,
+        (
+            [word.word for word in words],
+            [word.language for word in words],
+            [word.user_id for word in words],
+            [word.learning_score for word in words],
         )
+    )
 
 
 class Vocabulary(BaseModel):
@@ -42,13 +152,9 @@ class Vocabulary(BaseModel):
     language: str
     word_count: int
 
-    def get_unique_words(self, new_words: List[str], cur: cursor) -> Dict[str, VocabularyWord]:
-        cur.execute(
-            "SELECT nw FROM "
-            "unnest(%s) AS nw "
-            "LEFT JOIN public.vocabulary AS v "
-            "ON nw = v.word AND v.language = %s AND v.user_id = %s "
-            "WHERE v.word IS NULL;",
+    async def get_unique_words(self, new_words: List[str], cur: AsyncCursor) -> Dict[str, VocabularyWord]:
+        await cur.run(
+            GET_UNIQUE_WORDS,
             (new_words, self.language, self.user_id)
         )
 
@@ -63,36 +169,41 @@ class Vocabulary(BaseModel):
             ) for entry in cur
         }
 
-    def get_words(self, offset: int, limit: int, cur: cursor) -> List[VocabularyWord]:
-        cur.execute(
-            'SELECT v.word, v.language, w.category, v.user_id, v.learning_score, v.last_check '
-            'FROM public.vocabulary AS v '
-            'INNER JOIN public.words AS w '
-            'ON v.word = w.word AND v.language = w.language '
-            'WHERE v.user_id = %s AND v.language = %s '
-            'ORDER BY v.learning_score, v.last_check OFFSET %s LIMIT %s;',
-            (self.user_id, self.language, offset, limit,)
-        )
+    async def get_words(
+            self,
+            after: VocabularyCursor | None,
+            limit: int,
+            target_language: str,
+            cur: AsyncCursor
+    ) -> List[VocabularyWord]:
+        """
+        :param after: position of the last word of the previous page, None for the first page
+        """
+        if after is None:
+            await cur.run(GET_WORDS_FIRST_PAGE, (target_language, self.user_id, self.language, limit,))
+        else:
+            await cur.run(
+                GET_WORDS_AFTER,
+                (
+                    target_language, self.user_id, self.language,
+                    after.learning_score, after.last_check, after.word_id, limit,
+                )
+            )
 
         return [
             VocabularyWord(
                 word=entry[0], language=entry[1], category=entry[2],
-                user_id=entry[3], learning_score=entry[4], last_check=entry[5]
+                user_id=entry[3], learning_score=entry[4], last_check=entry[5], translation=entry[6],
+                word_id=entry[7],
             ) for entry in cur
         ]
 
 
-def get_user_vocabularies(
+async def get_user_vocabularies(
         user_id: UUID,
-        cur: cursor
+        cur: AsyncCursor
 ) -> Dict[str, Vocabulary]:
-    cur.execute(
-        'SELECT language, COUNT(word) '
-        'FROM public.vocabulary '
-        'WHERE user_id = %s '
-        'GROUP BY language;',
-        (user_id,)
-    )
+    await cur.run(GET_USER_VOCABULARIES, (user_id,))
 
     return {
         entry[0]: Vocabulary(
@@ -103,16 +214,42 @@ def get_user_vocabularies(
     }
 
 
-def get_user_vocabulary(
+async def get_user_vocabulary(
         user_id: UUID,
         language: str,
-        cur: cursor
+        cur: AsyncCursor
 ) -> Vocabulary:
-    cur.execute(
-        'SELECT COUNT(word) '
-        'FROM public.vocabulary AS v '
-        'WHERE v.user_id = %s AND v.language = %s;',
-        (user_id, language,)
-    )
-
-    return Vocabulary(user_id=user_id, language=language, word_count=cur.fetchone()[0])
+    await cur.run(GET_USER_VOCABULARY, (user_id, language,))
+
+    entry = cur.fetchone()
+    return Vocabulary(user_id=user_id, language=language, word_count=entry[0] if entry else 0)
+
+
+async def reconcile_vocabulary_stats(cur: AsyncCursor, batch_size: int) -> int | None:
+    """
+    Fixes word counters which have drifted from the actual vocabularies. Vocabularies are recounted for
+    batch_size users at a time and every range is committed on its own, so writes are only held up briefly
+    :return: number of fixed counters, None if another bot process is reconciling them
+    """
+    await cur.run(TRY_LOCK_RECONCILIATION, (RECONCILIATION_LOCK_ID,))
+    if not cur.fetchone()[0]:
+        return None
+
+    fixed = 0
+    # User ids are random UUIDs, the nil UUID is below all of them
+    range_start = UUID(int=0)
+    try:
+        while True:
+            await cur.run(RECONCILE_VOCABULARY_STATS, (range_start, batch_size))
+            entry = cur.fetchone()
+            await cur.commit()
+            if entry is None:
+                return fixed
+
+            range_start = entry[0]
+            fixed += entry[1]
+    finally:
+        # The lock outlives transactions, so it is released before the connection returns to the pool.
+        # Statements fail in an aborted transaction, so it is rolled back first
+        await cur.rollback()
+        await cur.run(UNLOCK_RECONCILIATION, (RECONCILIATION_LOCK_ID,))
@@ -0,0 +1,56 @@
+import asyncio
+
+from language_bot.translators.translator_pool import CircuitBreaker, TranslatorPool
+
+
+class FakeTranslator:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def translate(self) -> str:
+        await asyncio.sleep(self.delay)
+        return "translated"
+
+
+def test_hedge_loser_breaker_stays_closed():
+    async def scenario():
+        pool = TranslatorPool(hedge_delay=0.01, failure_threshold=1, reset_timeout=30)
+        slow = pool.add("slow", FakeTranslator(delay=1))
+        fast = pool.add("fast", FakeTranslator(delay=0))
+        result = await pool.call_hedged(slow, [slow, fast], [slow], lambda translator: translator.translate())
+        # Let the cancelled request of the slow backend finish
+        await asyncio.sleep(0)
+        return result, slow, fast
+
+    result, slow, fast = asyncio.run(scenario())
+    assert result == "translated"
+    assert slow.breaker.state == CircuitBreaker.CLOSED
+    assert slow.failures == 0
+    assert slow.outstanding == 0
+    assert fast.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_trial_releases_half_open_circuit():
+    async def scenario():
+        pool = TranslatorPool(hedge_delay=None, failure_threshold=1, reset_timeout=30)
+        backend = pool.add("slow", FakeTranslator(delay=1))
+        backend.breaker.record_failure()
+        backend.breaker.opened_at -= backend.breaker.reset_timeout
+        assert pool.select([backend], []) is backend
+
+        task = asyncio.create_task(pool.call([backend], lambda translator: translator.translate()))
+        await asyncio.sleep(0.01)
+        assert backend.breaker.state == CircuitBreaker.HALF_OPEN
+        assert pool.select([backend], []) is None
+
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return pool, backend
+
+    pool, backend = asyncio.run(scenario())
+    assert backend.breaker.state == CircuitBreaker.HALF_OPEN
+    assert backend.failures == 0
+    assert pool.select([backend], []) is backend